@@ -0,0 +1,183 @@
+import random
+
+from room import Room
+
+
+class Agent:
+    """
+    Base class for players driven by a GameEngine instead of typed input.
+
+    start is called once with the agent's seat before the game begins. choose_action is called with the
+    engine whenever it is the agent's turn and must return an action tuple accepted by GameEngine.step.
+    observe is called on every agent after each accepted action.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+        self.seat = None  # Seat of the player this agent controls.
+
+    def start(self, engine, seat):
+        self.seat = seat
+
+    def choose_action(self, engine):
+        raise NotImplementedError
+
+    def observe(self, engine, result):
+        pass
+
+
+# Get the names of the cards of one type that the player has not seen yet.
+def unseen_cards(engine, player, card_type):
+    known = player.known_mask
+    return [card.name for card in engine.game.available_choices if card.card_type == card_type and not known & card.bit]
+
+
+# Get the (row, column) of every tile the player can move to with the given roll, as plain ints.
+def reachable_coordinates(engine, player, dice_roll):
+    mansion = engine.game.mansion
+    reachable = mansion.reachable_within(player.current_position, dice_roll)
+    return [mansion.index_coordinates(int(index)) for index in reachable]
+
+
+class RandomAgent(Agent):
+    # Plays uniformly random actions, accusing at random with a small probability.
+    def __init__(self, rng=None, accuse_probability=0.02):
+        super().__init__(rng)
+        self.accuse_probability = accuse_probability
+
+    def choose_action(self, engine):
+        player = engine.current_player
+        if self.rng.random() < self.accuse_probability:
+            return ("accuse",
+                    self.rng.choice(unseen_cards(engine, player, 'room') or ["Kitchen"]),
+                    self.rng.choice(unseen_cards(engine, player, 'character') or ["Miss Scarlet"]),
+                    self.rng.choice(unseen_cards(engine, player, 'weapon') or ["Knife"]))
+        if player.can_make_suggestion() and self.rng.random() < 0.5:
+            return ("suggest",
+                    self.rng.choice(unseen_cards(engine, player, 'character') or ["Miss Scarlet"]),
+                    self.rng.choice(unseen_cards(engine, player, 'weapon') or ["Knife"]))
+        return ("move", self.rng.choice(reachable_coordinates(engine, player, engine.roll())))
+
+
+class BotAgent(Agent):
+    """
+    Simple deducing player.
+
+    The bot heads for the nearest room it has not seen, suggests unseen cards there and accuses once a
+    single candidate is left for each of room, character and weapon, or as soon as nobody can disprove
+    one of its suggestions. It only uses its own hand and the cards shown to it, like a human reading
+    the game output.
+    """
+
+    def __init__(self, rng=None):
+        super().__init__(rng)
+        self.player = None  # The player this agent controls.
+        self.undisproved = None  # A suggestion nobody could disprove, which must be the solution.
+
+    def start(self, engine, seat):
+        super().start(engine, seat)
+        self.player = engine.players[seat]
+
+    def choose_action(self, engine):
+        player = self.player
+        if self.undisproved:
+            return ("accuse",) + self.undisproved
+
+        rooms = unseen_cards(engine, player, 'room')
+        characters = unseen_cards(engine, player, 'character')
+        weapons = unseen_cards(engine, player, 'weapon')
+
+        if len(rooms) == 1 and len(characters) == 1 and len(weapons) == 1:
+            return ("accuse", rooms[0], characters[0], weapons[0])
+
+        position = player.current_position
+        if isinstance(position, Room) and position.name in rooms:
+            return ("suggest", self.rng.choice(characters), self.rng.choice(weapons))
+
+        passage = engine.game.secret_passage_destination(position)
+        if passage is not None and passage.name in rooms:
+            return ("secret",)
+
+        return ("move", self.choose_destination(engine, player, rooms, engine.roll()))
+
+    # Remember suggestions of unseen cards that nobody could disprove.
+    def observe(self, engine, result):
+        if result["action"] == "suggest" and result["player"] is self.player and result["disprover"] is None:
+            seen = {card.name.lower() for card in self.player.cards + self.player.seen_cards}
+            if not seen.intersection(result["suggestion"]):
+                self.undisproved = result["suggestion"]
+
+    # Move towards the nearest unseen room, entering it if the roll allows.
+    def choose_destination(self, engine, player, rooms, dice_roll):
+        mansion = engine.game.mansion
+        table = mansion.distance_table()
+        reachable = mansion.reachable_within(player.current_position, dice_roll)
+        targets = [mansion.index_of(mansion.get_room(name)) for name in rooms]
+        remaining = table.rows(targets)[:, reachable].min(axis=0)
+        return mansion.index_coordinates(int(reachable[remaining.argmin()]))
+
+
+class DeductionAgent(BotAgent):
+    """
+    Bot that tracks every suggestion, disproval and pass with a deduction.Knowledge.
+
+    It moves like BotAgent, but only suggests cards that may still be in the envelope and accuses as
+    soon as the knowledge pins down the solution.
+    """
+
+    def __init__(self, rng=None):
+        super().__init__(rng)
+        self.knowledge = None
+        self.deck = None  # Deck of the game being played (see card_setup.Deck).
+
+    def start(self, engine, seat):
+        # Imported here so that importing agents does not load NumPy.
+        from deduction import Knowledge
+        super().start(engine, seat)
+        self.deck = engine.game.deck
+        self.knowledge = Knowledge.for_deck(self.deck, len(engine.players), seat, self.player.cards,
+                                            engine.hand_sizes)
+
+    def choose_action(self, engine):
+        knowledge = self.knowledge
+        player = self.player
+        solution = knowledge.known_solution()
+        if solution:
+            character, weapon, room = solution
+            return ("accuse", room, character, weapon)
+
+        possible = set(knowledge.possible_solution_cards())
+        names = self.deck.names
+        characters, weapons, rooms = ([names[card] for card in category if card in possible]
+                                      for category in knowledge.categories)
+        position = player.current_position
+        if isinstance(position, Room) and position.name in rooms:
+            return ("suggest", self.rng.choice(characters), self.rng.choice(weapons))
+
+        passage = engine.game.secret_passage_destination(position)
+        if passage is not None and passage.name in rooms:
+            return ("secret",)
+
+        return ("move", self.choose_destination(engine, player, rooms, engine.roll()))
+
+    # Update the knowledge with the outcome of every suggestion and accusation.
+    # Names that are not cards (such as the start space) carry no information and are left out.
+    def observe(self, engine, result):
+        knowledge = self.knowledge
+        ids = self.deck.ids
+        seats = engine.game.seats
+        seat = seats[result["player"]]
+        if result["action"] == "suggest":
+            disprover = result["disprover"]
+            shown = result["card"] if seat == self.seat else None
+            knowledge.observe_suggestion(
+                seat,
+                [ids[name] for name in result["suggestion"] if name in ids],
+                seats[disprover] if disprover else None,
+                shown.card_id if shown else None,
+                [seats[player] for player in result["passed"]],
+            )
+        elif result["action"] == "accuse":
+            cards = [ids[name] for name in result["accusation"] if name in ids]
+            if len(cards) == len(knowledge.categories) or result["correct"]:
+                knowledge.observe_accusation(seat, cards, result["correct"])
@@ -0,0 +1,320 @@
+import argparse
+import glob
+import os
+
+import numpy as np
+
+from card_setup import CARDS
+from event_log import (ACCUSE, DISPROVE, ELIMINATE, GAME_END, GAME_START, MOVE, NO_SEAT, NONE, RECORD,
+                       ROLL, ROOM, SECRET, SUGGEST, EventLogReader, EventRecorder)
+
+# NumPy view of event_log.RECORD (tests/test_analytics.py checks that the two agree).
+EVENT_DTYPE = np.dtype([("kind", "u1"), ("seat", "u1"), ("turn", "<u2"), ("a", "<u2"), ("b", "<u2"),
+                        ("c", "<u2"), ("d", "<u2")])
+
+# Columns of the two tables, stored in games_NNNNNN.npz and turns_NNNNNN.npz chunk files. Turn rows are in
+# game order. -1 stands for "none" in the signed columns (no winner, no roll, not a room, ...).
+GAME_COLUMNS = {
+    "game": np.int64,  # Number of the game, counted across every chunk of the directory.
+    "players": np.uint8,  # Number of players.
+    "winner": np.int8,  # Seat of the winner.
+    "turns": np.uint16,  # Turns played.
+    "finished": np.bool_,  # Whether the game ended with a winner or with every player eliminated.
+    "eliminated": np.uint64,  # Bit mask of the eliminated seats.
+    "suggestions": np.uint16,  # Suggestions made.
+    "disproved": np.uint16,  # Suggestions disproved by another player.
+    "accusations": np.uint16,  # Accusations made.
+    "passages_tried": np.uint16,  # Secret passage attempts.
+    "passages_used": np.uint16,  # Secret passage attempts with an even roll.
+    "solution_room": np.int8,  # Card IDs of the solution.
+    "solution_character": np.int8,
+    "solution_weapon": np.int8,
+    "actions": np.uint16,  # Rows of the game in the turns table.
+}
+TURN_COLUMNS = {
+    "turn": np.uint16,  # Turn number within the game.
+    "seat": np.uint8,  # Seat of the player.
+    "action": np.uint8,  # Event kind of the action: MOVE, SUGGEST, ACCUSE or SECRET.
+    "dice_roll": np.int8,  # Roll made for the action.
+    "room": np.int8,  # Card ID of the room moved into, suggested, accused or reached by secret passage.
+    "disprover": np.int8,  # Seat that disproved a suggestion.
+    "success": np.bool_,  # Correct accusation, secret passage taken or suggestion disproved; always True for moves.
+}
+ACTION_KINDS = (MOVE, SUGGEST, ACCUSE, SECRET)
+
+# Games per chunk file written by ColumnarWriter. Each buffered game takes about 1.6 KB of records.
+CHUNK_GAMES = 10000
+
+
+# Build the games and turns columns from the event records of complete games.
+# records is an EVENT_DTYPE array starting at a GAME_START record; games without a GAME_END are left out.
+def event_columns(records, first_game=0):
+    kind = records["kind"]
+    game = np.cumsum(kind == GAME_START) - 1
+    num_games = int(game[-1]) + 1 if len(game) else 0
+    ended = np.zeros(num_games, dtype=bool)
+    ended[game[kind == GAME_END]] = True
+    if not ended.all():
+        keep = ended[game]
+        records, game, kind = records[keep], game[keep], kind[keep]
+        game = np.cumsum(kind == GAME_START) - 1
+        num_games = int(ended.sum())
+    seat, a, b, c = records["seat"], records["a"], records["b"], records["c"]
+
+    def count(mask):
+        return np.bincount(game[mask], minlength=num_games).astype(np.uint16)
+
+    starts = np.flatnonzero(kind == GAME_START)
+    ends = np.flatnonzero(kind == GAME_END)
+    games = {"game": np.arange(first_game, first_game + num_games, dtype=np.int64), "players": seat[starts]}
+    games["winner"] = np.where(seat[ends] == NO_SEAT, -1, seat[ends]).astype(np.int8)
+    games["turns"] = a[ends]
+    eliminations = kind == ELIMINATE
+    games["eliminated"] = np.zeros(num_games, dtype=np.uint64)
+    np.bitwise_or.at(games["eliminated"], game[eliminations],
+                     np.left_shift(np.uint64(1), seat[eliminations].astype(np.uint64)))
+    everyone_out = np.bincount(game[eliminations], minlength=num_games) == games["players"]
+    games["finished"] = (games["winner"] >= 0) | everyone_out
+    games["suggestions"] = count(kind == SUGGEST)
+    games["disproved"] = count(kind == DISPROVE)
+    games["accusations"] = count(kind == ACCUSE)
+    games["passages_tried"] = count(kind == SECRET)
+    games["passages_used"] = count((kind == SECRET) & (c == 1))
+    for name, field in (("solution_room", a), ("solution_character", b), ("solution_weapon", c)):
+        games[name] = field[starts].astype(np.int8)
+
+    # One turn row per action. Rolls belong to the next action, disprovals to the previous one.
+    actions = np.flatnonzero(np.isin(kind, ACTION_KINDS))
+    action_kind = kind[actions]
+    games["actions"] = np.bincount(game[actions], minlength=num_games).astype(np.uint16)
+    turns = {"turn": records["turn"][actions], "seat": seat[actions], "action": action_kind}
+    turns["dice_roll"] = np.full(len(actions), -1, dtype=np.int8)
+    rolls = np.flatnonzero(kind == ROLL)
+    rolled = np.searchsorted(actions, rolls)
+    valid = rolled < len(actions)
+    turns["dice_roll"][rolled[valid]] = a[rolls[valid]]
+    turns["disprover"] = np.full(len(actions), -1, dtype=np.int8)
+    disprovals = np.flatnonzero(kind == DISPROVE)
+    turns["disprover"][np.searchsorted(actions, disprovals, side="right") - 1] = seat[disprovals]
+
+    # Rooms of moves and secret passages are looked up from the game's ROOM records by position.
+    room_records = np.flatnonzero(kind == ROOM)
+    room_keys = _position_keys(game[room_records], b[room_records], c[room_records])
+    order = np.argsort(room_keys)
+    room_keys, room_ids = room_keys[order], a[room_records][order]
+    room = np.full(len(actions), -1, dtype=np.int8)
+    if len(room_keys):
+        keys = _position_keys(game[actions], a[actions], b[actions])
+        found = np.minimum(np.searchsorted(room_keys, keys), len(room_keys) - 1)
+        match = room_keys[found] == keys
+        room[match] = room_ids[found[match]]
+    named = (action_kind == SUGGEST) | (action_kind == ACCUSE)
+    room[named] = np.where(a[actions][named] == NONE, -1, a[actions][named])
+    turns["room"] = room
+    turns["success"] = ((action_kind == MOVE) | ((action_kind == ACCUSE) & (records["d"][actions] == 1))
+                        | ((action_kind == SECRET) & (c[actions] == 1)) | (turns["disprover"] >= 0))
+
+    games = {name: games[name].astype(dtype, copy=False) for name, dtype in GAME_COLUMNS.items()}
+    turns = {name: turns[name].astype(dtype, copy=False) for name, dtype in TURN_COLUMNS.items()}
+    return games, turns
+
+
+# Write one chunk of both tables. Files are written under a temporary name first, so readers never see half a chunk.
+def write_chunk(directory, number, games, turns):
+    for table, columns in (("games", games), ("turns", turns)):
+        path = os.path.join(directory, f"{table}_{number:06d}.npz")
+        with open(path + ".tmp", "wb") as file:
+            np.savez(file, **columns)
+        os.replace(path + ".tmp", path)
+
+
+# Get the chunk files of a table in a directory, in order.
+def chunk_paths(directory, table="games"):
+    return sorted(glob.glob(os.path.join(directory, f"{table}_[0-9]*.npz")))
+
+
+# Iterate over the chunks of a table, as dictionaries of the requested columns (all columns by default).
+def iter_chunks(directory, table="games", columns=None):
+    for path in chunk_paths(directory, table):
+        with np.load(path) as chunk:
+            yield {name: chunk[name] for name in (columns or chunk.files)}
+
+
+# Load whole columns of a table. Only use this for columns that fit in memory.
+def load_columns(directory, columns, table="games"):
+    chunks = list(iter_chunks(directory, table, columns))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) if chunks
+            else np.zeros(0, dtype=(GAME_COLUMNS if table == "games" else TURN_COLUMNS)[name]) for name in columns}
+
+
+class ColumnarWriter(EventRecorder):
+    """
+    Event recorder that stores games as columnar chunks instead of event records.
+
+    Pass it as the event log of a GameEngine, run_batch or GameManager. Records are buffered until
+    chunk_games games have finished, then converted to columns with event_columns and written out.
+    Writing into a directory that already holds chunks adds new chunks after them.
+    """
+
+    def __init__(self, directory, chunk_games=CHUNK_GAMES):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_games = chunk_games
+        self.chunks = len(chunk_paths(directory))  # Chunk files in the directory.
+        self.first_game = 0  # Number of the next game written.
+        if self.chunks:
+            with np.load(chunk_paths(directory)[-1]) as chunk:
+                self.first_game = int(chunk["game"][-1]) + 1 if len(chunk["game"]) else 0
+        self._finished = 0  # Finished games in the buffer.
+
+    def game_finished(self):
+        self._finished += 1
+        if self._finished >= self.chunk_games:
+            self.flush()
+
+    # Convert the finished games in the buffer to a chunk. An unfinished game stays in the buffer.
+    def flush(self):
+        if not self._finished:
+            return
+        records = np.frombuffer(self._buffer, dtype=EVENT_DTYPE)
+        last_end = int(np.flatnonzero(records["kind"] == GAME_END)[-1]) + 1
+        games, turns = event_columns(records[:last_end], self.first_game)
+        write_chunk(self.directory, self.chunks, games, turns)
+        self.chunks += 1
+        self.first_game += len(games["game"])
+        self._finished = 0
+        del records
+        del self._buffer[:last_end * RECORD.size]
+
+
+# Convert event log files to columnar chunks, chunk_games games at a time, and return the number of games.
+# The logs are memory-mapped and read in place, so converting never holds more than one chunk of records.
+def export_event_log(paths, directory, chunk_games=CHUNK_GAMES):
+    writer = ColumnarWriter(directory, chunk_games)
+    total = 0
+    for path in [paths] if isinstance(paths, str) else paths:
+        reader = EventLogReader(path)
+        try:
+            for start in range(0, len(reader), chunk_games):
+                stop = min(start + chunk_games, len(reader))
+                records = np.frombuffer(reader.game_records(start, stop), dtype=EVENT_DTYPE)
+                games, turns = event_columns(records, writer.first_game)
+                del records
+                write_chunk(directory, writer.chunks, games, turns)
+                writer.chunks += 1
+                writer.first_game += len(games["game"])
+                total += len(games["game"])
+        finally:
+            reader.close()
+    return total
+
+
+# Wins, games and win rate for each seat. A seat only counts games that had a player in it.
+def win_rate_by_seat(directory):
+    wins = np.zeros(0, dtype=np.int64)
+    players = np.zeros(0, dtype=np.int64)
+    no_winner = 0
+    for chunk in iter_chunks(directory, columns=("winner", "players")):
+        winner = chunk["winner"]
+        won = winner[winner >= 0]
+        no_winner += len(winner) - len(won)
+        wins = _add(wins, np.bincount(won))
+        players = _add(players, np.bincount(chunk["players"]))
+    # Games with a seat are the games with more players than the seat number.
+    games = np.cumsum(players[::-1])[::-1][1:] if len(players) else players
+    wins = _add(np.zeros(len(games), dtype=np.int64), wins)
+    return {"wins_by_seat": wins, "games_by_seat": games, "no_winner": no_winner,
+            "win_rate_by_seat": np.divide(wins, games, out=np.zeros(len(games)), where=games > 0)}
+
+
+# Distribution of game length in turns, for every game or only for won games (the turns to win).
+# Returns the count of games per number of turns and its mean and percentiles.
+def game_length_distribution(directory, won_only=False, percentiles=(50, 90, 99)):
+    counts = np.zeros(0, dtype=np.int64)
+    for chunk in iter_chunks(directory, columns=("turns", "winner")):
+        turns = chunk["turns"][chunk["winner"] >= 0] if won_only else chunk["turns"]
+        counts = _add(counts, np.bincount(turns))
+    total = counts.sum()
+    lengths = np.arange(len(counts))
+    cumulative = np.cumsum(counts)
+    result = {"counts": counts, "games": int(total), "mean": float(lengths @ counts / total) if total else 0.0}
+    for percentile in percentiles:
+        result[f"p{percentile}"] = int(np.searchsorted(cumulative, total * percentile / 100)) if total else 0
+    return result
+
+
+# How often each room was suggested, entered (by a move or secret passage) and was the solution.
+def room_frequency(directory):
+    suggested = np.zeros(len(CARDS), dtype=np.int64)
+    entered = np.zeros(len(CARDS), dtype=np.int64)
+    solution = np.zeros(len(CARDS), dtype=np.int64)
+    for chunk in iter_chunks(directory, "turns", ("action", "room", "success")):
+        action, room = chunk["action"], chunk["room"]
+        in_room = room >= 0
+        suggested += np.bincount(room[in_room & (action == SUGGEST)], minlength=len(CARDS))
+        entered += np.bincount(room[in_room & chunk["success"] & ((action == MOVE) | (action == SECRET))],
+                               minlength=len(CARDS))
+    for chunk in iter_chunks(directory, columns=("solution_room",)):
+        solution += np.bincount(chunk["solution_room"], minlength=len(CARDS))
+    return {name: {card.name: int(counts[card.card_id]) for card in CARDS if card.card_type == 'room'}
+            for name, counts in (("suggested", suggested), ("entered", entered), ("solution", solution))}
+
+
+# Secret passage attempts and how many were taken.
+def passage_usage(directory):
+    tried = used = 0
+    for chunk in iter_chunks(directory, columns=("passages_tried", "passages_used")):
+        tried += int(chunk["passages_tried"].sum(dtype=np.int64))
+        used += int(chunk["passages_used"].sum(dtype=np.int64))
+    return {"tried": tried, "used": used, "use_rate": used / tried if tried else 0.0}
+
+
+# All the summaries of a directory of chunks.
+def summarize(directory):
+    return {
+        "seats": win_rate_by_seat(directory),
+        "game_length": game_length_distribution(directory),
+        "turns_to_win": game_length_distribution(directory, won_only=True),
+        "rooms": room_frequency(directory),
+        "passages": passage_usage(directory),
+    }
+
+
+# Combine game numbers and (row, column) positions into sortable keys.
+def _position_keys(game, r, c):
+    return game.astype(np.int64) << 32 | r.astype(np.int64) << 16 | c.astype(np.int64)
+
+
+# Add two count arrays of possibly different lengths.
+def _add(total, counts):
+    if len(counts) > len(total):
+        total, counts = counts.astype(np.int64), total
+    total = total.copy()
+    total[:len(counts)] += counts
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export game results to columnar chunks and summarize them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Convert event logs to columnar chunks.")
+    export.add_argument("logs", nargs="+", help="Event log files (see event_log.py).")
+    export.add_argument("--out", required=True, help="Directory of the columnar chunks.")
+    export.add_argument("--chunk-games", type=int, default=CHUNK_GAMES, help="Games per chunk file.")
+    summary = commands.add_parser("summary", help="Summarize a directory of columnar chunks.")
+    summary.add_argument("directory")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Exported {export_event_log(args.logs, args.out, args.chunk_games)} games to {args.out}.")
+    else:
+        stats = summarize(args.directory)
+        seats, length, to_win = stats["seats"], stats["game_length"], stats["turns_to_win"]
+        print(f"Games: {length['games']}, no winner: {seats['no_winner']}")
+        print(f"Win rate by seat: {', '.join(f'{rate:.1%}' for rate in seats['win_rate_by_seat'])}")
+        print(f"Turns: mean {length['mean']:.1f}, p50 {length['p50']}, p90 {length['p90']}, p99 {length['p99']}")
+        print(f"Turns to win: mean {to_win['mean']:.1f}, p50 {to_win['p50']}, p90 {to_win['p90']}, p99 {to_win['p99']}")
+        print(f"Secret passages: {stats['passages']['used']} of {stats['passages']['tried']} attempts taken")
+        for name, counts in stats["rooms"].items():
+            print(f"Rooms {name}: " + ", ".join(f"{room} {count}" for room, count in counts.items()))
@@ -0,0 +1,64 @@
+"""
+Throughput and memory of the columnar export for very large numbers of games.
+
+Plays a batch of real games into an event log, then copies their records until the log holds the
+requested number of games, exports it to columnar chunks and summarizes the chunks. Peak allocations
+depend on the chunk size, not on the number of games. Files are written to
+a temporary directory (about 1.6 KB of log and 0.3 KB of columns per game).
+
+    python benchmarks/bench_analytics.py --games 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics
+from event_log import INDEX_MAGIC, MAGIC, RECORD, EventLog
+from simulation import run_batch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure columnar export and summaries.")
+    parser.add_argument("--games", type=int, default=200000, help="Games in the exported log.")
+    parser.add_argument("--played", type=int, default=1000, help="Real games copied to fill the log.")
+    parser.add_argument("--chunk-games", type=int, default=analytics.CHUNK_GAMES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.log")
+        with EventLog(path) as log:
+            run_batch(args.played, event_log=log)
+        with open(path, "rb") as file:
+            records = file.read()[len(MAGIC):]
+        with open(path + ".idx", "rb") as file:
+            starts = array("Q", file.read()[len(INDEX_MAGIC):])
+        copies = args.games // args.played
+        with open(path, "ab") as file, open(path + ".idx", "ab") as index_file:
+            for copy in range(1, copies):
+                file.write(records)
+                index_file.write(array("Q", (start + copy * len(records) // RECORD.size for start in starts)))
+        print(f"Log of {copies * args.played} games: {os.path.getsize(path) / 2 ** 20:.0f} MB.")
+
+        out = os.path.join(directory, "columns")
+        tracemalloc.start()
+        start = time.perf_counter()
+        games = analytics.export_event_log(path, out, args.chunk_games)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size = sum(os.path.getsize(os.path.join(out, name)) for name in os.listdir(out))
+        print(f"Exported {games} games in {elapsed:.2f}s ({games / elapsed:,.0f} games/s), "
+              f"{size / 2 ** 20:.0f} MB of columns, peak allocations {peak / 2 ** 20:.0f} MB.")
+
+        start = time.perf_counter()
+        stats = analytics.summarize(out)
+        elapsed = time.perf_counter() - start
+        rates = ", ".join(f"{rate:.1%}" for rate in stats["seats"]["win_rate_by_seat"])
+        print(f"Summarized in {elapsed:.2f}s ({games / elapsed:,.0f} games/s): win rate by seat {rates}, "
+              f"mean length {stats['game_length']['mean']:.1f} turns.")
@@ -0,0 +1,104 @@
+"""
+Cost of recording, undoing and resuming games with checkpoints.CheckpointStore.
+
+Plays --games games of bots through GameEngine.step and through CheckpointStore.step (in memory and
+writing to a checkpoint file), then times undoing every action of a game and redoing them all, the
+cost per action at the start and the end of the game, and resuming each game from its file.
+
+    python benchmarks/bench_checkpoints.py --games 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import BotAgent
+from checkpoints import CheckpointStore
+from dice import BlockDice
+from engine import GameEngine
+
+PLAYERS = ["Alice", "Bob", "Carol"]
+
+
+# Play a game with bots through step (engine.step or store.step) and return the number of actions taken.
+def play(engine, step, seed, max_turns=1000):
+    agents = [BotAgent(random.Random(seed * 10 + seat)) for seat in range(len(PLAYERS))]
+    for seat, agent in enumerate(agents):
+        agent.start(engine, seat)
+    actions = 0
+    while not engine.game_over and engine.turns < max_turns:
+        result = step(agents[engine.current_player_index].choose_action(engine))
+        actions += 1
+        if result["accepted"]:
+            for observer in agents:
+                observer.observe(engine, result)
+    return actions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time checkpointed games against plain engine games.")
+    parser.add_argument("--games", type=int, default=20)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, f"game{seed}.ckp") for seed in range(args.games)]
+    BlockDice(0).roll()  # Import NumPy before timing.
+
+    timings = {}
+    start = time.perf_counter()
+    actions = 0
+    for seed in range(args.games):
+        engine = GameEngine(PLAYERS, seed=seed, dice=BlockDice(seed))
+        actions += play(engine, engine.step, seed)
+    timings["engine.step"] = time.perf_counter() - start
+
+    stores = []
+    for name, path_of in (("in memory", lambda seed: None), ("to a file", paths.__getitem__)):
+        start = time.perf_counter()
+        for seed in range(args.games):
+            store = CheckpointStore(PLAYERS, seed=seed, path=path_of(seed))
+            play(store.engine, store.step, seed)
+            store.close()
+            stores.append(store)
+        timings[f"store.step {name}"] = time.perf_counter() - start
+    stores = stores[args.games:]
+
+    print(f"{args.games} games, {actions} actions")
+    for name, seconds in timings.items():
+        print(f"{name:<22} {seconds / actions * 1e6:>8.2f} us per action")
+
+    nodes = sum(len(store.parents) - 1 for store in stores)
+    start = time.perf_counter()
+    for store in stores:
+        store.goto(0)
+    undo = time.perf_counter() - start
+    start = time.perf_counter()
+    for store in stores:
+        while store.branches():
+            store.redo()
+    redo = time.perf_counter() - start
+    print(f"{'undo':<22} {undo / nodes * 1e6:>8.2f} us per action ({nodes} recorded)")
+    print(f"{'redo':<22} {redo / nodes * 1e6:>8.2f} us per action")
+
+    store = max(stores, key=lambda store: len(store.parents))
+    for label in ("late", "early"):
+        if label == "early":
+            store.goto(0)
+            store.redo()
+        count = 2000
+        start = time.perf_counter()
+        for _ in range(count):
+            store.undo() if label == "late" else store.redo()
+            store.redo() if label == "late" else store.undo()
+        print(f"{'undo + redo, ' + label:<22} {(time.perf_counter() - start) / count * 1e6:>8.2f} us "
+              f"at depth {store.depths[store.node]}")
+
+    sizes = sum(os.path.getsize(path) for path in paths)
+    start = time.perf_counter()
+    for path in paths:
+        CheckpointStore.resume(path).close()
+    resume = time.perf_counter() - start
+    print(f"{'resume':<22} {resume / args.games * 1e3:>8.2f} ms per game, {sizes / nodes:.1f} bytes per action on disk")
@@ -0,0 +1,64 @@
+"""
+Per-turn cost of coordinate lookups on the default and enlarged boards.
+
+A turn looks up the moving player's coordinates once, then the coordinates of every player to
+redraw the board. This compares the old full grid scan with the Mansion coordinate indexes.
+
+    python benchmarks/bench_coordinates.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card_setup import create_card_deck
+from mansion import Mansion
+from player import Player
+
+
+# The lookup GameManager.get_coordinates used before Mansion kept an index.
+def scan_coordinates(mansion, position):
+    for r in range(len(mansion.grid)):
+        for c in range(len(mansion.grid[0])):
+            if mansion.grid[r][c] == position:
+                return r, c
+    raise ValueError(position)
+
+
+def build_board(rows, cols, num_players=3):
+    room_cards = [card for card in create_card_deck() if card.card_type == 'room']
+    mansion = Mansion(room_cards, rows, cols)
+    players = [Player(f"P{i + 1}", None) for i in range(num_players)]
+    for i, player in enumerate(players):
+        player.mansion = mansion
+        # Spread the players out so the scan cannot stop early.
+        r, c = rows - 1 - i, cols - 1 - i
+        player.move(mansion.grid[r][c], (r, c))
+    return mansion, players
+
+
+def scan_turn(mansion, players):
+    scan_coordinates(mansion, players[0].current_position)
+    for player in players:
+        scan_coordinates(mansion, player.current_position)
+
+
+def indexed_turn(mansion, players):
+    mansion.get_player_coordinates(players[0])
+    for player in players:
+        mansion.get_player_coordinates(player)
+
+
+def time_per_call(func, *args, number):
+    return min(timeit.repeat(lambda: func(*args), number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'board':>10} {'scan (us/turn)':>16} {'index (us/turn)':>16} {'speedup':>9}")
+    for rows, cols in [(10, 12), (30, 30), (100, 100)]:
+        mansion, players = build_board(rows, cols)
+        number = max(1, 20000 // (rows * cols))
+        scan = time_per_call(scan_turn, mansion, players, number=number)
+        indexed = time_per_call(indexed_turn, mansion, players, number=10000)
+        print(f"{rows:>4}x{cols:<5} {scan * 1e6:>16.2f} {indexed * 1e6:>16.3f} {scan / indexed:>8.0f}x")
@@ -0,0 +1,55 @@
+"""
+Cost per roll of GameManager.roll_dice with each source of dice.
+
+Compares the default two randint calls on a random.Random with dice.BlockDice (NumPy blocks from a
+counter-based Philox generator) and dice.ScriptedDice, per roll over a long stream and per game of
+--rolls rolls, where a new stream is made for every game as simulation.play_game does.
+
+    python benchmarks/bench_dice.py --rolls 40
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dice import BlockDice, ScriptedDice
+from game_manager import GameManager
+
+SOURCES = {
+    "random.Random": lambda seed: None,
+    "BlockDice": BlockDice,
+    "ScriptedDice": lambda seed: ScriptedDice([7] * 10 ** 6),
+}
+
+
+# Mean seconds per roll_dice call over many rolls of one stream.
+def per_roll(make_dice, number=200000):
+    game = GameManager(random.Random(0), dice=make_dice(0))
+    game.roll_dice()  # BlockDice imports NumPy on its first roll.
+    return timeit.timeit(game.roll_dice, number=number) / number
+
+
+# Mean seconds to make a stream and roll it rolls times, as in one game.
+def per_game(make_dice, rolls, games=5000):
+    def game(seed=[0]):
+        seed[0] += 1
+        manager = GameManager(random.Random(seed[0]), dice=make_dice(seed[0]))
+        for _ in range(rolls):
+            manager.roll_dice()
+    return timeit.timeit(game, number=games) / games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time dice rolls from each source.")
+    parser.add_argument("--rolls", type=int, default=30, help="Rolls per game.")
+    args = parser.parse_args()
+
+    print(f"{'dice':<14} {'per roll (ns)':>14} {'per game (us)':>14}")
+    for name, make_dice in SOURCES.items():
+        if name == "ScriptedDice":
+            print(f"{name:<14} {per_roll(make_dice) * 1e9:>14.0f} {'-':>14}")
+            continue
+        print(f"{name:<14} {per_roll(make_dice) * 1e9:>14.0f} {per_game(make_dice, args.rolls) * 1e6:>14.2f}")
@@ -0,0 +1,53 @@
+"""
+Cost of resolving who disproves a suggestion, before and after card masks.
+
+The old path compared the lowercased name of every card in every other hand with a list of the
+suggested names. The new path is GameManager.resolve_suggestion, which ANDs each hand mask with the
+suggestion mask.
+
+    python benchmarks/bench_disprove.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_manager import GameManager
+
+
+# The disprove loop from start_game before hands were masks.
+def resolve_by_name(players, current_player, room, character, weapon):
+    for other_player in players:
+        if other_player != current_player:
+            for card in other_player.cards:
+                if card.name.lower() in [character, weapon, room]:
+                    return other_player, card
+    return None, None
+
+
+def time_per_call(func, number=20000):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'players':>7} {'case':>12} {'names (us)':>11} {'masks (us)':>11} {'speedup':>8}")
+    for num_players in (3, 6):
+        game = GameManager(random.Random(0))
+        game.setup_game([f"P{i + 1}" for i in range(num_players)], visualize=False)
+        current_player = game.players[0]
+        solution = game.solution
+        last_card = game.players[-1].cards[-1]
+        cases = {
+            # Nobody can disprove, so every hand is checked.
+            "no disproof": (solution.room.lower(), solution.character.lower(), solution.weapon.lower()),
+            # Only the last hand's last card matches.
+            "last player": (last_card.name.lower(), solution.character.lower(), solution.weapon.lower()),
+        }
+        for case, (room, character, weapon) in cases.items():
+            # The seen-card bookkeeping in resolve_suggestion is kept out of the comparison.
+            current_player.add_seen_card = lambda card: None
+            names = time_per_call(lambda: resolve_by_name(game.players, current_player, room, character, weapon))
+            masks = time_per_call(lambda: game.resolve_suggestion(current_player, room, character, weapon))
+            print(f"{num_players:>7} {case:>12} {names * 1e6:>11.2f} {masks * 1e6:>11.2f} {names / masks:>7.1f}x")
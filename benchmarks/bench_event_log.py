@@ -0,0 +1,57 @@
+"""
+Cost of recording games in an event log, and of reading them back.
+
+Plays the same seeded games with and without an event log, then opens the log, reads games at random
+through the index and replays them to their last turn. The log is written to a temporary directory.
+
+    python benchmarks/bench_event_log.py --games 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_log import EventLog, EventLogReader, replay
+from simulation import run_batch
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure event log write overhead and read speed.")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=10000, help="Games read at random from the log.")
+    parser.add_argument("--replays", type=int, default=200, help="Games replayed from the log.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.log")
+        _, plain = timed(run_batch, args.games)
+        with EventLog(path) as log:
+            _, logged = timed(run_batch, args.games, event_log=log)
+        size = os.path.getsize(path)
+        print(f"Played {args.games} games in {plain:.2f}s without a log and {logged:.2f}s with one "
+              f"({logged / plain - 1:+.1%}).")
+        print(f"Log: {size / 1024:.0f} KB, {size / args.games:.0f} bytes per game.")
+
+        reader, opened = timed(EventLogReader, path)
+        rng = random.Random(0)
+        picks = [rng.randrange(len(reader)) for _ in range(args.reads)]
+        _, read = timed(lambda: [reader.events(index) for index in picks])
+        _, outcomes = timed(reader.outcomes)
+        print(f"Opened {len(reader)} games in {opened * 1e3:.2f} ms, read {args.reads} at random in "
+              f"{read / args.reads * 1e6:.1f} µs each, outcomes of all games in {outcomes * 1e3:.1f} ms.")
+
+        games = [reader.events(index) for index in picks[:args.replays]]
+        _, replayed = timed(lambda: [replay(events) for events in games])
+        print(f"Replayed {len(games)} games in {replayed / len(games) * 1e3:.2f} ms each.")
+        del games
+        reader.close()
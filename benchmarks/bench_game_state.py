@@ -0,0 +1,54 @@
+"""
+Cost of branching a game for search: deep-copying the engine versus GameState.apply.
+
+Before GameState, the only way to try an action without changing the real game was to deepcopy the
+GameEngine (mansion, players and all) and step the copy. A GameState shares everything an action
+does not change, so a branch is a new tuple or two.
+
+    python benchmarks/bench_game_state.py
+"""
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import GameEngine
+
+
+# Branch the engine once per action, like a search expanding the children of one node.
+def deepcopy_branches(engine, actions):
+    for action in actions:
+        copy.deepcopy(engine).step(action)
+
+
+def state_branches(state, actions):
+    for action in actions:
+        state.apply(action)
+
+
+def per_branch(func, *args, count):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = (time.perf_counter() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    engine = GameEngine(["P1", "P2", "P3"], seed=0)
+    engine.roll()
+    state = engine.snapshot(seed=1)
+    moves = [("move", engine.game.mansion.index_coordinates(int(index))) for index in state.legal_moves()]
+    rng = random.Random(0)
+    actions = [rng.choice(moves) for _ in range(2000)]
+
+    copied = per_branch(deepcopy_branches, engine, actions[:200], count=200)
+    applied = per_branch(state_branches, state, actions, count=len(actions))
+    print(f"{'branch':>10} {'us/node':>9} {'nodes/s':>9}")
+    print(f"{'deepcopy':>10} {copied * 1e6:>9.1f} {1 / copied:>9.0f}")
+    print(f"{'apply':>10} {applied * 1e6:>9.1f} {1 / applied:>9.0f}")
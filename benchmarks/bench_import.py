@@ -0,0 +1,54 @@
+"""
+Startup cost of importing the game modules, measured with python -X importtime.
+
+Each module is imported in a fresh interpreter. The core modules must not pull in Matplotlib or
+NumPy; the renderer is listed for comparison. Exits with status 1 if a core module loads either.
+
+    python benchmarks/bench_import.py
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay standard-library only, and modules that are expected to be heavy.
+CORE_MODULES = ["mansion", "layout", "player", "solution", "card_setup", "game_manager", "engine", "game_state", "event_log", "agents", "simulation", "server", "instrumentation", "dice", "checkpoints", "route_planner", "eval_cache"]
+HEAVY_MODULES = ["renderer", "distances", "deduction", "mcts", "analytics", "sampler", "offscreen", "suggestions"]
+HEAVY_PACKAGES = ("numpy", "matplotlib")
+
+
+# Import a module in a new interpreter and return its cumulative import time (ms) and the packages it loaded.
+def import_time(module, repeat=5):
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        total_us = 0
+        loaded = set()
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            package = name.strip().split(".")[0]
+            if package in HEAVY_PACKAGES:
+                loaded.add(package)
+            # Top-level imports are not indented, and their cumulative times add up to the total.
+            if not name.startswith("  "):
+                total_us += int(cumulative)
+        if best is None or total_us < best[0]:
+            best = (total_us, loaded)
+    return best[0] / 1000, sorted(best[1])
+
+
+if __name__ == "__main__":
+    failed = False
+    print(f"{'module':>14} {'import (ms)':>12}  heavy packages")
+    for module in CORE_MODULES + HEAVY_MODULES:
+        milliseconds, loaded = import_time(module)
+        print(f"{module:>14} {milliseconds:>12.1f}  {', '.join(loaded) or '-'}")
+        if module in CORE_MODULES and loaded:
+            failed = True
+    if failed:
+        print("A core module imports Matplotlib or NumPy.")
+        sys.exit(1)
@@ -0,0 +1,35 @@
+"""
+Cost of the instrumentation hooks: the same seeded games without instrumentation, with timers and
+counters, and with timers and cProfile, followed by the timer report.
+
+    python benchmarks/bench_instrumentation.py --games 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import Instrumentation
+from simulation import run_batch
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the overhead of instrumentation.")
+    parser.add_argument("--games", type=int, default=2000)
+    args = parser.parse_args()
+
+    plain = run_batch(args.games)
+    timed = Instrumentation()
+    instrumented = run_batch(args.games, instrumentation=timed)
+    with tempfile.TemporaryDirectory() as directory:
+        profiled = Instrumentation(profile_every=args.games // 4 or 1, profile_dir=directory)
+        profiled_stats = run_batch(args.games, instrumentation=profiled)
+        profiled.close()
+
+    base = plain["games_per_second"]
+    for name, stats in (("disabled", plain), ("timers", instrumented), ("timers + cProfile", profiled_stats)):
+        rate = stats["games_per_second"]
+        print(f"{name:<18} {rate:>8.0f} games/s {rate / base - 1:>+8.1%}")
+    print()
+    print(timed.format_report())
@@ -0,0 +1,62 @@
+"""
+Cost of getting a board ready for a game, compiled from scratch or loaded from the board cache.
+
+"compile" builds the tile arrays and the distance table in memory, which is what every new process
+did before boards were cached. "cached" memory-maps the cache file written by layout.load_layout and
+wraps its arrays. Boards are generated into a temporary directory.
+
+    python benchmarks/bench_layout.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import layout
+from distances import DistanceTable
+
+
+# Write a board of the given size with nine rooms around the edges.
+def write_board(directory, rows, cols):
+    rooms = [(0, 0), (0, cols // 2), (0, cols - 1), (rows // 2, 0), (rows - 1, 0),
+             (rows - 1, cols // 2), (rows - 1, cols - 1), (rows // 2, cols - 1), (0, cols // 4)]
+    path = os.path.join(directory, f"board_{rows}x{cols}.json")
+    with open(path, "w") as file:
+        json.dump({"rows": rows, "cols": cols, "start": [rows // 2, cols // 2], "rooms": rooms}, file)
+    return path
+
+
+def compile_board(spec):
+    compiled = layout.CompiledLayout(spec["rows"], spec["cols"], spec["rooms"], spec["start"])
+    return DistanceTable(*compiled.graph()).full()
+
+
+def load_board(cache_path):
+    compiled = layout.read_compiled(cache_path)
+    return DistanceTable.from_buffers(**compiled.distance_buffers)
+
+
+def best_time(func, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    print(f"{'board':>10} {'cache (KB)':>11} {'compile (ms)':>13} {'cached (ms)':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows, cols in [(10, 12), (16, 24), (30, 30)]:
+            path = write_board(directory, rows, cols)
+            spec = layout.load_layout(path)
+            cache_dir = os.path.join(directory, layout.CACHE_DIR_NAME)
+            cache_path = max((os.path.join(cache_dir, name) for name in os.listdir(cache_dir)), key=os.path.getmtime)
+            compiled = best_time(compile_board, spec, repeat=3)
+            cached = best_time(load_board, cache_path)
+            print(f"{rows:>4}x{cols:<5} {os.path.getsize(cache_path) / 1024:>11.0f} {compiled * 1e3:>13.2f} "
+                  f"{cached * 1e3:>12.3f} {compiled / cached:>7.0f}x")
@@ -0,0 +1,75 @@
+"""
+Rollout rate and strength of ISMCTSAgent against BotAgents.
+
+One ISMCTS bot plays every game, rotating through the seats, against BotAgents. Use the options to
+tune the budget and pool size for your hardware:
+
+    python benchmarks/bench_mcts.py --games 30 --rollouts 200
+    python benchmarks/bench_mcts.py --games 10 --time-budget 0.2 --workers 4
+    python benchmarks/bench_mcts.py --games 30 --rollouts 200 --eval-cache 16
+
+With --eval-cache the bot scores leaves from an eval_cache.EvalCache of that many megabytes, shared by
+its workers and kept across games, and its hit rate over the lookups of all of them is reported.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import BotAgent
+from engine import GameEngine
+from eval_cache import EvalCache
+from mcts import ISMCTSAgent
+
+
+def play(games, num_players, rollouts, time_budget, workers, eval_cache=None):
+    agent = ISMCTSAgent(random.Random(0), rollouts=rollouts, time_budget=time_budget, workers=workers,
+                        eval_cache=eval_cache)
+    wins = 0
+    start = time.perf_counter()
+    try:
+        for game in range(games):
+            rng = random.Random(game)
+            engine = GameEngine([f"P{i + 1}" for i in range(num_players)], rng=rng)
+            seat = game % num_players
+            agents = [BotAgent(random.Random(rng.getrandbits(64))) for _ in range(num_players)]
+            agents[seat] = agent
+            result = engine.run(agents)
+            wins += result["winner"] == seat
+    finally:
+        agent.close()
+    return wins, agent, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure ISMCTSAgent against BotAgents.")
+    parser.add_argument("--games", type=int, default=30)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--rollouts", type=int, default=None, help="Rollouts per move.")
+    parser.add_argument("--time-budget", type=float, default=None, help="Seconds per move.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes to spread the rollouts over.")
+    parser.add_argument("--eval-cache", type=float, default=None, help="Megabytes of evaluation cache.")
+    args = parser.parse_args()
+    if args.rollouts is None and args.time_budget is None:
+        args.rollouts = 200
+
+    eval_cache = None
+    if args.eval_cache:
+        eval_cache = EvalCache(args.players + 1, int(args.eval_cache * 2 ** 20), shared=(args.workers or 1) > 1)
+    try:
+        wins, agent, elapsed = play(args.games, args.players, args.rollouts, args.time_budget, args.workers,
+                                    eval_cache)
+    finally:
+        if eval_cache is not None:
+            eval_cache.close()
+    stats = agent.stats
+    print(f"Won {wins}/{args.games} games ({wins / args.games:.0%}, {1 / args.players:.0%} is an even share) "
+          f"in {elapsed:.1f}s.")
+    print(f"{stats['rollouts']} rollouts in {stats['searches']} searches: {agent.rollouts_per_second:.0f} rollouts/s.")
+    if eval_cache is not None:
+        cache_stats = eval_cache.stats
+        print(f"Evaluation cache: {eval_cache.hit_rate:.0%} hits, {cache_stats['stores']} stores, "
+              f"{cache_stats['evictions']} evictions, {eval_cache.capacity} entries at most.")
@@ -0,0 +1,83 @@
+"""
+Memory and build time of large boards, before and after the compiled layout.
+
+The old Mansion created a Space object for every tile, a 2D list of them and a connection list per
+tile. The new Mansion keeps the tile types and connections in compact arrays (layout.CompiledLayout)
+and only creates Space objects for tiles that are looked up. "touched" is the new Mansion after
+every tile has been created, the worst case for a board that is fully explored.
+
+    python benchmarks/bench_memory.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import layout
+from card_setup import create_card_deck
+from layout import default_layout
+from mansion import Mansion
+from room import Room
+from space import Space
+
+
+# The grid building in Mansion._initialize_mansion before the compiled layout.
+def eager_grid(room_cards, rows, cols):
+    rooms = {card.name: Room(card.name) for card in room_cards}
+    grid = [[None for _ in range(cols)] for _ in range(rows)]
+    for (r, c), card in zip(default_layout()["rooms"], room_cards):
+        grid[r][c] = rooms[card.name]
+    grid[rows // 2][cols // 2] = Room("Start Space")
+    spaces = {}
+    for r in range(rows):
+        for c in range(cols):
+            if grid[r][c] is None:
+                spaces[f"Space_{r}_{c}"] = grid[r][c] = Space(f"Space_{r}_{c}")
+    coordinates = {grid[r][c]: (r, c) for r in range(rows) for c in range(cols)}
+    tiles = [tile for row in grid for tile in row]
+    for r in range(rows):
+        for c in range(cols):
+            tile = grid[r][c]
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and (isinstance(tile, Space) or isinstance(grid[nr][nc], Space)):
+                    tile.add_connection(grid[nr][nc])
+    return rooms, spaces, grid, coordinates, tiles
+
+
+def compact_mansion(room_cards, rows, cols):
+    return Mansion(room_cards, rows, cols)
+
+
+def touched_mansion(room_cards, rows, cols):
+    mansion = Mansion(room_cards, rows, cols)
+    for tile in mansion.tiles:
+        tile.get_connections()
+    return mansion
+
+
+# Build a board and return the memory it holds on to (MB) and the build time (ms).
+# The time is taken on a separate build, since tracing slows allocation down.
+def measure(build, room_cards, rows, cols):
+    layout.clear_compiled()
+    tracemalloc.start()
+    board = build(room_cards, rows, cols)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+    layout.clear_compiled()
+    start = time.perf_counter()
+    build(room_cards, rows, cols)
+    elapsed = time.perf_counter() - start
+    return retained / 1e6, elapsed * 1e3
+
+
+if __name__ == "__main__":
+    room_cards = [card for card in create_card_deck() if card.card_type == 'room']
+    builds = [("eager", eager_grid), ("compact", compact_mansion), ("touched", touched_mansion)]
+    print(f"{'board':>10} {'tiles':>7} {'build':>8} {'memory (MB)':>12} {'time (ms)':>10}")
+    for rows, cols in [(10, 12), (100, 100), (150, 150)]:
+        for name, build in builds:
+            megabytes, milliseconds = measure(build, room_cards, rows, cols)
+            print(f"{rows:>4}x{cols:<5} {rows * cols:>7} {name:>8} {megabytes:>12.2f} {milliseconds:>10.1f}")
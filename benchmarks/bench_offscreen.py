@@ -0,0 +1,77 @@
+"""
+Time to export a logged game as a GIF or PNG frames with offscreen.py.
+
+Plays a seeded game of random movers for --turns turns into an event log, then exports one frame per
+turn, once with the board raster still to draw and once with it cached. For comparison, it times
+saving a PNG of the live BoardRenderer after each update on Agg (without the plt.pause(0.1) of an
+interactive game, which alone costs 0.1 s per turn) for a sample of turns.
+
+    python benchmarks/bench_offscreen.py --turns 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import offscreen
+from agents import RandomAgent
+from engine import GameEngine
+from event_log import EventLog, EventLogReader
+from game_manager import GameManager
+
+
+# Seconds per turn to update the live renderer and save its canvas.
+def live_frame_time(frames, directory):
+    game = GameManager(random.Random(0))
+    game.setup_game(["P1", "P2", "P3"])
+    game.place_players_at_start()
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for index in range(frames):
+        player = rng.choice(game.players)
+        tile = rng.choice(game.mansion.tiles)
+        player.move(tile, game.get_coordinates(tile))
+        game.update_visualization()
+        game.fig.savefig(os.path.join(directory, f"live_{index:05d}.png"))
+    elapsed = (time.perf_counter() - start) / frames
+    game.renderer.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure offscreen export of a logged game.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--live-frames", type=int, default=20, help="Turns of the live renderer to time.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.log")
+        with EventLog(path) as log:
+            engine = GameEngine(["P1", "P2", "P3"], seed=0, event_log=log)
+            engine.run([RandomAgent(random.Random(seat), accuse_probability=0.0) for seat in range(3)],
+                       max_turns=args.turns)
+        reader = EventLogReader(path)
+        events = reader.events(0)
+        reader.close()
+
+        print(f"{'export':<24} {'frames':>7} {'seconds':>8} {'size (KB)':>10}")
+        for name, out in (("gif (board not cached)", "game.gif"), ("gif", "game.gif"), ("png frames", "frames")):
+            out = os.path.join(directory, out)
+            start = time.perf_counter()
+            frames = offscreen.export_game(events, out)
+            elapsed = time.perf_counter() - start
+            size = (os.path.getsize(out) if os.path.isfile(out) else
+                    sum(os.path.getsize(os.path.join(out, file)) for file in os.listdir(out)))
+            print(f"{name:<24} {frames:>7} {elapsed:>8.3f} {size / 1024:>10.0f}")
+
+        live = live_frame_time(args.live_frames, directory)
+        print(f"{'live renderer + savefig':<24} {frames:>7} {live * frames:>8.3f} {'-':>10}  "
+              f"(estimated from {args.live_frames} turns)")
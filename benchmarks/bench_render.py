@@ -0,0 +1,83 @@
+"""
+Frame time of a board update, before and after the blitting renderer.
+
+The old update_visualization cleared the axes and rebuilt every tick, grid line and label before a
+full canvas draw (followed by plt.pause(0.1), which is left out here). BoardRenderer.update only
+restores the static background and redraws the player labels. Runs on the Agg backend.
+
+    python benchmarks/bench_render.py
+"""
+import os
+import random
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_manager import GameManager
+from room import Room
+
+
+# The body of update_visualization before BoardRenderer, without the plt.pause.
+# It draws on its own figure, since clearing the axes would remove the renderer's artists.
+def full_redraw(game, fig, ax):
+    mansion = game.mansion
+    rows, cols = len(mansion.grid), len(mansion.grid[0])
+    grid = np.full((rows, cols), "", dtype=object)
+    ax.clear()
+    for r in range(rows):
+        for c in range(cols):
+            tile = mansion.grid[r][c]
+            if isinstance(tile, Room):
+                grid[r][c] = tile.name
+    for player in game.players:
+        coordinates = mansion.get_player_coordinates(player)
+        if coordinates:
+            r, c = coordinates
+            grid[r][c] += f" ({player.name})"
+    for (r, c), value in np.ndenumerate(grid):
+        if value:
+            ax.text(c, r, value, va='center', ha='center', color="black", fontsize=8)
+    ax.set_xticks(np.arange(0, cols, 1))
+    ax.set_yticks(np.arange(0, rows, 1))
+    ax.set_xticklabels(range(cols))
+    ax.set_yticklabels(range(rows))
+    ax.set_xticks(np.arange(-.5, cols, 1), minor=True)
+    ax.set_yticks(np.arange(-.5, rows, 1), minor=True)
+    ax.grid(which="minor", color="black", linestyle='-', linewidth=2)
+    ax.tick_params(which="minor", size=0)
+    ax.invert_yaxis()
+    fig.canvas.draw()
+
+
+# Move a random player to a random tile, then time one redraw.
+def frame_times(game, redraw, frames):
+    rng = random.Random(0)
+    times = []
+    for _ in range(frames):
+        player = rng.choice(game.players)
+        tile = rng.choice(game.mansion.tiles)
+        player.move(tile, game.get_coordinates(tile))
+        start = time.perf_counter()
+        redraw(game)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1e3
+
+
+if __name__ == "__main__":
+    game = GameManager(random.Random(0))
+    game.setup_game(["P1", "P2", "P3"])
+    game.place_players_at_start()
+
+    blit = frame_times(game, GameManager.update_visualization, 200)
+    fig, ax = plt.subplots(figsize=(12, 10))
+    full = frame_times(game, lambda game: full_redraw(game, fig, ax), 20)
+    print(f"{'update':>12} {'median (ms)':>12} {'p95 (ms)':>9}")
+    print(f"{'full redraw':>12} {np.median(full):>12.2f} {np.percentile(full, 95):>9.2f}")
+    print(f"{'blit':>12} {np.median(blit):>12.2f} {np.percentile(blit, 95):>9.2f}")
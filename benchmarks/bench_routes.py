@@ -0,0 +1,107 @@
+"""
+Cost of choosing a room to head for with route_planner.RoutePlanner against a breadth-first search per query.
+
+On square boards of growing size with the nine rooms spread over the grid and two secret passages, times
+Mansion.best_room_targets (next-hop tables built once per room, then lookups) against searching the
+board from the player's tile on every query, as an agent without tables would. The search walks only,
+so the two are checked against each other on the same boards without passages first.
+
+    python benchmarks/bench_routes.py --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import route_planner
+from card_setup import STANDARD_DECK
+from mansion import Mansion
+
+SIDES = (12, 50, 100, 200)
+PASSAGES = (("Study", "Kitchen"), ("Conservatory", "Lounge"))
+
+
+# A square board with the rooms on a 3 x 3 grid of positions and the start in the middle.
+def spread_layout(side, passages=PASSAGES):
+    positions = [(side * i // 4, side * j // 4) for i in (1, 2, 3) for j in (1, 2, 3)]
+    start = positions.pop(4)
+    return {"rows": side, "cols": side, "start": (start[0], start[1] + 1), "rooms": (start,) + tuple(positions),
+            "secret_passages": passages}
+
+
+# Rank the rooms by searching the board from the source tile, walking only.
+def best_targets_by_search(mansion, planner, neighbors, blocking, source, roll, rooms):
+    steps = {source: 0}
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        tile = queue.popleft()
+        if tile != source and blocking[tile]:
+            continue
+        for neighbor in neighbors[tile]:
+            if neighbor not in steps:
+                steps[neighbor] = steps[tile] + 1
+                parents[neighbor] = tile
+                queue.append(neighbor)
+    ranked = []
+    for order, room in enumerate(rooms):
+        if room not in steps:
+            continue
+        if room == source:
+            ranked.append((0.0, order, room, None))
+            continue
+        tile = room
+        while steps[tile] > min(roll, steps[room]):
+            tile = parents[tile]
+        ranked.append((1 + planner.turns(max(steps[room] - roll, 0)), order, room, ("move", tile)))
+    ranked.sort()
+    return [(turns, room, action) for turns, _, room, action in ranked]
+
+
+def queries(mansion, count, rng):
+    names = list(mansion.rooms)
+    return [(rng.randrange(mansion.rows * mansion.cols), rng.randint(2, 12), rng.sample(names, rng.randint(1, 9)))
+            for _ in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time route planning against a search per query.")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    room_cards = [card for card in STANDARD_DECK.cards if card.card_type == 'room']
+    rng = random.Random(0)
+
+    print(f"{'board':>9} {'build (ms)':>11} {'planner (us)':>13} {'search (us)':>12}")
+    for side in SIDES:
+        plain = Mansion(room_cards, layout=spread_layout(side, passages=()))
+        planner = plain.route_planner()
+        neighbors, blocking = plain.layout.graph()
+        for source, roll, names in queries(plain, 200, rng):
+            rooms = [plain.index_of(plain.get_room(name)) for name in names]
+            expected = best_targets_by_search(plain, planner, neighbors, blocking, source, roll, rooms)
+            found = planner.best_targets(source, roll, rooms)
+            if [(turns, room) for turns, room, _ in expected] != [(turns, room) for turns, room, _ in found]:
+                raise AssertionError(f"The planner and the search disagree from tile {source} with a roll of {roll}.")
+
+        route_planner._cache.clear()
+        mansion = Mansion(room_cards, layout=spread_layout(side))
+        calls = [(mansion.tile_at(source), roll, names) for source, roll, names in queries(mansion, args.queries, rng)]
+        start = time.perf_counter()
+        for name in mansion.rooms:
+            mansion.route_planner().plans(mansion.index_of(mansion.get_room(name)))
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        for call in calls:
+            mansion.best_room_targets(*call)
+        planned = (time.perf_counter() - start) / len(calls)
+
+        start = time.perf_counter()
+        for tile, roll, names in calls[:max(len(calls) // side, 20)]:
+            rooms = [mansion.index_of(mansion.get_room(name)) for name in names]
+            best_targets_by_search(mansion, planner, neighbors, blocking, mansion.index_of(tile), roll, rooms)
+        searched = (time.perf_counter() - start) / max(len(calls) // side, 20)
+        print(f"{side:>4}x{side:<4} {build * 1e3:>11.1f} {planned * 1e6:>13.1f} {searched * 1e6:>12.1f}")
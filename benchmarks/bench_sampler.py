@@ -0,0 +1,74 @@
+"""
+Deals per second of sampler.BatchSampler against one mcts.DealSampler draw at a time.
+
+Builds the knowledge of the first player after a few suggestions of a seeded game, then draws the
+same number of consistent deals with both samplers, and compares the estimated envelope
+probabilities with the exact ones from deduction.Knowledge.solution_probabilities.
+
+    python benchmarks/bench_sampler.py --deals 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from deduction import Knowledge
+from engine import GameEngine
+from mcts import DealSampler
+from sampler import BatchSampler
+
+
+# Knowledge of seat 0 after each other seat has made one seeded suggestion.
+def sample_knowledge(seed):
+    rng = random.Random(seed)
+    engine = GameEngine(["P1", "P2", "P3"], seed=seed)
+    players = engine.game.players
+    knowledge = Knowledge(len(players), 0, players[0].cards, engine.hand_sizes)
+    for suggester in (1, 2, 1):
+        cards = [rng.choice(category).item() for category in knowledge.categories]
+        order = [(suggester + step) % len(players) for step in range(1, len(players))]
+        passed = []
+        for seat in order:
+            held = [card for card in players[seat].cards if card.card_id in cards]
+            if held:
+                shown = held[0].card_id if seat == 0 or suggester == 0 else None
+                knowledge.observe_suggestion(suggester, cards, disprover=seat, shown=shown, passed=passed)
+                break
+            passed.append(seat)
+        else:
+            knowledge.observe_suggestion(suggester, cards, passed=passed)
+    return knowledge
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare batch and one-at-a-time deal sampling.")
+    parser.add_argument("--deals", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    knowledge = sample_knowledge(args.seed)
+    exact = knowledge.solution_probabilities()
+
+    start = time.perf_counter()
+    sampler = DealSampler(knowledge)
+    rng = random.Random(args.seed)
+    counts = np.zeros(knowledge.num_cards)
+    for _ in range(args.deals):
+        solution = sampler.sample(rng)[1]
+        counts[[card for card in range(knowledge.num_cards) if solution >> card & 1]] += 1
+    single = time.perf_counter() - start
+    single_error = np.abs(counts / args.deals - exact).max()
+
+    start = time.perf_counter()
+    probabilities = BatchSampler.from_knowledge(knowledge).holder_probabilities(args.deals, args.seed)
+    batch = time.perf_counter() - start
+    batch_error = np.abs(probabilities[knowledge.envelope] - exact).max()
+
+    print(f"{'sampler':<14} {'deals/s':>12} {'max error':>10}")
+    print(f"{'DealSampler':<14} {args.deals / single:>12,.0f} {single_error:>10.4f}")
+    print(f"{'BatchSampler':<14} {args.deals / batch:>12,.0f} {batch_error:>10.4f}")
@@ -0,0 +1,70 @@
+"""
+Cost of resolving a suggestion as tables and decks grow.
+
+Sets up games of 3 to 48 players with decks of 21 to about 600 cards (on a generated board with a place
+for every room) and times GameManager.resolve_suggestion, which looks up the owners of the three
+suggested cards, against the old loop that ANDs every other player's hand mask with the suggestion
+in seat order. Suggestions are random cards from random seats, so some go undisproved.
+
+    python benchmarks/bench_scaling.py
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card_setup import Deck
+from game_manager import GameManager
+from layout import default_layout
+
+TABLES = (3, 6, 12, 24, 48)
+DECKS = ((6, 6, 9), (40, 40, 25), (200, 200, 200))
+
+
+# A square board with rooms on every other tile of every other row and the start in the middle.
+def grid_layout(rooms):
+    side = 2 * math.ceil(math.sqrt(rooms + 1)) + 1
+    positions = [(r, c) for r in range(0, side, 2) for c in range(0, side, 2)]
+    start = positions.pop(len(positions) // 2)
+    return dict(default_layout(), rows=side, cols=side, start=start, rooms=positions[:rooms])
+
+
+# The disprove loop before the card owner index: every other hand mask, in seat order.
+def resolve_by_masks(game, current_player, room, character, weapon):
+    suggestion_mask = game.deck.names_mask((character, weapon, room))
+    passed = []
+    for other_player in game.players:
+        if other_player is not current_player:
+            disproving = other_player.hand_mask & suggestion_mask
+            if disproving:
+                return other_player, game.deck.lowest_card(disproving), passed
+            passed.append(other_player)
+    return None, None, passed
+
+
+def time_per_call(func, suggestions, number=20000):
+    calls = [suggestions[i % len(suggestions)] for i in range(number)]
+    seconds = timeit.timeit(lambda: [func(*call) for call in calls], number=1)
+    return seconds / number
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    print(f"{'players':>8} {'cards':>6} {'masks (us)':>11} {'index (us)':>11}")
+    for characters, weapons, rooms in DECKS:
+        deck = Deck.numbered(characters, weapons, rooms)
+        for players in TABLES:
+            game = GameManager(random.Random(0), layout=grid_layout(rooms), deck=deck)
+            game.setup_game([f"P{seat + 1}" for seat in range(players)], visualize=False)
+            suggestions = [(rng.choice(game.players), rng.choice(deck.rooms).lower(),
+                            rng.choice(deck.characters).lower(), rng.choice(deck.weapons).lower())
+                           for _ in range(1000)]
+            for call in suggestions:
+                if resolve_by_masks(game, *call) != game.resolve_suggestion(*call):
+                    raise AssertionError(f"The two resolvers disagree on {call}.")
+            masks = time_per_call(lambda *call: resolve_by_masks(game, *call), suggestions)
+            index = time_per_call(game.resolve_suggestion, suggestions)
+            print(f"{players:>8} {len(deck):>6} {masks * 1e6:>11.2f} {index * 1e6:>11.2f}")
@@ -0,0 +1,150 @@
+"""
+Load generator for server.py: opens many tables of bot players and measures turn latency.
+
+Every connection plays all the seats of tables/connections tables. The bots head for rooms they have not
+seen, suggest unseen cards there and accuse once nobody can disprove a suggestion, like agents.BotAgent.
+Turn latency is the time from sending an action to receiving its result, so it includes the network
+round trip. By default the server runs in this process; use --host and --port to load a running one.
+
+    python benchmarks/bench_server.py --tables 1000 --connections 50
+    python benchmarks/bench_server.py --tables 200 --port 7777 --host 127.0.0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card_setup import CHARACTERS, ROOMS, WEAPONS
+from server import GameServer
+
+
+class Seat:
+    # What a bot knows about its own game.
+    def __init__(self):
+        self.known = set()  # Cards held or shown.
+        self.undisproved = None  # Suggestion nobody could disprove.
+        self.room = None  # Room of the pending suggestion.
+
+    def unseen(self, names):
+        return [name for name in names if name not in self.known]
+
+
+class BotConnection:
+    def __init__(self, tables, players, rng, latencies):
+        self.tables = tables  # Table IDs this connection plays every seat of.
+        self.players = players
+        self.rng = rng
+        self.latencies = latencies  # Seconds from each action to its result.
+        self.seats = {}  # Seat state by (table, seat).
+        self.sent = {}  # Time each (table, seat) sent its pending action.
+        self.finished = 0
+        self.writer = None
+
+    def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+
+    def act(self, table, seat, action):
+        self.sent[table, seat] = time.perf_counter()
+        self.send({"op": "action", "table": table, "seat": seat, "action": action})
+
+    async def play(self, host, port):
+        reader, self.writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+        for table in self.tables:
+            for seat in range(self.players):
+                self.send({"op": "join", "table": table, "name": f"Bot {seat + 1}"})
+        await self.writer.drain()
+        while self.finished < len(self.tables):
+            line = await reader.readline()
+            if not line:
+                break
+            self.handle(json.loads(line))
+            if self.writer.transport.get_write_buffer_size() > 2 ** 16:
+                await self.writer.drain()
+        self.writer.close()
+
+    def handle(self, message):
+        event = message["event"]
+        key = (message.get("table"), message.get("seat"))
+        if event == "start":
+            self.seats[key] = Seat()
+            self.seats[key].known.update(message["cards"])
+        elif event == "turn":
+            self.take_turn(key, message)
+        elif event == "rolled":
+            state = self.seats[key]
+            targets = [(move[2], move[:2]) for name, move in message["toward"].items() if name not in state.known]
+            target = min(targets)[1] if targets else self.rng.choice(message["moves"])
+            self.act(*key, ["move", target])
+        elif event == "result":
+            if key in self.sent:
+                self.latencies.append(time.perf_counter() - self.sent.pop(key))
+            state = self.seats.get(key)
+            if message["action"] == "suggest" and state is not None and state.room is not None:
+                if "card" in message:
+                    state.known.add(message["card"])
+                elif message["disprover"] is None:
+                    character, weapon = message["suggestion"][1:]
+                    state.undisproved = [state.room, character, weapon]
+                state.room = None
+        elif event == "game_over":
+            self.finished += 1
+        elif event == "error":
+            raise RuntimeError(f"Server error: {message}")
+
+    def take_turn(self, key, message):
+        state = self.seats[key]
+        rooms, characters, weapons = state.unseen(ROOMS), state.unseen(CHARACTERS), state.unseen(WEAPONS)
+        if state.undisproved:
+            self.act(*key, ["accuse"] + state.undisproved)
+        elif len(rooms) == 1 and len(characters) == 1 and len(weapons) == 1:
+            self.act(*key, ["accuse", rooms[0], characters[0], weapons[0]])
+        elif message["room"] in rooms:
+            state.room = message["room"]
+            self.act(*key, ["suggest", self.rng.choice(characters), self.rng.choice(weapons)])
+        elif message["passage"] in rooms:
+            self.act(*key, ["secret"])
+        else:
+            self.send({"op": "roll", "table": key[0], "seat": key[1]})
+
+
+async def run(args):
+    listener = None
+    if args.port is None:
+        server = GameServer(args.players, max_tables=args.tables, seed=0)
+        listener = await server.start(args.host, 0)
+        args.port = listener.sockets[0].getsockname()[1]
+    latencies = []
+    rng = random.Random(0)
+    tables = [f"load-{index}" for index in range(args.tables)]
+    connections = [BotConnection(tables[index::args.connections], args.players, random.Random(rng.getrandbits(64)),
+                                 latencies) for index in range(args.connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(connection.play(args.host, args.port) for connection in connections))
+    elapsed = time.perf_counter() - start
+    if listener is not None:
+        listener.close()
+    return latencies, elapsed, sum(connection.finished for connection in connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open tables of bot players against server.py.")
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=25)
+    parser.add_argument("--players", type=int, default=3, help="Players per table (must match the server).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="Port of a running server (default: start one).")
+    args = parser.parse_args()
+    args.connections = min(args.connections, args.tables)
+
+    latencies, elapsed, finished = asyncio.run(run(args))
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"Finished {finished} of {args.tables} tables over {args.connections} connections in {elapsed:.1f}s: "
+          f"{len(latencies)} turns, {len(latencies) / elapsed:,.0f} turns/s.")
+    print(f"Turn latency: p50 {quantiles[49] * 1e3:.2f} ms, p99 {quantiles[98] * 1e3:.2f} ms, "
+          f"max {max(latencies) * 1e3:.2f} ms.")
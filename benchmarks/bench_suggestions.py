@@ -0,0 +1,100 @@
+"""
+Cost of resolving suggestions one at a time against the batched resolvers in suggestions.py.
+
+Times one random suggestion in each of --games dealt games three ways: GameManager.resolve_suggestion
+in a loop, suggestions.resolve_games (turning names into card IDs included), and suggestions.resolve_batch
+on owners and card IDs built once, as a simulator asking many rounds would. Then times every suggestion
+from one room against --deals deals drawn by sampler.BatchSampler, in a Python loop over the deals and
+with suggestions.resolve_against_deals. Each batched resolver is checked against its loop first.
+
+    python benchmarks/bench_suggestions.py --games 2000 --deals 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from card_setup import STANDARD_DECK
+from game_manager import GameManager
+from sampler import BatchSampler
+from suggestions import game_owners, resolve_against_deals, resolve_batch, resolve_games, suggestion_ids
+
+PLAYERS = ["Alice", "Bob", "Carol", "Dave"]
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# Resolve each game's suggestion with GameManager.resolve_suggestion, as (seat, card ID) or (-1, -1).
+def resolve_one_by_one(games, seats, suggestions):
+    resolved = []
+    for game, seat, suggestion in zip(games, seats, suggestions):
+        player, card, _ = game.resolve_suggestion(game.players[seat], *suggestion)
+        resolved.append((game.seats[player], card.card_id) if player else (-1, -1))
+    return resolved
+
+
+# Resolve every suggestion against every deal in Python, walking the seats in order as the game does.
+def resolve_deals_by_loop(deals, suggester, suggested):
+    resolved = []
+    for cards in suggested.tolist():
+        row = []
+        for deal in deals.tolist():
+            best = (-1, -1)
+            for card in sorted(cards):
+                owner = deal[card]
+                if owner != suggester and owner < len(PLAYERS) and (best[0] < 0 or owner < best[0]):
+                    best = (owner, card)
+            row.append(best)
+        resolved.append(row)
+    return resolved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time batched suggestion resolution.")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--deals", type=int, default=1000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    games = []
+    for seed in range(args.games):
+        game = GameManager(random.Random(seed))
+        game.setup_game(PLAYERS, visualize=False)
+        games.append(game)
+    seats = [rng.randrange(len(PLAYERS)) for _ in games]
+    suggestions = [(rng.choice(STANDARD_DECK.rooms), rng.choice(STANDARD_DECK.characters),
+                    rng.choice(STANDARD_DECK.weapons)) for _ in games]
+    loop, expected = timed(lambda: resolve_one_by_one(games, seats, suggestions))
+    batch, (disprovers, cards) = timed(lambda: resolve_games(games, seats, suggestions))
+    if expected != list(zip(disprovers.tolist(), cards.tolist())):
+        raise AssertionError("The batched resolver disagrees with GameManager.resolve_suggestion.")
+    print(f"{args.games} games, one suggestion each")
+    print(f"{'resolve_suggestion':<24} {loop / args.games * 1e6:>8.2f} us per suggestion")
+    print(f"{'resolve_games':<24} {batch / args.games * 1e6:>8.2f} us per suggestion")
+    owners, suggested = game_owners(games), suggestion_ids(suggestions)
+    batch, _ = timed(lambda: resolve_batch(owners, seats, suggested))
+    print(f"{'resolve_batch':<24} {batch / args.games * 1e6:>8.2f} us per suggestion (owners and IDs built once)")
+
+    deals = BatchSampler(len(PLAYERS)).sample(args.deals, np.random.default_rng(0))
+    suggested = suggestion_ids([("Kitchen", character, weapon) for character in STANDARD_DECK.characters
+                                for weapon in STANDARD_DECK.weapons])
+    queries = len(suggested) * args.deals
+    loop, expected = timed(lambda: resolve_deals_by_loop(deals, 0, suggested), repeat=1)
+    batch, (disprovers, cards) = timed(lambda: resolve_against_deals(deals, 0, suggested, envelope=len(PLAYERS)))
+    if expected != [list(zip(*row)) for row in zip(disprovers.tolist(), cards.tolist())]:
+        raise AssertionError("The batched resolver disagrees with the loop over deals.")
+    print(f"{len(suggested)} suggestions x {args.deals} deals")
+    print(f"{'loop over deals':<24} {loop / queries * 1e9:>8.0f} ns per query")
+    print(f"{'resolve_against_deals':<24} {batch / queries * 1e9:>8.0f} ns per query")
@@ -0,0 +1,163 @@
+"""
+Benchmark suite for the core game paths, compared against stored baselines.
+
+Measures game setup, Mansion construction, dealing, one scripted turn of each action type and a full
+seeded bot game. Each benchmark reports the best mean time per call over several rounds, and fails
+if it is more than --threshold slower than its baseline in benchmarks/baseline.json. Baselines
+depend on the machine: record them with --save on the machine the suite is run on.
+
+    python benchmarks/run_benchmarks.py                  # compare with the baselines
+    python benchmarks/run_benchmarks.py --save           # record new baselines
+    python benchmarks/run_benchmarks.py -k turn --threshold 0.25
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import BotAgent
+from card_setup import CARDS, create_card_deck, distribute_cards
+from engine import GameEngine
+from game_manager import GameManager
+from mansion import Mansion
+from player import Player
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PLAYERS = ["P1", "P2", "P3"]
+ROOM_CARDS = [card for card in CARDS if card.card_type == 'room']
+
+
+def setup_game():
+    GameManager(random.Random(0)).setup_game(PLAYERS, visualize=False)
+
+
+def build_mansion():
+    Mansion(ROOM_CARDS)
+
+
+def deal():
+    deck = create_card_deck(random.Random(0))
+    distribute_cards([Player(name, None) for name in PLAYERS], deck)
+
+
+# Make an engine whose current player stands in the given room, for scripted turns.
+def engine_in_room(room_name):
+    engine = GameEngine(PLAYERS, seed=0)
+    room = engine.game.mansion.get_room(room_name)
+    engine.current_player.move(room, engine.game.get_coordinates(room))
+    return engine
+
+
+# Scripted turns, given a fresh engine per call. Only the step is timed.
+def move_turn(engines):
+    for engine in engines:
+        engine.step(("move", engine.current_player.current_coordinates))
+
+
+def suggest_turn(engines):
+    for engine in engines:
+        engine.step(("suggest", "Miss Scarlet", "Knife"))
+
+
+def accuse_turn(engines):
+    for engine in engines:
+        engine.step(("accuse", "Kitchen", "Miss Scarlet", "Knife"))
+
+
+def secret_turn(engines):
+    for engine in engines:
+        engine.step(("secret",))
+
+
+def full_game():
+    rng = random.Random(0)
+    engine = GameEngine(PLAYERS, rng=rng)
+    engine.run([BotAgent(random.Random(rng.getrandbits(64))) for _ in PLAYERS])
+
+
+# Benchmarks by name: the function, and for scripted turns the engines prepared for each call.
+BENCHMARKS = {
+    "setup_game": (setup_game, None),
+    "mansion": (build_mansion, None),
+    "deal": (deal, None),
+    "turn_move": (move_turn, lambda: GameEngine(PLAYERS, seed=0)),
+    "turn_suggest": (suggest_turn, lambda: engine_in_room("Kitchen")),
+    "turn_accuse": (accuse_turn, lambda: GameEngine(PLAYERS, seed=0)),
+    "turn_secret": (secret_turn, lambda: engine_in_room("Study")),
+    "full_game": (full_game, None),
+}
+
+
+# Best mean seconds per call over rounds of calls, with enough calls per round to take about min_time.
+# Scripted turns need a fresh engine per call, so they run a fixed number of prepared engines per round.
+def measure(func, prepare, rounds=5, min_time=0.05, prepared_calls=200):
+    if prepare is not None:
+        best = None
+        for _ in range(rounds * 4):
+            engines = [prepare() for _ in range(prepared_calls)]
+            start = time.perf_counter()
+            func(engines)
+            elapsed = (time.perf_counter() - start) / prepared_calls
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def run(calls):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        return time.perf_counter() - start
+
+    calls = 1
+    while run(calls) < min_time:
+        calls *= 4
+    return min(run(calls) / calls for _ in range(rounds))
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare with the baselines.")
+    parser.add_argument("-k", dest="pattern", default="", help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown, e.g. 0.15 for 15%%.")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baselines.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file.")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baseline)
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<14} {'time (us)':>12} {'baseline':>12} {'change':>8}")
+    for name, (func, prepare) in BENCHMARKS.items():
+        if args.pattern not in name:
+            continue
+        seconds = results[name] = measure(func, prepare, args.rounds)
+        baseline = baselines.get(name)
+        change = seconds / baseline - 1 if baseline else None
+        flag = ""
+        if change is not None and change > args.threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        baseline_text = f"{baseline * 1e6:.2f}" if baseline else "-"
+        change_text = f"{change:+.1%}" if change is not None else "-"
+        print(f"{name:<14} {seconds * 1e6:>12.2f} {baseline_text:>12} {change_text:>8}{flag}")
+
+    if args.save:
+        baselines.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Saved {len(results)} baselines to {args.baseline}.")
+    elif regressions:
+        print(f"{len(regressions)} benchmarks are more than {args.threshold:.0%} slower than their baselines: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
@@ -1,28 +1,144 @@
 import random
 
 class Card:
-    def __init__(self, name, card_type):
+    # Cards are small fixed records, so __slots__ keeps them compact.
+    __slots__ = ("name", "card_type", "card_id", "bit")
+
+    def __init__(self, name, card_type, card_id=None):
         # Initializes a card with a name and type (character, weapon, or room).
         self.name = name
         self.card_type = card_type
+        # Number of the card in the deck and its bit in card masks (0 for cards outside the deck).
+        self.card_id = card_id
+        self.bit = 1 << card_id if card_id is not None else 0
 
     def __repr__(self):
         # Provides a string representation of the card for debugging.
         return f"Card({self.name}, Type: {self.card_type})"
 
-# Creates a deck of Cluedo cards categorized by characters, weapons, and rooms.
-def create_card_deck():
-    characters = ["Miss Scarlet", "Colonel Mustard", "Mrs. White", "Mr. Green", "Mrs. Peacock", "Professor Plum"]
-    weapons = ["Knife", "Candlestick", "Revolver", "Rope", "Lead Pipe", "Wrench"]
-    rooms = ["Kitchen", "Ballroom", "Conservatory", "Dining Room", "Lounge", "Hall", "Study", "Library", "Billiard Room"]
+# The cards of each type, in a fixed order used to number them.
+CHARACTERS = ["Miss Scarlet", "Colonel Mustard", "Mrs. White", "Mr. Green", "Mrs. Peacock", "Professor Plum"]
+WEAPONS = ["Knife", "Candlestick", "Revolver", "Rope", "Lead Pipe", "Wrench"]
+ROOMS = ["Kitchen", "Ballroom", "Conservatory", "Dining Room", "Lounge", "Hall", "Study", "Library", "Billiard Room"]
+CARD_NAMES = CHARACTERS + WEAPONS + ROOMS
+
+
+class Deck:
+    """
+    The character, weapon and room cards a game is played with.
+
+    Cards are numbered characters first, then weapons, then rooms, and hands, suggestions and the
+    solution are integer masks with bit card_id set for each card. The standard deck (STANDARD_DECK)
+    has the 21 cards of the board game; custom decks can have any number of cards of each type, as
+    long as the board has a place for every room. Card names are matched case-insensitively.
+    """
+
+    def __init__(self, characters, weapons, rooms):
+        self.characters = list(characters)
+        self.weapons = list(weapons)
+        self.rooms = list(rooms)
+        self.names = self.characters + self.weapons + self.rooms  # Card names by card ID.
+        # One Card object per card, indexed by card ID. These are the readable view of a mask.
+        self.cards = tuple(
+            Card(name, card_type, card_id)
+            for card_id, (name, card_type) in enumerate(
+                [(name, 'character') for name in self.characters] +
+                [(name, 'weapon') for name in self.weapons] +
+                [(name, 'room') for name in self.rooms]
+            )
+        )
+        self.ids = {card.name.lower(): card.card_id for card in self.cards}  # Card IDs by lowercase name.
+        # Card IDs by lowercase name, for each card type.
+        self.type_ids = {card_type: {} for card_type in ('character', 'weapon', 'room')}
+        for card in self.cards:
+            self.type_ids[card.card_type][card.name.lower()] = card.card_id
+        self.type_masks = {card_type: 0 for card_type in ('character', 'weapon', 'room')}  # Mask of each card type.
+        for card in self.cards:
+            self.type_masks[card.card_type] |= card.bit
+        if len(self.ids) != len(self.cards):
+            raise ValueError("Every card in a deck needs a different name.")
+        if not (self.characters and self.weapons and self.rooms):
+            raise ValueError("A deck needs at least one character, one weapon and one room.")
+
+    # Make a deck of the standard cards plus numbered ones ("Character 7", "Weapon 8", "Room 10"), or fewer
+    # cards of a type than the standard deck has.
+    @classmethod
+    def numbered(cls, characters=len(CHARACTERS), weapons=len(WEAPONS), rooms=len(ROOMS)):
+        def names(standard, kind, count):
+            return standard[:count] + [f"{kind} {number}" for number in range(len(standard) + 1, count + 1)]
+        return cls(names(CHARACTERS, "Character", characters), names(WEAPONS, "Weapon", weapons),
+                   names(ROOMS, "Room", rooms))
+
+    def __len__(self):
+        return len(self.cards)
+
+    # Get the mask of a collection of card names (in any case). Names that are not cards are ignored.
+    def names_mask(self, names):
+        mask = 0
+        for name in names:
+            card_id = self.ids.get(name.lower())
+            if card_id is not None:
+                mask |= 1 << card_id
+        return mask
+
+    # Check whether a name (in lowercase) is one of the cards set in a mask.
+    def in_mask(self, name, mask):
+        card_id = self.ids.get(name)
+        return card_id is not None and bool(mask >> card_id & 1)
 
+    # Get the Card objects set in a mask, lowest card ID first.
+    def mask_cards(self, mask):
+        return [self.cards[card_id] for card_id in mask_card_ids(mask)]
+
+    # Get the Card with the lowest ID set in a mask.
+    def lowest_card(self, mask):
+        return self.cards[(mask & -mask).bit_length() - 1]
+
+
+STANDARD_DECK = Deck(CHARACTERS, WEAPONS, ROOMS)
+
+# The cards of the standard deck, indexed by card ID.
+CARDS = STANDARD_DECK.cards
+
+# Card IDs of the standard deck by lowercase card name.
+CARD_IDS = STANDARD_DECK.ids
+
+# Get the mask of a collection of card IDs.
+def card_mask(card_ids):
+    mask = 0
+    for card_id in card_ids:
+        mask |= 1 << int(card_id)
+    return mask
+
+# Get the mask of a collection of standard card names (in any case). Names that are not cards are ignored.
+def names_mask(names):
+    return STANDARD_DECK.names_mask(names)
+
+# Get the card IDs set in a mask, lowest first.
+def mask_card_ids(mask):
+    card_ids = []
+    while mask:
+        low_bit = mask & -mask
+        card_ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return card_ids
+
+# Get the standard Card objects set in a mask, lowest card ID first.
+def mask_cards(mask):
+    return STANDARD_DECK.mask_cards(mask)
+
+# Get the standard Card with the lowest ID set in a mask.
+def lowest_card(mask):
+    return STANDARD_DECK.lowest_card(mask)
+
+# Creates a deck of Cluedo cards categorized by characters, weapons, and rooms.
+# The deck is shuffled with the given random source (the global random module by default).
+def create_card_deck(rng=random, deck=STANDARD_DECK):
     # Creating the card deck
-    cards = [Card(name, 'character') for name in characters] + \
-            [Card(name, 'weapon') for name in weapons] + \
-            [Card(name, 'room') for name in rooms]
+    cards = list(deck.cards)
 
     # Shuffle the cards
-    random.shuffle(cards)
+    rng.shuffle(cards)
     return cards
 
 # Distribute cards among players
@@ -0,0 +1,304 @@
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from card_setup import STANDARD_DECK, Deck
+from dice import BlockDice
+from engine import GameEngine
+
+# A checkpoint file holds MAGIC, a JSON header with everything needed to deal the game again (players, seed,
+# layout and deck), then one RECORD per action and per cursor move.
+
+# Kinds of record.
+#   STEP     node = parent of the new node, then the acting seat, its state before and after, and the seen card
+#   MOVE_TO  node = node the cursor moved to by undo, redo or goto
+STEP, MOVE_TO = range(2)
+
+# Value of a field that does not apply: a player off the board or no card seen.
+NONE = 0xFFFF
+# Seat of nobody, for the winner of a game nobody has won.
+NO_SEAT = 0xFF
+
+# State of the engine and the acting player: seat whose turn it is, roll waiting to be spent (0 if none),
+# turns, game over, winner seat, players eliminated, dice rolls taken, (row, column) and whether active.
+STATE = "BBIBBBIHHB"
+RECORD = struct.Struct("<BIB" + STATE + STATE + "H")
+STATE_FIELDS = len(STATE)
+ENGINE_FIELDS = 7  # Leading fields of STATE that belong to the engine rather than the player.
+
+MAGIC = b"CLUECKP1"
+HEADER_SIZE = struct.Struct("<I")
+
+
+class CheckpointStore:
+    """
+    A game played through GameEngine with per-action undo, redo and branches, optionally saved to a file.
+
+    store.engine is the game; play it with store.step(action) instead of store.engine.step(action).
+    store.node is the current node (0 is the dealt game) and store.parents[node] its parent. Taking an
+    action after an undo starts a new branch rather than discarding the old one.
+
+    Only the acting player changes during an action, so each node keeps a fixed-size delta of the
+    engine's and that player's state before and after it, and undo and redo cost the same at any point
+    of a long session. The dice are a dice.BlockDice keyed by the seed, so their state is just the
+    number of rolls taken. Agents and the game's event log are not rewound.
+    """
+
+    # An existing checkpoint file at path is only replaced with overwrite=True; otherwise FileExistsError is raised.
+    def __init__(self, player_names, seed=0, layout=None, deck=STANDARD_DECK, path=None, fsync=False,
+                 overwrite=False, _header=True):
+        if layout is not None and not isinstance(layout, (str, dict)):
+            raise ValueError("A checkpointed game needs a layout file name or spec, or None.")
+        self.player_names = list(player_names)
+        self.seed = seed
+        self.layout = layout
+        self.deck = deck
+        self.engine = GameEngine(self.player_names, seed=seed, layout=layout, deck=deck, dice=BlockDice(seed))
+        self.node = 0  # Current node.
+        self.parents = [None]  # Parent of each node.
+        self.depths = [0]  # Number of actions from the dealt game to each node.
+        self.children = [[]]  # Nodes branching from each node, oldest first.
+        self.deltas = [None]  # Packed STEP record of the action leading to each node.
+        self._redo = {}  # Node that redo() moves to from each node: the last one left by undo or created.
+        self._engine_state = self._state(0)[:ENGINE_FIELDS]  # Engine fields of STATE at the current node.
+        self.path = path
+        self.fsync = fsync  # Whether the writer waits for each write to reach the disk.
+        self.file = None
+        self._buffer = bytearray()  # Records not handed to the writer yet.
+        self._writer = None
+        self._pending = None  # Write in progress, if any.
+        if path is not None:
+            self.file = open(path, ("wb" if overwrite else "xb") if _header else "r+b")
+            if _header:
+                self.file.write(MAGIC)
+                header = json.dumps(self._header()).encode("utf-8")
+                self.file.write(HEADER_SIZE.pack(len(header)) + header)
+                self.file.flush()
+            self._writer = ThreadPoolExecutor(max_workers=1)
+
+    # Take an action for the current player (see GameEngine.step) and record what it changed as a new node.
+    # Rejected actions are not recorded. A roll taken before the action (agents call engine.roll() to choose
+    # a move, and a rejected move keeps its roll) belongs to the next accepted action, so undoing that
+    # action puts the roll back too.
+    def step(self, action):
+        engine = self.engine
+        seat = engine.current_player_index
+        player = engine.players[seat]
+        before = self._engine_state + self._state(seat)[ENGINE_FIELDS:]
+        seen = len(player.seen_cards)
+        result = engine.step(action)
+        if not result["accepted"]:
+            return result
+        after = self._state(seat)
+        self._engine_state = after[:ENGINE_FIELDS]
+        card = player.seen_cards[-1].card_id if len(player.seen_cards) > seen else NONE
+        delta = RECORD.pack(STEP, self.node, seat, *before, *after, card)
+        node = len(self.parents)
+        self.parents.append(self.node)
+        self.depths.append(self.depths[self.node] + 1)
+        self.children.append([])
+        self.children[self.node].append(node)
+        self.deltas.append(delta)
+        self._redo[self.node] = node
+        self.node = node
+        self._write(delta)
+        return result
+
+    # Go back to the state before the last action. Raises ValueError at the dealt game.
+    def undo(self):
+        if self.node == 0:
+            raise ValueError("There is nothing to undo.")
+        self._undo()
+        self._write_move()
+
+    # Take the undone action again, or the action leading to the given child of the current node.
+    def redo(self, node=None):
+        if node is None:
+            node = self._redo.get(self.node)
+            if node is None:
+                raise ValueError("There is nothing to redo.")
+        elif not 0 < node < len(self.parents) or self.parents[node] != self.node:
+            raise ValueError(f"Node {node} does not follow the current node {self.node}.")
+        self._redo_to(node)
+        self._write_move()
+
+    # Move to any node, undoing back to the common ancestor and redoing down from it.
+    def goto(self, node):
+        if not 0 <= node < len(self.parents):
+            raise ValueError(f"There is no node {node}.")
+        ups, downs = self.route(self.node, node)
+        for _ in ups:
+            self._undo()
+        for child in downs:
+            self._redo_to(child)
+        if ups or downs:
+            self._write_move()
+
+    # Get the nodes branching from a node (the current one by default), oldest first.
+    def branches(self, node=None):
+        return list(self.children[self.node if node is None else node])
+
+    # Get the nodes undone to go from one node to another, in order, and the nodes redone after them.
+    def route(self, start, end):
+        ups, downs = [], []
+        while self.depths[start] > self.depths[end]:
+            ups.append(start)
+            start = self.parents[start]
+        while self.depths[end] > self.depths[start]:
+            downs.append(end)
+            end = self.parents[end]
+        while start != end:
+            ups.append(start)
+            downs.append(end)
+            start, end = self.parents[start], self.parents[end]
+        downs.reverse()
+        return ups, downs
+
+    # Wait until every record so far is in the file.
+    def flush(self):
+        if self._writer is None:
+            return
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+        if self._buffer:
+            self._writer.submit(self._write_out, bytes(self._buffer)).result()
+            self._buffer.clear()
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.shutdown()
+        self._writer = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Deal the game saved in a checkpoint file again and move to where it was left, to keep playing
+    # and recording into the same file. A record cut short by a crash is dropped.
+    @classmethod
+    def resume(cls, path, fsync=False):
+        with open(path, "rb") as file:
+            data = file.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a checkpoint file.")
+        start = len(MAGIC) + HEADER_SIZE.size
+        if len(data) < start:
+            raise ValueError(f"The checkpoint file '{path}' has no header.")
+        header_size, = HEADER_SIZE.unpack_from(data, len(MAGIC))
+        header = json.loads(data[start:start + header_size])
+        start += header_size
+        layout = header["layout"]
+        if isinstance(layout, dict):
+            layout = dict(layout, rooms=tuple(map(tuple, layout["rooms"])), start=tuple(layout["start"]),
+                          secret_passages=tuple(map(tuple, layout.get("secret_passages", ()))))
+        deck = Deck(header["characters"], header["weapons"], header["rooms"])
+        store = cls(header["players"], header["seed"], layout, deck, path, fsync, _header=False)
+
+        end = start + (len(data) - start) // RECORD.size * RECORD.size
+        cursor = 0
+        for offset in range(start, end, RECORD.size):
+            kind, node = struct.unpack_from("<BI", data, offset)
+            if kind == STEP:
+                store.parents.append(node)
+                store.depths.append(store.depths[node] + 1)
+                store.children.append([])
+                cursor = len(store.parents) - 1
+                store.children[node].append(cursor)
+                store.deltas.append(data[offset:offset + RECORD.size])
+                store._redo[node] = cursor
+            else:
+                for left in store.route(cursor, node)[0]:
+                    store._redo[store.parents[left]] = left
+                cursor = node
+        for node in store.route(0, cursor)[1]:
+            store._redo_to(node)
+        store.file.truncate(end)
+        store.file.seek(end)
+        return store
+
+    # Everything needed to deal the game again, for the file header.
+    def _header(self):
+        return {"players": self.player_names, "seed": self.seed, "layout": self.layout,
+                "characters": self.deck.characters, "weapons": self.deck.weapons, "rooms": self.deck.rooms}
+
+    # The fields of STATE for the engine and the player in a seat.
+    def _state(self, seat):
+        engine = self.engine
+        game = engine.game
+        player = game.players[seat]
+        r, c = player.current_coordinates or (NONE, NONE)
+        return (engine.current_player_index, engine.dice_roll or 0, engine.turns, engine.game_over,
+                NO_SEAT if engine.winner is None else game.seats[engine.winner], game.num_players_elim,
+                game.dice.rolls, r, c, player.is_active)
+
+    # Put the engine and the player in a seat back into a STATE.
+    def _restore(self, seat, state):
+        engine = self.engine
+        game = engine.game
+        current, dice_roll, turns, game_over, winner, eliminated, rolls, r, c, active = state
+        self._engine_state = state[:ENGINE_FIELDS]
+        engine.current_player_index = current
+        engine.dice_roll = dice_roll or None
+        engine.turns = turns
+        engine.game_over = bool(game_over)
+        engine.winner = None if winner == NO_SEAT else game.players[winner]
+        game.num_players_elim = eliminated
+        if game.dice.rolls != rolls:
+            game.dice.seek(rolls)
+        player = game.players[seat]
+        if r == NONE:
+            player.move(None, None)
+        else:
+            player.move(game.mansion.grid[r][c], (r, c))
+        player.is_active = bool(active)
+
+    # Undo the action leading to the current node, without recording it.
+    def _undo(self):
+        node = self.node
+        fields = RECORD.unpack(self.deltas[node])
+        seat, card = fields[2], fields[-1]
+        self._restore(seat, fields[3:3 + STATE_FIELDS])
+        if card != NONE:
+            player = self.engine.players[seat]
+            player.seen_cards.pop()
+            player.known_mask &= ~self.deck.cards[card].bit
+        self.node = self.parents[node]
+        self._redo[self.node] = node
+
+    # Take the action leading to a child of the current node again, without recording it.
+    def _redo_to(self, node):
+        fields = RECORD.unpack(self.deltas[node])
+        seat, card = fields[2], fields[-1]
+        self._restore(seat, fields[3 + STATE_FIELDS:-1])
+        if card != NONE:
+            self.engine.players[seat].add_seen_card(self.deck.cards[card])
+        self.node = node
+
+    def _write_move(self):
+        self._write(RECORD.pack(MOVE_TO, self.node, 0, *[0] * (2 * STATE_FIELDS), 0))
+
+    # Queue a record for the writer thread, so step() never waits for the disk. Records queued while a write is
+    # in progress are handed over together with the next one.
+    def _write(self, record):
+        if self._writer is None:
+            return
+        self._buffer += record
+        if self._pending is None or self._pending.done():
+            if self._pending is not None:
+                self._pending.result()
+            self._pending = self._writer.submit(self._write_out, bytes(self._buffer))
+            self._buffer.clear()
+
+    # Runs on the writer thread.
+    def _write_out(self, data):
+        self.file.write(data)
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
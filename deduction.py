@@ -0,0 +1,256 @@
+from itertools import combinations, product
+
+import numpy as np
+
+from card_setup import CARD_NAMES, STANDARD_DECK, card_mask
+
+
+# Get the card IDs of each type of a deck (see card_setup.Deck): characters, weapons, then rooms.
+def deck_categories(deck):
+    characters, weapons = len(deck.characters), len(deck.weapons)
+    return (
+        np.arange(0, characters),
+        np.arange(characters, characters + weapons),
+        np.arange(characters + weapons, len(deck)),
+    )
+
+
+# Card IDs of each type in the standard deck. The envelope holds exactly one card of each.
+CATEGORIES = deck_categories(STANDARD_DECK)
+
+# Largest number of unresolved "holds one of" constraints solution_probabilities will enumerate.
+MAX_CLAUSES = 12
+
+
+# Unpack bitmask rows into a boolean matrix with one column per card.
+def unpack_bits(rows, num_cards):
+    num_bytes = (num_cards + 7) // 8
+    packed = np.frombuffer(b"".join(row.to_bytes(num_bytes, "little") for row in rows), dtype=np.uint8)
+    return np.unpackbits(packed.reshape(len(rows), num_bytes), axis=1, bitorder="little")[:, :num_cards].astype(bool)
+
+
+class Knowledge:
+    """
+    What one player can deduce about who holds each card.
+
+    Owners are numbered by seat, with the envelope last (owner == num_players). For every owner the
+    knowledge keeps two card bitmasks: cards the owner holds and cards the owner cannot hold, plus
+    "holds at least one of" clauses for suggestions disproved with a card this player did not see.
+    Every observation sets the new bits and propagates the consequences until nothing changes, which
+    takes a few microseconds. The has and hasnt properties give the same state as NumPy boolean
+    owner x card matrices for vectorized work such as solution_probabilities.
+
+    The cards are those of the standard deck unless num_cards, categories and names are given;
+    for_deck fills them in from a card_setup.Deck.
+    """
+
+    def __init__(self, num_players, seat, hand, hand_sizes, num_cards=len(CARD_NAMES), categories=CATEGORIES,
+                 names=CARD_NAMES):
+        self.num_players = num_players
+        self.seat = seat  # Seat of the player doing the deducing.
+        self.envelope = num_players  # Owner index of the solution envelope.
+        self.num_cards = num_cards
+        self.categories = categories  # Card IDs of each type.
+        self.names = names  # Card names by card ID.
+        self.hand_sizes = list(hand_sizes) + [len(categories)]  # Cards held by each owner.
+        self.all_cards = (1 << num_cards) - 1
+        self.category_bits = [card_mask(category) for category in categories]
+        self.has_bits = [0] * (num_players + 1)  # Cards each owner is known to hold.
+        self.hasnt_bits = [0] * (num_players + 1)  # Cards each owner is known not to hold.
+        self.clauses = []  # (seat, card bitmask) pairs: the seat holds at least one of the cards.
+        self.wrong_accusations = set()  # Card index triples known not to be the solution.
+
+        own_cards = card_mask(card.card_id for card in hand)
+        self.has_bits[seat] = own_cards
+        self.hasnt_bits[seat] = self.all_cards & ~own_cards
+        self.propagate()
+
+    # Make the knowledge of a player in a game played with the given deck.
+    @classmethod
+    def for_deck(cls, deck, num_players, seat, hand, hand_sizes):
+        return cls(num_players, seat, hand, hand_sizes, len(deck), deck_categories(deck), deck.names)
+
+    @property
+    def has(self):
+        return unpack_bits(self.has_bits, self.num_cards)
+
+    @property
+    def hasnt(self):
+        return unpack_bits(self.hasnt_bits, self.num_cards)
+
+    # Record a suggestion of the given card IDs.
+    # passed are the seats that could not disprove it; shown is the card ID if this player saw it.
+    def observe_suggestion(self, suggester, cards, disprover=None, shown=None, passed=()):
+        suggested = card_mask(cards)
+        has, hasnt = self.has_bits, self.hasnt_bits
+        changed = False
+        for seat in passed:
+            if suggested & ~hasnt[seat]:
+                hasnt[seat] |= suggested
+                changed = True
+        if disprover is not None:
+            if shown is not None:
+                if not has[disprover] >> shown & 1:
+                    has[disprover] |= 1 << shown
+                    changed = True
+            elif disprover != self.seat and not has[disprover] & suggested:
+                self.clauses.append((disprover, suggested))
+                changed = True
+        # Observations that add nothing new cannot lead to new deductions.
+        if changed:
+            self.propagate()
+
+    # Record an accusation of the given card IDs.
+    def observe_accusation(self, player, cards, correct):
+        if correct:
+            self.has_bits[self.envelope] |= card_mask(cards)
+        else:
+            self.wrong_accusations.add(tuple(sorted(int(card) for card in cards)))
+        self.propagate()
+
+    # Apply every deduction rule until the bitmasks stop changing.
+    def propagate(self):
+        has, hasnt, sizes = self.has_bits, self.hasnt_bits, self.hand_sizes
+        all_cards, envelope = self.all_cards, self.envelope
+        owners = range(len(has))
+        while True:
+            before = has + hasnt
+
+            # A card has exactly one owner.
+            owned = 0
+            for bits in has:
+                owned |= bits
+            once = twice = 0
+            for owner in owners:
+                hasnt[owner] |= owned & ~has[owner]
+                possible = all_cards & ~hasnt[owner]
+                twice |= once & possible
+                once |= possible
+            single = once & ~twice
+            if single:
+                for owner in owners:
+                    has[owner] |= single & ~hasnt[owner]
+
+            # A full hand holds nothing else, and a hand with just enough candidates holds all of them.
+            for owner in owners:
+                if has[owner].bit_count() == sizes[owner]:
+                    hasnt[owner] |= all_cards & ~has[owner]
+                possible = all_cards & ~hasnt[owner]
+                if possible.bit_count() == sizes[owner]:
+                    has[owner] |= possible
+
+            # The envelope holds exactly one card of each type.
+            for category in self.category_bits:
+                if has[envelope] & category:
+                    hasnt[envelope] |= category & ~has[envelope]
+                candidates = category & ~hasnt[envelope]
+                if candidates == 0:
+                    raise ValueError("The observations contradict each other: no solution is possible.")
+                if candidates & (candidates - 1) == 0:
+                    has[envelope] |= candidates
+
+            # Clauses are satisfied once the seat holds one of the cards, and force the last candidate.
+            if self.clauses:
+                remaining = []
+                for seat, cards in self.clauses:
+                    if has[seat] & cards:
+                        continue
+                    candidates = cards & ~hasnt[seat]
+                    if candidates == 0:
+                        raise ValueError("The observations contradict each other: a disprover holds none of the cards.")
+                    if candidates & (candidates - 1) == 0:
+                        has[seat] |= candidates
+                    else:
+                        remaining.append((seat, candidates))
+                self.clauses = remaining
+
+            if has + hasnt == before:
+                break
+
+        if any(has[owner] & hasnt[owner] for owner in owners):
+            raise ValueError("The observations contradict each other: a card is both held and not held.")
+
+    # Get the solution as card names once it is certain, otherwise None.
+    def known_solution(self):
+        envelope = self.has_bits[self.envelope]
+        if envelope.bit_count() < len(self.categories):
+            return None
+        return tuple(self.names[card] for card in range(self.num_cards) if envelope >> card & 1)
+
+    # Get the card IDs that may still be in the envelope.
+    def possible_solution_cards(self):
+        possible = self.all_cards & ~self.hasnt_bits[self.envelope]
+        return [card for card in range(self.num_cards) if possible >> card & 1]
+
+    # Get the owners (seats, or the envelope index) that may still hold a card.
+    def possible_owners(self, card):
+        return [owner for owner, bits in enumerate(self.hasnt_bits) if not bits >> card & 1]
+
+    # Compute the exact probability that each card is in the envelope.
+    # Every deal of the unknown cards consistent with the observations is counted equally.
+    def solution_probabilities(self):
+        candidates = self._solution_candidates()
+        counts = self._count_deals(candidates)
+        total = counts.sum()
+        if total == 0:
+            raise ValueError("The observations contradict each other: no deal is consistent with them.")
+        probabilities = np.zeros(self.num_cards)
+        np.add.at(probabilities, candidates.ravel(), np.repeat(counts / total, candidates.shape[1]))
+        return probabilities
+
+    # Get every (character, weapon, room) triple that may still be the solution.
+    def _solution_candidates(self):
+        envelope_hasnt = self.hasnt[self.envelope]
+        possible = [category[~envelope_hasnt[category]] for category in self.categories]
+        candidates = np.array(list(product(*possible)), dtype=np.int64).reshape(-1, len(self.categories))
+        if self.wrong_accusations:
+            keep = [tuple(sorted(candidate)) not in self.wrong_accusations for candidate in candidates.tolist()]
+            candidates = candidates[np.array(keep, dtype=bool)]
+        return candidates
+
+    # Count, for each candidate solution, the deals of the remaining cards to the players.
+    # Clauses are handled by inclusion-exclusion over the deals in which they are broken.
+    def _count_deals(self, candidates):
+        if len(self.clauses) > MAX_CLAUSES:
+            raise ValueError(f"Too many unresolved clauses to count exactly ({len(self.clauses)} > {MAX_CLAUSES}).")
+        counts = np.zeros(len(candidates))
+        for size in range(len(self.clauses) + 1):
+            for broken in combinations(self.clauses, size):
+                forbidden = self.hasnt_bits[:self.num_players]
+                for seat, cards in broken:
+                    forbidden[seat] |= cards
+                counts += (-1) ** size * self._count_deals_forbidding(candidates, forbidden)
+        return counts
+
+    # Count deals for each candidate solution where no player gets a card set in their forbidden bitmask.
+    # The deals are built one card at a time as a table of ways to reach each combination of hand counts.
+    def _count_deals_forbidding(self, candidates, forbidden):
+        players = self.num_players
+        has = self.has
+        forbidden = unpack_bits(forbidden, self.num_cards)
+
+        # Cards with a known owner just use up a place in that owner's hand.
+        sizes = np.array(self.hand_sizes[:players]) - has[:players].sum(axis=1)
+        unknown = np.flatnonzero(~has.any(axis=0))
+
+        # The last player's count is implied by the others', so the table has one axis fewer.
+        in_solution = np.zeros((len(candidates), self.num_cards), dtype=bool)
+        in_solution[np.arange(len(candidates))[:, None], candidates] = True
+        table = np.zeros((len(candidates),) + tuple(sizes[:-1] + 1))
+        table[(slice(None),) + (0,) * (players - 1)] = 1.0
+
+        for card in unknown:
+            dealt = np.zeros_like(table)
+            for seat in np.flatnonzero(~forbidden[:, card]):
+                if seat == players - 1:
+                    dealt += table
+                else:
+                    source = [slice(None)] * table.ndim
+                    target = [slice(None)] * table.ndim
+                    source[seat + 1] = slice(None, -1)
+                    target[seat + 1] = slice(1, None)
+                    dealt[tuple(target)] += table[tuple(source)]
+            keep = in_solution[:, card].reshape((-1,) + (1,) * (players - 1))
+            table = np.where(keep, table, dealt)
+
+        return table[(slice(None),) + tuple(sizes[:-1])]
@@ -0,0 +1,102 @@
+# Dice streams for GameManager(dice=...). A stream only needs a roll() method returning the total of two
+# six-sided dice; NumPy is only imported when a BlockDice first rolls.
+
+_MASK64 = (1 << 64) - 1
+
+# Total of two dice for each of the 36 equally likely outcomes.
+_TOTALS = [first + second + 2 for first in range(6) for second in range(6)]
+
+# Philox generator and NumPy copy of _TOTALS, shared by every BlockDice in the process and made on first use.
+# Each block sets the generator's key and counter before drawing, so streams never see each other's draws.
+_philox = None
+_totals = None
+
+
+# Get the rolls [start, start + size) of the stream keyed by (seed, stream) as a NumPy array.
+# Philox makes four 64-bit outputs per counter value, so start must be a multiple of 4.
+def philox_rolls(seed, stream, start, size):
+    global _philox, _totals
+    import numpy as np
+
+    if _philox is None:
+        _philox = np.random.Philox(key=0)
+        _totals = np.array(_TOTALS, dtype=np.uint8)
+    _philox.state = {
+        "bit_generator": "Philox",
+        "state": {"counter": np.array([start // 4, 0, 0, 0], dtype=np.uint64),
+                  "key": np.array([seed, stream], dtype=np.uint64)},
+        "buffer": np.zeros(4, dtype=np.uint64), "buffer_pos": 4, "has_uint32": 0, "uinteger": 0,
+    }
+    return _totals[_philox.random_raw(size) % 36]
+
+
+class BlockDice:
+    """
+    Rolls of two six-sided dice, generated in blocks with NumPy.
+
+    Rolls come from the counter-based Philox generator keyed by (seed, stream): roll n of a stream is
+    a function of the key and n alone, so the same game seed gives the same rolls in any process and
+    streams with different keys are independent. Each block maps raw 64-bit outputs to totals in one
+    vectorized step, and roll() then just takes the next total from a list. Blocks start small and
+    double up to block_size, so short games do not pay for rolls they never use; the rolls do not
+    depend on the block sizes. Making a BlockDice does no NumPy work until the first roll.
+    """
+
+    def __init__(self, seed=0, stream=0, block_size=4096):
+        self.seed = seed & _MASK64
+        self.stream = stream & _MASK64
+        self.block_size = max(block_size // 4 * 4, 4)  # Largest number of rolls generated at once.
+        self.rolls = 0  # Rolls taken so far.
+        self._generated = 0  # Rolls generated so far.
+        self._next_size = min(64, self.block_size)  # Size of the next block.
+        self._block = iter(())  # Rolls generated and not yet taken.
+
+    # Take the next roll, generating another block when this one is used up.
+    def roll(self):
+        for value in self._block:
+            self.rolls += 1
+            return value
+        self._block = iter(self.block(self._next_size).tolist())
+        self._next_size = min(self._next_size * 2, self.block_size)
+        return self.roll()
+
+    # Go back or forward in the stream, as if exactly the given number of rolls had been taken.
+    def seek(self, rolls):
+        self.rolls = rolls
+        self._generated = rolls - rolls % 4
+        self._next_size = min(64, self.block_size)
+        self._block = iter(self.block(self._next_size).tolist()[rolls % 4:])
+        self._next_size = min(self._next_size * 2, self.block_size)
+
+    # Generate the next size rolls at once as a NumPy array, for callers that want many (a multiple of 4).
+    # They are skipped by roll().
+    def block(self, size):
+        rolls = philox_rolls(self.seed, self.stream, self._generated, size)
+        self._generated += size
+        return rolls
+
+
+class ScriptedDice:
+    """
+    Dice that roll a given sequence of totals, for tests.
+
+    Raises ValueError once the script runs out, so a test notices when a game rolls more than expected.
+    """
+
+    def __init__(self, rolls):
+        rolls = list(rolls)
+        for total in rolls:
+            if not 2 <= total <= 12:
+                raise ValueError(f"Impossible roll of two dice: {total}.")
+        self.script = rolls
+        self.rolls = 0  # Rolls taken so far.
+
+    # Go back or forward in the script, as if exactly the given number of rolls had been taken.
+    def seek(self, rolls):
+        self.rolls = rolls
+
+    def roll(self):
+        if self.rolls >= len(self.script):
+            raise ValueError(f"The scripted dice ran out after {self.rolls} rolls.")
+        self.rolls += 1
+        return self.script[self.rolls - 1]
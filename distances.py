@@ -0,0 +1,168 @@
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# Marks tiles that cannot be reached from a source tile, in tables of boards with up to 255 tiles.
+# Larger boards use wider distances, and their tables mark unreachable tiles with the largest value instead.
+UNREACHABLE = 255
+
+# Largest total of two six-sided dice.
+MAX_ROLL = 12
+
+# Largest board whose full table is written to the compiled board cache (see layout.write_compiled).
+FULL_TABLE_TILES = 1024
+
+# Memory kept for the rows of a table built one source at a time.
+ROW_CACHE_BYTES = 1 << 25
+
+# Distance tables already built, keyed by the structure of the board they describe.
+_cache = OrderedDict()
+_CACHE_SIZE = 64
+
+
+class DistanceTable:
+    """
+    Shortest path lengths over the mansion's tile graph.
+
+    Tiles are numbered row by row (index = row * cols + col). Distances are the number of steps through
+    connected tiles, where a move may start in a room but must end when it enters one. The row of a source
+    tile (its distance to every tile, and its tiles sorted by distance so the tiles reachable with a given
+    roll are a slice) is built by one breadth-first search the first time the source is asked about, and
+    kept while the rows fit in ROW_CACHE_BYTES; full() builds every row at once. Moves go both ways, so the
+    row of a room also holds the distance from every tile to it.
+    """
+
+    def __init__(self, neighbors, blocking, max_roll=MAX_ROLL):
+        num_tiles = len(neighbors)
+        self.neighbors = neighbors  # Indices of the tiles connected to each tile.
+        self.blocking = blocking  # Whether each tile ends a move that enters it (rooms and the start).
+        self.max_roll = max_roll
+        self.num_tiles = num_tiles
+        self.dtype = np.uint8 if num_tiles <= UNREACHABLE else np.uint16 if num_tiles < 1 << 16 else np.uint32
+        self.unreachable = int(np.iinfo(self.dtype).max)  # Distance of tiles that cannot be reached.
+        self.index_type = np.int16 if num_tiles < np.iinfo(np.int16).max else np.int32
+        self.distances = None  # Every row as a tiles x tiles array, once full() has built them.
+        self.order = None  # Tiles ordered by distance from each source, once full() has built them.
+        self.reachable_counts = None  # How many tiles of each row of order lie within each roll.
+        self._rows = OrderedDict()  # (distances, order, reachable counts) of the sources asked about.
+        row_bytes = num_tiles * (np.dtype(self.dtype).itemsize + np.dtype(self.index_type).itemsize)
+        self._rows_kept = max(ROW_CACHE_BYTES // max(row_bytes, 1), 16)
+
+    # Build every row at once and keep them as tiles x tiles arrays. Returns the table.
+    def full(self):
+        if self.distances is None:
+            num_tiles = self.num_tiles
+            self.distances = np.empty((num_tiles, num_tiles), dtype=self.dtype)
+            for source in range(num_tiles):
+                self.distances[source] = _breadth_first_search(source, self.neighbors, self.blocking, self.unreachable)
+            self.order = np.argsort(self.distances, axis=1, kind="stable").astype(self.index_type)
+            rolls = np.arange(self.max_roll + 1)
+            self.reachable_counts = np.stack(
+                [np.count_nonzero(self.distances <= roll, axis=1) for roll in rolls], axis=1
+            ).astype(np.int32)
+            self._rows.clear()
+        return self
+
+    # Build (or reuse) the distance table for a mansion.
+    # With secret_passages=True the passages count as a single step, which is useful when planning routes.
+    @classmethod
+    def from_mansion(cls, mansion, secret_passages=False):
+        rows, cols, rooms, passages = mansion.layout_key()
+        key = (rows, cols, rooms, passages if secret_passages else None)
+        table = _cache.get(key)
+        if table is not None:
+            _cache.move_to_end(key)
+            return table
+        buffers = mansion.layout.distance_buffers
+        if buffers is not None and not secret_passages:
+            table = _cache[key] = cls.from_buffers(**buffers)
+        else:
+            table = _cache[key] = cls(*mansion_graph(mansion, secret_passages))
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+        return table
+
+    # Wrap distance arrays read from a compiled board cache (see layout.load_layout) without copying them.
+    @classmethod
+    def from_buffers(cls, distances, order, reachable_counts, max_roll=MAX_ROLL):
+        table = cls.__new__(cls)
+        num_tiles = len(reachable_counts) // (max_roll + 1)
+        table.neighbors = table.blocking = None
+        table.max_roll = max_roll
+        table.num_tiles = num_tiles
+        table.dtype = np.dtype(distances.format).type
+        table.unreachable = int(np.iinfo(table.dtype).max)
+        table.index_type = np.dtype(order.format).type
+        table.distances = np.frombuffer(distances, dtype=table.dtype).reshape(num_tiles, num_tiles)
+        table.order = np.frombuffer(order, dtype=table.index_type).reshape(num_tiles, num_tiles)
+        table.reachable_counts = np.frombuffer(reachable_counts, dtype=np.int32).reshape(num_tiles, max_roll + 1)
+        table._rows = OrderedDict()
+        return table
+
+    # Get the distances from a source tile to every tile, as an array indexed by tile.
+    def row(self, source):
+        if self.distances is not None:
+            return self.distances[source]
+        return self._row(source)[0]
+
+    # Get the rows of several source tiles as a sources x tiles array.
+    def rows(self, sources):
+        if self.distances is not None:
+            return self.distances[sources]
+        return np.stack([self._row(source)[0] for source in sources])
+
+    # Get the number of steps between two tile indices, or self.unreachable.
+    def distance(self, source, target):
+        return int(self.row(source)[target])
+
+    # Get the indices of every tile reachable from source with the given roll, nearest first.
+    # The source itself is included, since staying put is a legal move.
+    def reachable_within(self, source, roll):
+        roll = min(roll, self.max_roll)
+        if self.distances is not None:
+            return self.order[source, :self.reachable_counts[source, roll]]
+        _, order, counts = self._row(source)
+        return order[:counts[roll]]
+
+    # Get the distances, order and reachable counts of one source, searching on first use.
+    def _row(self, source):
+        row = self._rows.get(source)
+        if row is not None:
+            self._rows.move_to_end(source)
+            return row
+        distances = np.array(_breadth_first_search(source, self.neighbors, self.blocking, self.unreachable),
+                             dtype=self.dtype)
+        order = np.argsort(distances, kind="stable").astype(self.index_type)
+        counts = np.searchsorted(distances[order], np.arange(self.max_roll + 1), side="right")
+        row = self._rows[source] = (distances, order, counts)
+        if len(self._rows) > self._rows_kept:
+            self._rows.popitem(last=False)
+        return row
+
+
+# Describe the mansion's tiles as neighbor index lists, with rooms marked as blocking further movement.
+# Reads the compiled layout, so no tile objects are created.
+def mansion_graph(mansion, secret_passages=False):
+    neighbors, blocking = mansion.layout.graph()
+    if secret_passages:
+        for room in mansion.rooms.values():
+            if room.secret_passage is not None and room in mansion.coordinates and room.secret_passage in mansion.coordinates:
+                neighbors[mansion.index_of(room)].append(mansion.index_of(room.secret_passage))
+        neighbors = [sorted(connected) for connected in neighbors]
+    return neighbors, blocking
+
+
+def _breadth_first_search(source, neighbors, blocking, unreachable=UNREACHABLE):
+    distances = [unreachable] * len(neighbors)
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        tile = queue.popleft()
+        if tile != source and blocking[tile]:
+            continue
+        next_distance = distances[tile] + 1
+        for neighbor in neighbors[tile]:
+            if distances[neighbor] == unreachable:
+                distances[neighbor] = next_distance
+                queue.append(neighbor)
+    return distances
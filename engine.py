@@ -0,0 +1,171 @@
+import random
+
+from card_setup import STANDARD_DECK
+from game_manager import GameManager
+
+# Actions a player can take on their turn, matching the prompts in GameManager.start_game.
+ACTIONS = ("move", "suggest", "accuse", "secret")
+
+
+class GameEngine:
+    """
+    Headless driver for a single game of Cluedo.
+
+    The engine runs the same move/suggest/accuse/secret rules as GameManager.start_game,
+    but takes actions as tuples instead of reading them from input() and never draws the board:
+
+        ("move", (row, col))
+        ("suggest", character, weapon)
+        ("accuse", room, character, weapon)
+        ("secret",)
+
+    Names are matched case-insensitively, as with typed input.
+    """
+
+    def __init__(self, player_names, seed=None, rng=None, layout=None, event_log=None, instrumentation=None,
+                 deck=STANDARD_DECK, dice=None):
+        # Set up a game without visualization and place every player at the start.
+        # Every action is recorded in the event log, if one is given (see event_log.EventLog),
+        # and turns are timed by the instrumentation, if any (see instrumentation.Instrumentation).
+        # A custom deck (see card_setup.Deck) needs a layout with a place for each of its rooms.
+        # Dice are rolled from the dice stream, if one is given (see dice.py), instead of the random source.
+        self.game = GameManager(rng if rng is not None else random.Random(seed), layout=layout, event_log=event_log,
+                                instrumentation=instrumentation, deck=deck, dice=dice)
+        if instrumentation is not None:
+            instrumentation.attach_engine(self)
+        self.game.setup_game(player_names, visualize=False)
+        self.game.place_players_at_start()
+        self.hand_sizes = [len(player.cards) for player in self.game.players]  # Cards dealt to each seat.
+        self.current_player_index = 0  # Seat of the player whose turn it is.
+        self.dice_roll = None  # Roll waiting to be spent on a move, if any.
+        self.turns = 0  # Number of completed turns.
+        self.winner = None  # Player who made the correct accusation.
+        self.game_over = False
+        self._skip_inactive_players()
+
+    @property
+    def players(self):
+        return self.game.players
+
+    @property
+    def current_player(self):
+        return self.game.players[self.current_player_index]
+
+    # Roll the dice for the current player's move, keeping the roll until a valid destination is given.
+    def roll(self):
+        if self.dice_roll is None:
+            self.dice_roll = self.game.roll_dice(self.current_player)
+        return self.dice_roll
+
+    # Apply one action for the current player and return a dictionary describing the outcome.
+    # Rejected actions leave the turn with the same player, like re-prompting in start_game.
+    def step(self, action):
+        if self.game_over:
+            raise ValueError("The game is over.")
+        player = self.current_player
+        kind = action[0]
+
+        if kind == "move":
+            dice_roll = self.roll()
+            r, c = action[1]
+            new_position, error = self.game.validate_move(player, r, c, dice_roll)
+            if error:
+                return {"action": kind, "accepted": False, "dice_roll": dice_roll, "error": error}
+            self.game.move_player(player, new_position, (r, c))
+            self.dice_roll = None
+            result = {"action": kind, "accepted": True, "dice_roll": dice_roll, "position": (r, c)}
+
+        elif kind == "suggest":
+            if not player.can_make_suggestion():
+                return {"action": kind, "accepted": False, "error": "You must be in a room to make a suggestion."}
+            room = player.current_position.name.lower()
+            character, weapon = action[1].lower(), action[2].lower()
+            try:
+                other_player, card, passed = self.game.resolve_suggestion(player, room, character, weapon)
+            except ValueError as error:
+                return {"action": kind, "accepted": False, "error": str(error)}
+            player.make_suggestion(room, character, weapon)
+            result = {"action": kind, "accepted": True, "suggestion": (room, character, weapon),
+                      "disprover": other_player, "card": card, "passed": passed}
+
+        elif kind == "accuse":
+            room, character, weapon = action[1].lower(), action[2].lower(), action[3].lower()
+            try:
+                correct = self.game.resolve_accusation(player, room, character, weapon)
+            except ValueError as error:
+                return {"action": kind, "accepted": False, "error": str(error)}
+            if correct:
+                self.winner = player
+                self.game_over = True
+            result = {"action": kind, "accepted": True, "accusation": (room, character, weapon), "correct": correct}
+
+        elif kind == "secret":
+            new_room = self.game.secret_passage_destination(player.current_position)
+            if new_room is None:
+                return {"action": kind, "accepted": False, "error": "There is no secret passage here."}
+            dice_roll, used = self.game.take_secret_passage(player, new_room)
+            result = {"action": kind, "accepted": True, "dice_roll": dice_roll, "used": used}
+
+        else:
+            raise ValueError(f"Invalid action '{kind}'. Expected one of {', '.join(ACTIONS)}.")
+
+        result["player"] = player
+        self.game.end_turn(player)
+        self._end_turn()
+        return result
+
+    # Play the game to completion with one agent per seat and return a summary of the result.
+    def run(self, agents, max_turns=1000, max_rejections=100):
+        if len(agents) != len(self.players):
+            raise ValueError("Exactly one agent is required per player.")
+        for seat, agent in enumerate(agents):
+            agent.start(self, seat)
+        rejections = 0
+        while not self.game_over and self.turns < max_turns:
+            seat = self.current_player_index
+            agent = agents[seat]
+            action = agent.choose_action(self)
+            result = self.step(action)
+            if not result["accepted"]:
+                rejections += 1
+                if rejections > max_rejections:
+                    raise RuntimeError(f"Agent for {self.players[seat].name} keeps choosing rejected actions.")
+                continue
+            rejections = 0
+            for observer in agents:
+                observer.observe(self, result)
+        self.game.finish_game(self.winner, self.turns)
+        return self.summary()
+
+    # Take an immutable snapshot of the game for search (see game_state.GameState).
+    # The snapshot rolls its own dice from the seed, so searching never changes this game's rolls.
+    def snapshot(self, seed=0):
+        from game_state import GameState
+        return GameState.from_engine(self, seed)
+
+    # Summarize the outcome of the game.
+    def summary(self):
+        winner_seat = self.game.seats[self.winner] if self.winner else None
+        return {
+            "winner": winner_seat,
+            "turns": self.turns,
+            "eliminated": [seat for seat, player in enumerate(self.players) if not player.is_active],
+            "solution": (self.game.solution.room, self.game.solution.character, self.game.solution.weapon),
+            "finished": self.game_over,
+        }
+
+    # Advance to the next active player, ending the game if nobody is left.
+    def _end_turn(self):
+        self.turns += 1
+        if self.game_over:
+            return
+        if self.game.all_players_eliminated():
+            self.game_over = True
+            return
+        self.current_player_index = (self.current_player_index + 1) % len(self.players)
+        self._skip_inactive_players()
+
+    # Eliminated players lose their turns, as in start_game.
+    def _skip_inactive_players(self):
+        while not self.current_player.is_active:
+            self.current_player_index = (self.current_player_index + 1) % len(self.players)
@@ -0,0 +1,211 @@
+import struct
+import zlib
+from array import array
+from functools import lru_cache
+
+from game_state import OFF_BOARD, splitmix64
+
+# Seed of the Zobrist feature keys. Every process derives the same keys from it, so a shared cache
+# is keyed the same way by all of them.
+ZOBRIST_SEED = 0x5EED0F0C1DE0
+
+# Kinds of feature hashed into a position key.
+TURN, ACTIVE, POSITION, KNOWN = range(4)
+
+# Entries per bucket. A key can only live in its bucket, and the least recently used entry of a full
+# bucket is replaced, as in the transposition tables of chess engines.
+WAYS = 4
+
+# Header of the cache buffer: format tag, number of values per entry, number of buckets, then the clock.
+_HEADER = struct.Struct("<8sQQQ")
+_TAG = b"CLUEEVC1"
+_CLOCK = 3  # Index of the clock among the header's 64-bit words.
+
+
+# Get the random 64-bit key of one feature of a position, such as seat 2 standing on tile 40.
+# Masks are hashed 16 bits at a time, so value never needs more than 64 bits.
+@lru_cache(maxsize=1 << 16)
+def feature_key(kind, seat, value):
+    return splitmix64(splitmix64(ZOBRIST_SEED ^ kind << 32 ^ seat) ^ value)
+
+
+# XOR the keys of the 16-bit chunks of a mask into a key.
+def _mask_key(kind, seat, mask):
+    key = 0
+    chunk = 0
+    while mask:
+        if mask & 0xFFFF:
+            key ^= feature_key(kind, seat, chunk << 16 | mask & 0xFFFF)
+        mask >>= 16
+        chunk += 1
+    return key
+
+
+# Zobrist-style hash of a position: the tile index of each seat (OFF_BOARD if eliminated), the known card
+# masks of the seats given as (seat, mask) pairs, the mask of active seats and the seat to play.
+# Equal positions always hash alike, in any process; the result is never 0.
+def position_key(positions, known, active, turn):
+    key = feature_key(TURN, turn, 0) ^ _mask_key(ACTIVE, 0, active)
+    for seat, tile in enumerate(positions):
+        key ^= feature_key(POSITION, seat, tile - OFF_BOARD)
+    for seat, mask in known:
+        key ^= _mask_key(KNOWN, seat, mask)
+    return key or 1
+
+
+# Hash a game_state.GameState, counting a seat's hand among its known cards. With a viewer, only that
+# seat's known cards are part of the key, so positions that differ in what the other players know (or are
+# dealt, in a search) share an evaluation.
+def state_key(state, viewer=None):
+    seats = range(len(state.known)) if viewer is None else (viewer,)
+    known = ((seat, state.hands[seat] | state.known[seat]) for seat in seats)
+    return position_key(state.positions, known, state.active, state.turn)
+
+
+# Hash the position of a live GameEngine, as state_key does for its snapshot. Coordinates are converted
+# to ints, since NumPy integers would overflow in feature_key.
+def engine_key(engine, viewer=None):
+    game = engine.game
+    cols = game.mansion.cols
+    players = game.players
+    positions = [OFF_BOARD if player.current_coordinates is None
+                 else int(player.current_coordinates[0]) * cols + int(player.current_coordinates[1])
+                 for player in players]
+    active = sum(1 << seat for seat, player in enumerate(players) if player.is_active)
+    known = enumerate(player.known_mask for player in players) if viewer is None else \
+        ((viewer, players[viewer].known_mask),)
+    return position_key(positions, known, active, engine.current_player_index)
+
+
+class EvalCache:
+    """
+    Memory-bounded cache of evaluations (tuples of num_values floats) keyed by position_key.
+
+    Entries live in one flat buffer of fixed-size slots holding the key, a check word, a last-used stamp
+    and the values, so the cache never grows past max_bytes and needs no Python object per entry. Slots
+    are grouped into buckets of WAYS; a key is looked up in its own bucket only, and storing into a full
+    bucket evicts its least recently used entry.
+
+    With shared=True the buffer is a multiprocessing.shared_memory block that other processes open with
+    EvalCache.attach(name), so workers of a process pool reuse each other's evaluations. There is no lock:
+    the check word is the key XORed with a CRC of the values, so an entry torn by two processes writing at
+    once reads as a miss rather than as wrong values. stats counts this process's hits, misses, stores and
+    evictions; mcts.ISMCTSAgent adds the counts of its worker processes to the stats of its cache.
+    """
+
+    def __init__(self, num_values, max_bytes=1 << 24, shared=False, _memory=None):
+        self.num_values = num_values
+        slot_size = 24 + 8 * num_values
+        self.shared = shared or _memory is not None
+        self._memory = _memory  # Shared memory block holding the buffer, if shared.
+        self._owner = _memory is None  # Whether this process created the buffer, and so frees it.
+        if _memory is None:
+            buckets = 1 << max((max(max_bytes - _HEADER.size, 0) // (slot_size * WAYS)).bit_length() - 1, 0)
+            size = _HEADER.size + buckets * WAYS * slot_size
+            if shared:
+                from multiprocessing import shared_memory
+                self._memory = shared_memory.SharedMemory(create=True, size=size)
+                buffer = self._memory.buf
+            else:
+                buffer = bytearray(size)
+            _HEADER.pack_into(buffer, 0, _TAG, num_values, buckets, 0)
+        else:
+            buffer = _memory.buf
+            tag, stored_values, buckets, _ = _HEADER.unpack_from(buffer, 0)
+            if tag != _TAG or stored_values != num_values:
+                raise ValueError(f"The shared memory '{_memory.name}' is not an evaluation cache of {num_values} values.")
+        self.buckets = buckets
+        self.capacity = buckets * WAYS  # Largest number of entries.
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        view = memoryview(buffer)
+        slots = self.capacity
+        offset = _HEADER.size
+        self._header = view[:_HEADER.size].cast('Q')
+        self._keys = view[offset:offset + 8 * slots].cast('Q')
+        self._checks = view[offset + 8 * slots:offset + 16 * slots].cast('Q')
+        self._stamps = view[offset + 16 * slots:offset + 24 * slots].cast('Q')
+        self._raw = view[offset + 24 * slots:]  # Values of every slot as bytes, for the checks.
+        self._values = self._raw.cast('d')
+
+    # Open a shared cache created in another process, by the name of its shared memory block.
+    @classmethod
+    def attach(cls, name, num_values):
+        from multiprocessing import shared_memory
+        return cls(num_values, _memory=shared_memory.SharedMemory(name=name))
+
+    # Name of the shared memory block, for EvalCache.attach in other processes (None if not shared).
+    @property
+    def name(self):
+        return self._memory.name if self._memory is not None else None
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def __len__(self):
+        return sum(1 for key in self._keys if key)
+
+    # Get the values stored for a key, or None. The values are copied once and checked on the copy, so
+    # another process writing the slot meanwhile cannot change what is returned.
+    def get(self, key):
+        first = (key & (self.buckets - 1)) * WAYS
+        keys = self._keys
+        size = 8 * self.num_values
+        for slot in range(first, first + WAYS):
+            if keys[slot] == key:
+                data = bytes(self._raw[slot * size:(slot + 1) * size])
+                if self._checks[slot] == key ^ zlib.crc32(data):
+                    self.stats["hits"] += 1
+                    self._stamps[slot] = self._tick()
+                    return tuple(memoryview(data).cast('d'))
+                break
+        self.stats["misses"] += 1
+        return None
+
+    # Store the values for a key, replacing its old values or the least recently used entry of its bucket.
+    def put(self, key, values):
+        if len(values) != self.num_values:
+            raise ValueError(f"The cache stores {self.num_values} values per entry, not {len(values)}.")
+        first = (key & (self.buckets - 1)) * WAYS
+        slot = next((slot for slot in range(first, first + WAYS) if self._keys[slot] == key), None)
+        if slot is None:
+            slot = min(range(first, first + WAYS), key=self._stamps.__getitem__)
+            if self._keys[slot]:
+                self.stats["evictions"] += 1
+        self.stats["stores"] += 1
+        start = slot * self.num_values
+        self._keys[slot] = 0
+        self._values[start:start + self.num_values] = array('d', values)
+        self._checks[slot] = key ^ self._crc(slot)
+        self._keys[slot] = key
+        self._stamps[slot] = self._tick()
+
+    # Empty the cache. The statistics are kept.
+    def clear(self):
+        for slot in range(self.capacity):
+            self._keys[slot] = self._stamps[slot] = 0
+
+    # Release the buffer. The process that created a shared cache also frees its shared memory.
+    def close(self):
+        for view in (self._header, self._keys, self._checks, self._stamps, self._values, self._raw):
+            view.release()
+        if self._memory is not None:
+            self._memory.close()
+            if self._owner:
+                self._memory.unlink()
+            self._memory = None
+
+    def _crc(self, slot):
+        size = 8 * self.num_values
+        return zlib.crc32(self._raw[slot * size:(slot + 1) * size])
+
+    # Advance the shared clock used as the last-used stamp.
+    def _tick(self):
+        clock = self._header[_CLOCK] + 1
+        self._header[_CLOCK] = clock
+        return clock
+
+    def __getstate__(self):
+        raise TypeError("Pass EvalCache.name to other processes and open it there with EvalCache.attach.")
@@ -0,0 +1,276 @@
+import mmap
+import struct
+from array import array
+from collections import namedtuple
+
+from card_setup import STANDARD_DECK
+
+# Kinds of event. Every event is one fixed-size record: kind, seat, turn and four values.
+#   GAME_START  seat = number of players, a, b, c = solution room, character, weapon card IDs
+#   ROOM        a = room card ID, b, c = (row, column) of the room; one per room, in placement order
+#   DEAL        seat, a = card ID dealt to the seat
+#   ROLL        seat, a = dice total
+#   MOVE        seat, a, b = (row, column) moved to
+#   SUGGEST     seat, a, b, c = room, character, weapon card IDs (NONE for a room that is not a card)
+#   PASS        seat could not disprove the current suggestion
+#   DISPROVE    seat, a = card ID shown, b = seat of the suggester
+#   ACCUSE      seat, a, b, c = room, character, weapon card IDs, d = 1 if correct
+#   ELIMINATE   seat
+#   SECRET      seat, a, b = (row, column) of the passage's other end, c = 1 if the roll allowed it
+#   END_TURN    seat
+#   GAME_END    seat = winner (NO_SEAT if nobody won), a = number of turns played
+(GAME_START, ROOM, DEAL, ROLL, MOVE, SUGGEST, PASS, DISPROVE, ACCUSE, ELIMINATE, SECRET, END_TURN,
+ GAME_END) = range(13)
+EVENT_NAMES = ("game_start", "room", "deal", "roll", "move", "suggest", "pass", "disprove", "accuse",
+               "eliminate", "secret", "end_turn", "game_end")
+
+# Value of a field that does not apply, such as the room of a suggestion made from the starting space.
+NONE = 0xFFFF
+# Seat of an event that belongs to no player, such as the winner of a game nobody won.
+NO_SEAT = 0xFF
+
+RECORD = struct.Struct("<BBHHHHH")
+Event = namedtuple("Event", ["kind", "seat", "turn", "a", "b", "c", "d"])
+
+MAGIC = b"CLUELOG1"
+INDEX_MAGIC = b"CLUEIDX1"
+
+
+class EventRecorder:
+    """
+    Packs the events of games into RECORD records, for GameManager's event_log.
+
+    GameManager calls start_game, record and end_game as the game is played; the turn of each
+    record is counted from the END_TURN events. Records are buffered in a bytearray, and subclasses
+    decide where they go by overriding game_finished and flush.
+    """
+
+    def __init__(self):
+        self.turn = 0  # Turns completed in the current game.
+        self.games = 0  # Games started by this recorder.
+        self._buffer = bytearray()  # Packed records not written out yet.
+
+    def record(self, kind, seat=NO_SEAT, a=NONE, b=NONE, c=NONE, d=NONE):
+        self._buffer += RECORD.pack(kind, seat, self.turn, a, b, c, d)
+        if kind == END_TURN:
+            self.turn += 1
+
+    # Record the setup of a new game: the solution, where each room was placed and every player's hand.
+    def start_game(self, game):
+        self.turn = 0
+        self.games += 1
+        solution = game.solution
+        ids = game.deck.ids
+        self.record(GAME_START, len(game.players), ids[solution.room.lower()], ids[solution.character.lower()],
+                    ids[solution.weapon.lower()])
+        mansion = game.mansion
+        for room in mansion.rooms.values():
+            if room in mansion.coordinates:
+                r, c = mansion.coordinates[room]
+                self.record(ROOM, NO_SEAT, ids[room.name.lower()], r, c)
+        for seat, player in enumerate(game.players):
+            for card in player.cards:
+                self.record(DEAL, seat, card.card_id)
+
+    # Record the end of a game.
+    def end_game(self, winner_seat, turns):
+        self.record(GAME_END, NO_SEAT if winner_seat is None else winner_seat, turns)
+        self.game_finished()
+
+    # Called after the last record of every game.
+    def game_finished(self):
+        pass
+
+    # Write out the buffered records.
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EventLog(EventRecorder):
+    """
+    Append-only writer of game events, one file per batch of games.
+
+    Each game is written out when it ends. A sidecar index file (path + ".idx") gets the record
+    number of every GAME_START, so readers can jump to any game.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.file = open(path, "ab")
+        self.index_file = open(path + ".idx", "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        if self.index_file.tell() == 0:
+            self.index_file.write(INDEX_MAGIC)
+        self.records = (self.file.tell() - len(MAGIC)) // RECORD.size  # Records written so far.
+        self._game_starts = array('Q')
+
+    def start_game(self, game):
+        self._game_starts.append(self.records + len(self._buffer) // RECORD.size)
+        super().start_game(game)
+
+    def game_finished(self):
+        self.flush()
+
+    # Write buffered records to the log and the index.
+    def flush(self):
+        if self._buffer:
+            self.file.write(self._buffer)
+            self.records += len(self._buffer) // RECORD.size
+            self._buffer.clear()
+        if self._game_starts:
+            self.index_file.write(self._game_starts.tobytes())
+            del self._game_starts[:]
+        self.file.flush()
+        self.index_file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        self.index_file.close()
+
+
+class EventLogReader:
+    """
+    Random access to the games of an event log through mmap.
+
+    Nothing is read until a game is asked for, so opening a log of millions of games is instant and
+    scanning it only touches the pages of the games visited. The index file is rebuilt by scanning the
+    records if it is missing or shorter than the log (e.g. after a crash between the two writes).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a game event log.")
+        self.num_records = (len(self._mmap) - len(MAGIC)) // RECORD.size
+        self._records = memoryview(self._mmap)[len(MAGIC):len(MAGIC) + self.num_records * RECORD.size]
+        self._starts = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.path + ".idx", "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b""
+        starts = array('Q')
+        if data[:len(INDEX_MAGIC)] == INDEX_MAGIC:
+            starts.frombytes(data[len(INDEX_MAGIC):len(data) - (len(data) - len(INDEX_MAGIC)) % 8])
+        # Games flushed after the last indexed one are found by scanning the records after it.
+        scan_from = starts[-1] + 1 if starts else 0
+        kinds = self._records[scan_from * RECORD.size::RECORD.size] if self.num_records else b""
+        for offset, kind in enumerate(kinds):
+            if kind == GAME_START:
+                starts.append(scan_from + offset)
+        return starts
+
+    def __len__(self):
+        return len(self._starts)
+
+    # Get the raw records of a game, or of the games [index, stop), as a memoryview of the log.
+    def game_records(self, index, stop=None):
+        stop = index + 1 if stop is None else stop
+        start = self._starts[index]
+        end = self._starts[stop] if stop < len(self._starts) else self.num_records
+        return self._records[start * RECORD.size:end * RECORD.size]
+
+    # Get the events of a game.
+    def events(self, index):
+        return [Event._make(fields) for fields in RECORD.iter_unpack(self.game_records(index))]
+
+    # Iterate over the events of every game in the log.
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.events(index)
+
+    # Get the winner seat (or None) and number of turns of every finished game, reading only their last record.
+    def outcomes(self):
+        results = []
+        for index in range(len(self)):
+            records = self.game_records(index)
+            kind, winner, _, turns, *_ = RECORD.unpack_from(records, len(records) - RECORD.size)
+            if kind == GAME_END:
+                results.append((None if winner == NO_SEAT else winner, turns))
+        return results
+
+    def close(self):
+        self._records.release()
+        self._mmap.close()
+
+
+# Rebuild the state of a logged game after the given number of turns (or at its end), as a GameManager.
+# The layout and deck must be the ones the game was played with; the room placement is taken from the log.
+# Returns the GameManager and the seat whose turn it is (None once the game is over).
+def replay(events, turn=None, layout=None, deck=STANDARD_DECK):
+    from game_manager import GameManager
+    from layout import default_layout, load_layout
+    from mansion import Mansion
+    from player import Player
+    from solution import Solution
+
+    start = events[0]
+    if start.kind != GAME_START:
+        raise ValueError("The events do not start with a GAME_START record.")
+    if layout is None:
+        layout = default_layout()
+    elif isinstance(layout, str):
+        layout = load_layout(layout)
+
+    cards = deck.cards
+    game = GameManager(layout=layout, deck=deck)
+    game.solution = Solution(cards[start.a].name, cards[start.b].name, cards[start.c].name,
+                             cards[start.a].bit | cards[start.b].bit | cards[start.c].bit)
+    game.players = [Player(f"Player {seat + 1}", None) for seat in range(start.seat)]
+    game.card_deck = list(cards)
+    game.available_choices = list(cards)
+
+    # Rooms are placed in the logged order; any rooms the layout had no place for come after them.
+    placed = [event for event in events if event.kind == ROOM]
+    room_ids = [event.a for event in placed]
+    room_cards = [cards[card_id] for card_id in room_ids]
+    room_cards += [card for card in cards if card.card_type == 'room' and card.card_id not in room_ids]
+    game.mansion = Mansion(room_cards, layout=dict(layout, rooms=[(event.b, event.c) for event in placed]))
+    for player in game.players:
+        player.mansion = game.mansion
+    game.place_players_at_start()
+
+    current_seat = 0
+    finished = False
+    for event in events[1:]:
+        if turn is not None and event.turn >= turn and event.kind > DEAL:
+            break
+        kind = event.kind
+        if kind == DEAL:
+            game.players[event.seat].add_card(cards[event.a])
+        elif kind == MOVE or (kind == SECRET and event.c):
+            game.players[event.seat].move(game.mansion.grid[event.a][event.b], (event.a, event.b))
+        elif kind == DISPROVE:
+            game.players[event.b].add_seen_card(cards[event.a])
+        elif kind == ACCUSE and event.d:
+            finished = True
+        elif kind == ELIMINATE:
+            game.players[event.seat].eliminate()
+            game.players[event.seat].move(None, None)
+            game.num_players_elim += 1
+        elif kind == END_TURN:
+            if finished or game.all_players_eliminated():
+                current_seat = None
+                continue
+            current_seat = (event.seat + 1) % len(game.players)
+            while not game.players[current_seat].is_active:
+                current_seat = (current_seat + 1) % len(game.players)
+    game.card_deck = [card for player in game.players for card in player.cards]
+    game.index_cards()
+    return game, current_seat
@@ -1,57 +1,100 @@
 from mansion import Mansion
 from player import Player
-from card_setup import create_card_deck, distribute_cards
+from card_setup import STANDARD_DECK, create_card_deck, distribute_cards
+import event_log
 from solution import Solution
 from room import Room
 from space import Space
+import importlib
 import random
-import matplotlib.pyplot as plt
-import numpy as np
+
+# Renderers that can draw the board, as "module:Class" paths.
+# They are only imported when visualization is enabled, so headless games never load Matplotlib or NumPy.
+RENDERERS = {
+    'matplotlib': 'renderer:BoardRenderer',
+    'offscreen': 'offscreen:OffscreenRenderer',
+}
+
+# Make a renderer class available under a name, given as a class or a "module:Class" path.
+def register_renderer(name, renderer):
+    RENDERERS[name] = renderer
+
+# Import and return the renderer class registered under a name.
+def load_renderer(name):
+    renderer = RENDERERS.get(name)
+    if renderer is None:
+        raise ValueError(f"Unknown renderer '{name}'. Available renderers: {', '.join(RENDERERS)}")
+    if isinstance(renderer, str):
+        module_name, class_name = renderer.split(':')
+        renderer = RENDERERS[name] = getattr(importlib.import_module(module_name), class_name)
+    return renderer
 
 class GameManager:
-    def __init__(self):
+    def __init__(self, rng=None, renderer='matplotlib', layout=None, event_log=None, instrumentation=None,
+                 deck=STANDARD_DECK, dice=None):
         # Initialize the game manager's state, including players, mansion, card deck, and visualization components.
+        self.rng = rng if rng is not None else random  # Source of randomness for shuffling, the solution and dice.
+        self.dice = dice  # Stream of dice rolls used instead of rng, if any (see dice.py).
+        self.renderer_name = renderer  # Name of the registered renderer used when visualization is enabled.
+        self.layout = layout  # Board layout file or spec (see layout.py), or None for the standard board.
         self.players = []  # List of Player objects participating in the game.
         self.mansion = None  # Represents the game board/mansion structure.
+        self.deck = deck  # Cards the game is played with (see card_setup.Deck).
         self.card_deck = []  # Full deck of Cluedo cards (characters, weapons, rooms).
+        self.card_owners = []  # Seat holding each card ID, or None for the solution cards.
+        self.seats = {}  # Seat of each player.
         self.available_choices = None  # Cards available for suggestions or accusations.
         self.solution = None  # The actual solution to the murder mystery.
+        self.renderer = None  # Draws the board, if visualization is enabled.
         self.fig = None  # Matplotlib figure for visualizing the board.
         self.ax = None  # Matplotlib axes for board visualization.
-        self.secret_passage_symbols_added = False  # Tracks if secret passage symbols are added to the rooms.
         self.num_players_elim = 0  # Counter for eliminated players.
+        self.event_log = event_log  # EventLog recording every action of the game, if any (see event_log.py).
+        self.instrumentation = instrumentation  # Timers and counters of the hot paths, if any (see instrumentation.py).
+        if instrumentation is not None:
+            instrumentation.attach_game(self)
 
-    def setup_game(self, player_names):
+    def setup_game(self, player_names, visualize=True):
         # Initializes the game state based on the provided player names.
+        if self.instrumentation is not None:
+            self.instrumentation.start_game()
         self.players = [Player(name, None) for name in player_names]
         
         # Create and shuffle the card deck.
-        self.card_deck = create_card_deck()
+        self.card_deck = create_card_deck(self.rng, self.deck)
 
         # Copy the shuffled deck for player choices.
         self.available_choices = self.card_deck.copy()
 
+        # Sort the shuffled deck by type in one pass, keeping the shuffled order within each type.
+        by_type = {'character': [], 'weapon': [], 'room': []}
+        for card in self.card_deck:
+            by_type[card.card_type].append(card)
+
         # Randomly select cards to form the murder mystery solution.
-        solution_room = random.choice([card for card in self.card_deck if card.card_type == 'room'])
-        solution_character = random.choice([card for card in self.card_deck if card.card_type == 'character'])
-        solution_weapon = random.choice([card for card in self.card_deck if card.card_type == 'weapon'])
-        self.solution = Solution(solution_room.name, solution_character.name, solution_weapon.name)
+        solution_room = self.rng.choice(by_type['room'])
+        solution_character = self.rng.choice(by_type['character'])
+        solution_weapon = self.rng.choice(by_type['weapon'])
+        solution_bits = solution_room.bit | solution_character.bit | solution_weapon.bit
+        self.solution = Solution(solution_room.name, solution_character.name, solution_weapon.name, solution_bits)
         # print(f"Solution: {self.solution}")
 
-        # Initialize the mansion with the remaining room cards.
-        room_cards = [card for card in self.card_deck if card.card_type == 'room']
-        
-        self.mansion = Mansion(room_cards)
-
-        # Remove the solution cards from the deck
-        self.card_deck.remove(solution_room)
-        self.card_deck.remove(solution_character)
-        self.card_deck.remove(solution_weapon)
+        # Initialize the mansion with the room cards.
+        self.mansion = Mansion(by_type['room'], layout=self.layout)
+        if len(by_type['room']) > len(self.mansion.layout.room_positions):
+            raise ValueError(f"The deck has {len(by_type['room'])} rooms, but the board only has places for "
+                             f"{len(self.mansion.layout.room_positions)}.")
+        for player in self.players:
+            player.mansion = self.mansion
 
-        self.card_deck = [card for card in self.card_deck if card not in (solution_room, solution_character, solution_weapon)]
+        # Remove the solution cards from the deck.
+        self.card_deck = [card for card in self.card_deck if not card.bit & solution_bits]
 
         # Distribute the remaining cards among the players.
         distribute_cards(self.players, self.card_deck)
+        self.index_cards()
+        if self.event_log is not None:
+            self.event_log.start_game(self)
 
         # Place all players in the starting space.
         start_space = self.mansion.get_room("Start Space")
@@ -60,85 +103,63 @@ class GameManager:
                 player.move(start_space)
 
         # Initialize the game board visualization.
-        self.initialize_visualization()
+        if visualize:
+            self.initialize_visualization()
 
     # Set up Matplotlib visualization for the game board.
     def initialize_visualization(self):
-        rows = len(self.mansion.grid)
-        cols = len(self.mansion.grid[0])
-        self.fig, self.ax = plt.subplots(figsize=(12, 10))
-
-        self.ax.set_xticks(np.arange(0, cols, 1))
-        self.ax.set_yticks(np.arange(0, rows, 1))
-        self.ax.set_xticklabels(range(cols))
-        self.ax.set_yticklabels(range(rows))
-        self.ax.set_xticks(np.arange(-.5, cols, 1), minor=True)
-        self.ax.set_yticks(np.arange(-.5, rows, 1), minor=True)
-        self.ax.grid(which="minor", color="black", linestyle='-', linewidth=2)
-        self.ax.tick_params(which="minor", size=0)
-        self.ax.invert_yaxis()
-
-        # Enable interactive mode for real-time updates.
-        plt.ion()
+        self.renderer = load_renderer(self.renderer_name)(self.mansion, self.players)
+        self.fig, self.ax = self.renderer.fig, self.renderer.ax
         self.update_visualization()
 
     # Update the visualization to reflect the current game state.
+    # Does nothing when the game was set up without visualization.
     def update_visualization(self):
-        rows = len(self.mansion.grid)
-        cols = len(self.mansion.grid[0])
-        grid = np.full((rows, cols), "", dtype=object)
-        self.ax.clear()
-
-        # Add secret passage symbols to the board (if not already added).
-        secret_passage_pairs = [
-            ('Study', 'Kitchen', '★'),
-            ('Conservatory', 'Lounge', '✦')
-        ]
-
-        if not self.secret_passage_symbols_added:
-            for room1_name, room2_name, symbol in secret_passage_pairs:
-                if room1_name in self.mansion.rooms and room2_name in self.mansion.rooms:
-                    self.mansion.rooms[room1_name].name += f" {symbol}"
-                    self.mansion.rooms[room2_name].name += f" {symbol}"
-            self.secret_passage_symbols_added = True
-
-        # Populate the grid with room and space names.
-        for r in range(rows):
-            for c in range(cols):
-                tile = self.mansion.grid[r][c]
-                if isinstance(tile, Room):
-                    grid[r][c] = tile.name
-                elif isinstance(tile, Space):
-                    grid[r][c] = ""
-
-        # Mark player positions on the grid.
-        for player in self.players:
-            position = player.current_position
-            if position:
-                r, c = self.get_coordinates(position)
-                grid[r][c] += f" ({player.name})"
-
-        # Render grid values on the visualization.
-        for (r, c), value in np.ndenumerate(grid):
-            if value:
-                self.ax.text(c, r, value, va='center', ha='center', color="black", fontsize=8)
-
-        self.ax.set_xticks(np.arange(0, cols, 1))
-        self.ax.set_yticks(np.arange(0, rows, 1))
-        self.ax.set_xticklabels(range(cols))
-        self.ax.set_yticklabels(range(rows))
-        self.ax.set_xticks(np.arange(-.5, cols, 1), minor=True)
-        self.ax.set_yticks(np.arange(-.5, rows, 1), minor=True)
-        self.ax.grid(which="minor", color="black", linestyle='-', linewidth=2)
-        self.ax.tick_params(which="minor", size=0)
-        self.ax.invert_yaxis()
-
-        self.fig.canvas.draw()
-        plt.pause(0.1)
+        if self.renderer is not None:
+            self.renderer.update()
 
     # Simulate rolling two six-sided dice and return the total.
-    def roll_dice(self):
-        return random.randint(1, 6) + random.randint(1, 6)
+    def roll_dice(self, player=None):
+        if self.dice is not None:
+            dice_roll = self.dice.roll()
+        else:
+            dice_roll = self.rng.randint(1, 6) + self.rng.randint(1, 6)
+        if self.event_log is not None and player is not None:
+            self._log(event_log.ROLL, player, dice_roll)
+        return dice_roll
+
+    # Record an event for a player in the event log. Only called when the game has an event log.
+    def _log(self, kind, player, a=event_log.NONE, b=event_log.NONE, c=event_log.NONE, d=event_log.NONE):
+        self.event_log.record(kind, self.seats[player], a, b, c, d)
+
+    # Move a player to a tile at (r, c) as their move for the turn.
+    def move_player(self, player, new_position, coordinates):
+        player.move(new_position, coordinates)
+        if self.event_log is not None:
+            self._log(event_log.MOVE, player, *coordinates)
+
+    # Roll for a secret passage out of the player's room and take it on an even roll.
+    # Returns the dice roll and whether the player moved.
+    def take_secret_passage(self, player, new_room):
+        dice_roll = self.roll_dice(player)
+        used = dice_roll % 2 == 0
+        if used:
+            player.move(new_room, self.get_coordinates(new_room))
+        if self.event_log is not None:
+            self._log(event_log.SECRET, player, *self.get_coordinates(new_room), used)
+        return dice_roll, used
+
+    # Record the end of a player's turn.
+    def end_turn(self, player):
+        if self.event_log is not None:
+            self._log(event_log.END_TURN, player)
+
+    # Record the end of the game, won by the given player (None if nobody won) after a number of turns.
+    def finish_game(self, winner, turns):
+        if self.event_log is not None:
+            self.event_log.end_game(None if winner is None else self.seats[winner], turns)
+        if self.instrumentation is not None:
+            self.instrumentation.end_game()
 
     # Get user input with the provided prompt, allowing 'quit' to exit the game.
     def get_input(self, prompt):
@@ -148,6 +169,116 @@ class GameManager:
             exit()
         return user_input
 
+    # Place all players at the starting position.
+    def place_players_at_start(self):
+        start_space = self.mansion.start
+        start_position = self.mansion.grid[start_space[0]][start_space[1]]
+        for player in self.players:
+            if start_position:
+                player.move(start_position, start_space)
+
+    # Check a move to (r, c) against the dice roll.
+    # Returns the destination tile and None, or None and the reason the move is not allowed.
+    def validate_move(self, player, r, c, dice_roll):
+        if not (0 <= r < self.mansion.rows and 0 <= c < self.mansion.cols):
+            return None, "Coordinates out of range. Try again."
+        new_position = self.mansion.grid[r][c]
+        if not (new_position and isinstance(new_position, (Room, Space))):
+            return None, "Invalid destination. Try again."
+        movement_distance = self.mansion.distance(player.current_position, new_position)
+        if movement_distance is None:
+            return None, "That space cannot be reached from your position. Try again."
+        if movement_distance > dice_roll:
+            return None, f"Invalid move. You can only move up to {dice_roll} spaces, but your intended move is {movement_distance} spaces."
+        return new_position, None
+
+    # Record which seat holds each card and the seat of each player, for resolving suggestions.
+    # Called once the cards are dealt; call it again if hands are changed afterwards.
+    def index_cards(self):
+        self.seats = {player: seat for seat, player in enumerate(self.players)}
+        self.card_owners = [None] * len(self.deck)
+        for seat, player in enumerate(self.players):
+            for card in player.cards:
+                self.card_owners[card.card_id] = seat
+
+    # Ask the other players, in seat order, to disprove a suggestion.
+    # Returns the disproving player and card (or None, None) and the players who could not disprove.
+    # A player holding several of the suggested cards shows the one with the lowest card ID.
+    # The disprover is found by looking up the owners of the three cards, so the cost does not grow with
+    # the number of players or the size of their hands; only the list of players who passed does.
+    # Raises ValueError if the character or weapon is not a card of its type; a room that is not a card
+    # (the starting space) disproves nothing.
+    def resolve_suggestion(self, current_player, room, character, weapon):
+        type_ids = self.deck.type_ids
+        suggested = (self.deck.ids.get(room.lower()), type_ids['character'].get(character.lower()),
+                     type_ids['weapon'].get(weapon.lower()))
+        if suggested[1] is None or suggested[2] is None:
+            raise ValueError(f"'{character}' is not a character card." if suggested[1] is None else
+                             f"'{weapon}' is not a weapon card.")
+        seat = self.seats[current_player]
+        disprover = card_id = None
+        for suggested_id in suggested:
+            if suggested_id is None:
+                continue
+            owner = self.card_owners[suggested_id]
+            if owner is None or owner == seat:
+                continue
+            if disprover is None or owner < disprover or (owner == disprover and suggested_id < card_id):
+                disprover, card_id = owner, suggested_id
+
+        passed = self.players[:len(self.players) if disprover is None else disprover]
+        if seat < len(passed):
+            del passed[seat]
+        if self.event_log is not None:
+            self._log(event_log.SUGGEST, current_player, event_log.NONE if suggested[0] is None else suggested[0],
+                      suggested[1], suggested[2])
+            for player in passed:
+                self._log(event_log.PASS, player)
+            if disprover is not None:
+                self._log(event_log.DISPROVE, self.players[disprover], card_id, seat)
+        if disprover is None:
+            return None, None, passed
+        card = self.deck.cards[card_id]
+        # Add the disproved card to player information
+        current_player.add_seen_card(card)
+        return self.players[disprover], card, passed
+
+    # Check an accusation, eliminating the player if it is incorrect.
+    # The names are in lowercase, as typed input is read. Returns True if the accusation matches the solution.
+    # Raises ValueError for a name that is not a card of its type, whether or not the game is logged.
+    # Each name is looked up once, and the card IDs are compared with the solution mask.
+    def resolve_accusation(self, current_player, room, character, weapon):
+        type_ids = self.deck.type_ids
+        try:
+            accused = (type_ids['room'][room], type_ids['character'][character], type_ids['weapon'][weapon])
+        except KeyError:
+            for name, card_type in ((room, 'room'), (character, 'character'), (weapon, 'weapon')):
+                if name not in type_ids[card_type]:
+                    raise ValueError(f"'{name}' is not a {card_type} card.") from None
+        if not current_player.can_make_accusation():
+            raise ValueError("Eliminated players cannot make an accusation.")
+        correct = 1 << accused[0] | 1 << accused[1] | 1 << accused[2] == self.solution.mask
+        if self.event_log is not None:
+            self._log(event_log.ACCUSE, current_player, *accused, correct)
+            if not correct:
+                self._log(event_log.ELIMINATE, current_player)
+        if correct:
+            return True
+        current_player.eliminate()
+        current_player.move(None, None)
+        self.num_players_elim += 1
+        return False
+
+    # Get the room connected to the given room by a secret passage, if any.
+    def secret_passage_destination(self, room):
+        if not isinstance(room, Room):
+            return None
+        return room.secret_passage
+
+    # Check whether every player has been eliminated.
+    def all_players_eliminated(self):
+        return len(self.players) == self.num_players_elim
+
     # Main game loop for player turns and actions.
     def start_game(self):
         print("The game has started!")
@@ -155,16 +286,12 @@ class GameManager:
             print(f"{player.name}'s cards: {player.show_cards()}")
 
         # Place all players at the starting position.
-        start_space = (5, 6)
-        start_position = self.mansion.grid[start_space[0]][start_space[1]]
-        for player in self.players:
-            if start_position:
-                player.move(start_position, start_space)
-                player.current_position = start_position
+        self.place_players_at_start()
 
         self.update_visualization()
         game_over = False
         current_player_index = 0
+        turns = 0
 
         # Loop until the game ends.
         while not game_over:
@@ -176,44 +303,29 @@ class GameManager:
                 if action == 'move':
                     print("To move, enter the grid coordinates in the format (row, column). Example: '1, 1'.")
                     # Player chooses to move on the board.
-                    dice_roll = self.roll_dice()
+                    dice_roll = self.roll_dice(current_player)
                     print(f"You rolled a {dice_roll}.")
-                    current_position = current_player.current_position
                     valid_move = False
                     while not valid_move:
                         try:
                             # Get input from user for move
                             destination = self.get_input("Enter the coordinates of the next space to move to (e.g., '1, 1'): ")
-                            # print(f"Debug: Raw input received for destination: {destination}")
-                            destination = tuple(map(int, destination.split(',')))
-                            # print(f"Debug: Parsed destination coordinates: {destination}")
-                            r, c = destination
-                            if 0 <= r < len(self.mansion.grid) and 0 <= c < len(self.mansion.grid[0]):
-                                new_position = self.mansion.grid[r][c]
-                                # print(f"Debug: New position object at ({r}, {c}): {new_position}")
-                                if new_position and isinstance(new_position, (Room, Space)):
-                                    current_r, current_c = self.get_coordinates(current_position)
-                                    movement_distance = abs(current_r - r) + abs(current_c - c)
-
-                                    # Catch errors for illegal move
-                                    if movement_distance <= dice_roll:
-
-                                        current_player.move(new_position, (r, c))
-                                        print(f"{current_player.name} moved to {new_position.name}.")
-                                        self.update_visualization()
-                                        valid_move = True
-                                    else:
-                                        print(f"Invalid move. You can only move up to {dice_roll} spaces, but your intended move is {movement_distance} spaces.")
-                                else:
-                                    print("Invalid destination. Try again.")
-                            else:
-                                print("Coordinates out of range. Try again.")
+                            r, c = tuple(map(int, destination.split(',')))
                         except (ValueError, IndexError):
                             print("Invalid format. Please enter the coordinates as 'row, column'. Example: '1, 1'.")
+                            continue
 
-                        if not valid_move:
+                        # Catch errors for illegal move
+                        new_position, error = self.validate_move(current_player, r, c, dice_roll)
+                        if error:
+                            print(error)
                             continue
 
+                        self.move_player(current_player, new_position, (r, c))
+                        print(f"{current_player.name} moved to {new_position.name}.")
+                        self.update_visualization()
+                        valid_move = True
+
                 elif action == 'suggest':
                     # Player chooses to suggest on the board.
                     print("To suggest, enter the name of the character and weapon. Example: 'Professor Plum', 'Candlestick'.")
@@ -222,87 +334,72 @@ class GameManager:
                         continue
                     else:
                         # Automatically gather room
-                        print(f"Room: {player.current_position.name}")
-                        available_characters = [card.name for card in self.available_choices if card.card_type == 'character' and card not in current_player.cards]
-                        available_weapons = [card.name for card in self.available_choices if card.card_type == 'weapon' and card not in current_player.cards]
+                        print(f"Room: {current_player.current_position.name}")
+                        # Cards the player has not held or been shown, checked against the typed names by card ID.
+                        unknown = ~current_player.known_mask
+                        character_mask = self.deck.type_masks['character'] & unknown
+                        weapon_mask = self.deck.type_masks['weapon'] & unknown
+                        available_characters = [card.name for card in self.deck.mask_cards(character_mask)]
+                        available_weapons = [card.name for card in self.deck.mask_cards(weapon_mask)]
                         print(f"Available characters: {', '.join(available_characters)}")
                         print(f"Available weapons: {', '.join(available_weapons)}")
 
-                        lowercase_characters = [character.lower() for character in available_characters]
-                        lowercase_weapons = [weapons.lower() for weapons in available_weapons]
-                        
                         # Get user input for suggestion
                         character = None
-                        while character not in lowercase_characters:
+                        while character is None or not self.deck.in_mask(character, character_mask):
                             character = self.get_input("Enter the character: ")
-                            if character not in lowercase_characters:
+                            if not self.deck.in_mask(character, character_mask):
                                 print(f"You must enter a character that is available: {', '.join(available_characters)}")
 
                         weapon = None
-                        while weapon not in lowercase_weapons:
+                        while weapon is None or not self.deck.in_mask(weapon, weapon_mask):
                             weapon = self.get_input("Enter the weapon: ")
-                            if weapon not in lowercase_weapons:
+                            if not self.deck.in_mask(weapon, weapon_mask):
                                 print(f"You must enter a weapon that is available: {', '.join(available_weapons)}")
 
-                        suggestion = current_player.make_suggestion(current_player.current_position.name.lower(), character, weapon)
+                        room = current_player.current_position.name.lower()
+                        suggestion = current_player.make_suggestion(room, character, weapon)
                         print(f"{current_player.name} suggests: {suggestion}")
 
                         # Disprove player suggestion
-                        disproved = False
-                        for other_player in self.players:
-                            if other_player != current_player:
-                                for card in other_player.cards:
-                                    if card.name.lower() in [character, weapon, current_player.current_position.name.lower()]:
-                                        print(f"{other_player.name} can disprove the suggestion with the card: {card.name}")
-                                        disproved = True
-                                        # Add the disproved card to player information
-                                        current_player.add_card(card)
-                                        print(f"{current_player.name} now has the card: {card.name}")
-                                        break
-                                if disproved:
-                                    break
-
-                        if not disproved:
+                        other_player, card, _ = self.resolve_suggestion(current_player, room, character, weapon)
+                        if other_player:
+                            print(f"{other_player.name} can disprove the suggestion with the card: {card.name}")
+                            print(f"{current_player.name} now has the card: {card.name}")
+                        else:
                             print("No one can disprove the suggestion.")
 
                 elif action == 'accuse':
                     # Player chooses to accuse on the board.
                     print("To accuse, enter the name of the room, character, and weapon. Example: 'Kitchen', 'Professor Plum', 'Candlestick'.")
 
-                    accuse_rooms = [card.name for card in self.available_choices if card.card_type == 'room']
-                    accuse_characters = [card.name for card in self.available_choices if card.card_type == 'character']
-                    accuse_weapons = [card.name for card in self.available_choices if card.card_type == 'weapon']
-                    
+                    deck, type_masks = self.deck, self.deck.type_masks
+
                     # Provide availabe choices
-                    print(f"Available rooms: {', '.join(accuse_rooms)}")
-                    print(f"Available characters: {', '.join(accuse_characters)}")
-                    print(f"Available weapons: {', '.join(accuse_weapons)}")
-                    
-                    lowercase_accuse_characters = [character.lower() for character in accuse_characters]
-                    lowercase_accuse_weapons = [weapons.lower() for weapons in accuse_weapons]
-                    lowercase_accuse_rooms = [weapons.lower() for weapons in accuse_rooms]
+                    print(f"Available rooms: {', '.join(deck.rooms)}")
+                    print(f"Available characters: {', '.join(deck.characters)}")
+                    print(f"Available weapons: {', '.join(deck.weapons)}")
 
                     # Get use inputs for accusation
                     room = None
-                    while room not in lowercase_accuse_rooms:
+                    while room is None or not deck.in_mask(room, type_masks['room']):
                         room = self.get_input("Enter the room: ")
-                        if room not in lowercase_accuse_rooms:
-                            print(f"You must enter a room that is available: {', '.join(accuse_rooms)}")
+                        if not deck.in_mask(room, type_masks['room']):
+                            print(f"You must enter a room that is available: {', '.join(deck.rooms)}")
 
                     character = None
-                    while character not in lowercase_accuse_characters:
+                    while character is None or not deck.in_mask(character, type_masks['character']):
                         character = self.get_input("Enter the character: ")
-                        if character not in lowercase_accuse_characters:
-                            print(f"You must enter a character that is available: {', '.join(accuse_characters)}")
+                        if not deck.in_mask(character, type_masks['character']):
+                            print(f"You must enter a character that is available: {', '.join(deck.characters)}")
 
                     weapon = None
-                    while weapon not in lowercase_accuse_weapons:
+                    while weapon is None or not deck.in_mask(weapon, type_masks['weapon']):
                         weapon = self.get_input("Enter the weapon: ")
-                        if weapon not in lowercase_accuse_weapons:
-                            print(f"You must enter a weapon that is available: {', '.join(accuse_weapons)}")
+                        if not deck.in_mask(weapon, type_masks['weapon']):
+                            print(f"You must enter a weapon that is available: {', '.join(deck.weapons)}")
 
-                    accusation = current_player.make_accusation(room, character, weapon, self.solution)
-                    if accusation[-1] == "correct":
+                    if self.resolve_accusation(current_player, room, character, weapon):
                         # Player wins the game
                         print(f"{current_player.name} has won the game with the correct accusation!")
                         print("""
@@ -316,34 +413,25 @@ class GameManager:
 
                               """)
                         game_over = True
+                        self.end_turn(current_player)
+                        self.finish_game(current_player, turns + 1)
                     else:
                         # Player is eliminated from the game
                         print(f"{current_player.name}'s accusation was incorrect. They are eliminated from the game.")
-                        current_player.move(None, None)
-                        self.num_players_elim += 1
                         self.update_visualization()
-                        valid_move = True
 
                 elif action == 'secret':
                     # Player chooses to use secret passage on the board.
                     print("To use a secret passage, you must be in a room with a secret passage and roll an even number.")
                     current_room = current_player.current_position
                     if isinstance(current_room, Room):
-                        secret_passages = {
-                            'Study': 'Kitchen',
-                            'Kitchen': 'Study',
-                            'Conservatory': 'Lounge',
-                            'Lounge': 'Conservatory'
-                        }
+                        new_room = self.secret_passage_destination(current_room)
                         # Player rolls dice to see if they can use the secret passage
-                        if current_room.name.split()[0] in secret_passages:
-                            print(f"There is a secret passage to the {secret_passages[current_room.name.split()[0]]}.")
-                            dice_roll = self.roll_dice()
+                        if new_room:
+                            print(f"There is a secret passage to the {new_room.name}.")
+                            dice_roll, used = self.take_secret_passage(current_player, new_room)
                             print(f"You rolled a {dice_roll}.")
-                            if dice_roll % 2 == 0:
-                                new_room_name = secret_passages[current_room.name.split()[0]]
-                                new_room = self.mansion.get_room(new_room_name)
-                                current_player.move(new_room, self.get_coordinates(new_room))
+                            if used:
                                 print(f"{current_player.name} used the secret passage to move to {new_room.name}.")
                                 self.update_visualization()
                             else:
@@ -359,25 +447,23 @@ class GameManager:
                     # Error catch for incorrect input
                     print("Invalid action. Please enter 'move', 'suggest', 'accuse', 'secret', or 'quit'.")
                     continue
-            if len(self.players) == self.num_players_elim:
+                if not game_over:
+                    self.end_turn(current_player)
+                turns += 1
+            if self.all_players_eliminated():
                 # Game ends if all players are eliminated
                 print(f"No players remain, the game is over.")
                 print(f"The solution was Room: {self.solution.room}, Character: {self.solution.character}, Weapon: {self.solution.weapon}")
                 print(f"Thanks for playing, better luck next time!")
+                self.finish_game(None, turns)
                 exit()
             else:
                 # Advance to the next player.
                 current_player_index = (current_player_index + 1) % len(self.players)
 
+    # Get the (row, column) of a tile in the mansion grid.
     def get_coordinates(self, position):
-        # Get the grid
-        if position is None:
-            raise ValueError("The provided position is None. Please ensure the player is properly initialized and moved.")
-        for r in range(len(self.mansion.grid)):
-            for c in range(len(self.mansion.grid[0])):
-                if self.mansion.grid[r][c] == position:
-                    return r, c
-        raise ValueError(f"The position '{position}' was not found in the mansion grid. Please ensure the grid and player positions are properly tracked.")
+        return self.mansion.get_coordinates(position)
 
 if __name__ == "__main__":
     game = GameManager()
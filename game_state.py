@@ -0,0 +1,209 @@
+from collections import namedtuple
+
+from card_setup import STANDARD_DECK
+
+# Position of a player who is no longer on the board.
+OFF_BOARD = -1
+
+_MASK64 = (1 << 64) - 1
+
+
+# Mix a 64-bit counter into a well-spread 64-bit value (the SplitMix64 finalizer).
+def splitmix64(value):
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+# Roll two six-sided dice from a seed and a counter. The same seed and counter always give the same roll.
+def roll_dice(seed, counter):
+    value = splitmix64((seed + counter * 0xD1B54A32D192ED03) & _MASK64)
+    return value % 6 + 1 + (value // 6) % 6 + 1
+
+
+class Board:
+    """
+    The parts of a game that never change: tile numbering, rooms, secret passages, distances and cards.
+
+    A Board is built once per game from its Mansion and deck and shared by every GameState of that game,
+    so states never copy or touch the mansion's Room and Space objects.
+    """
+
+    def __init__(self, mansion, deck=STANDARD_DECK):
+        self.mansion = mansion
+        self.card_ids = deck.ids  # Card IDs by lowercase name.
+        # Mask of the characters, weapons and rooms of the deck, in card ID order.
+        self.category_masks = tuple(deck.type_masks[card_type] for card_type in ('character', 'weapon', 'room'))
+        self.all_cards = (1 << len(deck)) - 1  # Mask of every card.
+        self.rows, self.cols = mansion.rows, mansion.cols
+        self.start = mansion.start[0] * mansion.cols + mansion.start[1]  # Index of the starting tile.
+        self.room_cards = {}  # Card ID of the room on each room tile, or None for the starting tile.
+        self.passages = {}  # Tile index at the other end of each room's secret passage.
+        for tile, (r, c) in mansion.room_tiles():
+            self.room_cards[r * self.cols + c] = self.card_ids.get(tile.name.lower())
+            if tile.secret_passage is not None and tile.secret_passage in mansion.coordinates:
+                self.passages[r * self.cols + c] = mansion.index_of(tile.secret_passage)
+        self._table = None
+
+    # Shortest path table of the board, loaded on first use (see distances.DistanceTable).
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = self.mansion.distance_table()
+        return self._table
+
+    # Boards sent to other processes carry the distance table instead of the mansion.
+    def __getstate__(self):
+        return dict(self.__dict__, _table=self.table, mansion=None)
+
+    # Get the (row, column) of a tile index.
+    def coordinates(self, index):
+        return divmod(index, self.cols)
+
+    # Get the tile index of a (row, column) position, or pass a tile index through.
+    def index(self, position):
+        if not isinstance(position, (tuple, list)):
+            index = int(position)
+        else:
+            r, c = position
+            if not (0 <= r < self.rows and 0 <= c < self.cols):
+                raise ValueError(f"Coordinates {position} are out of range.")
+            index = r * self.cols + c
+        if not 0 <= index < self.rows * self.cols:
+            raise ValueError(f"Tile index {index} is out of range.")
+        return index
+
+    # Get the card ID of a card given by ID or by name.
+    def card_id(self, card):
+        if isinstance(card, int):
+            return card
+        card_id = self.card_ids.get(card.lower())
+        if card_id is None:
+            raise ValueError(f"Unknown card '{card}'.")
+        return card_id
+
+
+class GameState(namedtuple("GameState", ["board", "positions", "hands", "known", "solution", "active", "turn",
+                                         "turns", "dice_roll", "seed", "counter", "winner"])):
+    """
+    Immutable snapshot of a game, for bots that search ahead.
+
+    positions holds a tile index per seat (OFF_BOARD once eliminated); hands, known and solution are
+    card masks (see card_setup); active is a bit mask of the seats still in the game. Dice rolls come
+    from seed and counter, so a state always rolls the same way and needs no random.Random to copy.
+
+    apply(action) returns a new state and leaves this one unchanged. Fields that an action does not
+    change are shared between the two states, so applying an action costs a few small tuples and
+    never copies the mansion. States are hashable and compare equal when every field is equal.
+
+    Actions are the GameEngine tuples, with cards given by name or card ID and tiles by (row, column)
+    or tile index. Illegal actions raise ValueError instead of being rejected.
+    """
+
+    __slots__ = ()
+
+    # Snapshot a game in progress. The seed starts the state's own dice stream.
+    @classmethod
+    def from_engine(cls, engine, seed=0):
+        game = engine.game
+        board = Board(game.mansion, game.deck)
+        positions = tuple(OFF_BOARD if player.current_coordinates is None else board.index(player.current_coordinates)
+                          for player in game.players)
+        active = sum(1 << seat for seat, player in enumerate(game.players) if player.is_active)
+        winner = game.players.index(engine.winner) if engine.winner is not None else None
+        return cls(board, positions, tuple(player.hand_mask for player in game.players),
+                   tuple(player.known_mask for player in game.players), game.solution.mask, active,
+                   engine.current_player_index, engine.turns, engine.dice_roll, seed & _MASK64, 0, winner)
+
+    @property
+    def game_over(self):
+        return self.winner is not None or not self.active
+
+    # Check whether a seat is still in the game.
+    def is_active(self, seat):
+        return bool(self.active >> seat & 1)
+
+    # Check whether the current player is in a room and so may make a suggestion.
+    def can_suggest(self):
+        return self.positions[self.turn] in self.board.room_cards
+
+    # Roll the dice for the current player's move, unless a roll is already waiting.
+    def roll(self):
+        if self.dice_roll is not None:
+            return self
+        return self._replace(dice_roll=roll_dice(self.seed, self.counter), counter=self.counter + 1)
+
+    # Get the tile indices the current player can move to with the waiting roll, nearest first.
+    def legal_moves(self):
+        if self.dice_roll is None:
+            raise ValueError("Roll the dice before listing moves.")
+        return self.board.table.reachable_within(self.positions[self.turn], self.dice_roll)
+
+    # Give the state a new dice stream, e.g. for each determinization in a search.
+    def reseed(self, seed):
+        return self._replace(seed=seed & _MASK64, counter=0)
+
+    # Apply one action for the current player and return the resulting state.
+    def apply(self, action):
+        if self.game_over:
+            raise ValueError("The game is over.")
+        kind = action[0]
+        seat = self.turn
+
+        if kind == "move":
+            state = self.roll()
+            target = self.board.index(action[1])
+            steps = self.board.table.distance(self.positions[seat], target)
+            if steps > state.dice_roll:
+                raise ValueError(f"Tile {self.board.coordinates(target)} is not within a roll of {state.dice_roll}.")
+            positions = state.positions[:seat] + (target,) + state.positions[seat + 1:]
+            return state._end_turn(positions=positions, dice_roll=None)
+
+        if kind == "suggest":
+            room = self.board.room_cards.get(self.positions[seat], OFF_BOARD)
+            if room == OFF_BOARD:
+                raise ValueError("You must be in a room to make a suggestion.")
+            card_id = self.board.card_id
+            suggestion = 1 << card_id(action[1]) | 1 << card_id(action[2])
+            if room is not None:
+                suggestion |= 1 << room
+            # The other players are asked in seat order, and show their lowest matching card.
+            for other, hand in enumerate(self.hands):
+                disproving = hand & suggestion
+                if disproving and other != seat:
+                    shown = disproving & -disproving
+                    known = self.known[:seat] + (self.known[seat] | shown,) + self.known[seat + 1:]
+                    return self._end_turn(known=known)
+            return self._end_turn()
+
+        if kind == "accuse":
+            card_id = self.board.card_id
+            accusation = 1 << card_id(action[1]) | 1 << card_id(action[2]) | 1 << card_id(action[3])
+            if accusation == self.solution:
+                return self._end_turn(winner=seat)
+            positions = self.positions[:seat] + (OFF_BOARD,) + self.positions[seat + 1:]
+            return self._end_turn(positions=positions, active=self.active & ~(1 << seat))
+
+        if kind == "secret":
+            destination = self.board.passages.get(self.positions[seat])
+            if destination is None:
+                raise ValueError("There is no secret passage here.")
+            dice_roll = roll_dice(self.seed, self.counter)
+            positions = self.positions
+            if dice_roll % 2 == 0:
+                positions = positions[:seat] + (destination,) + positions[seat + 1:]
+            return self._end_turn(positions=positions, counter=self.counter + 1)
+
+        raise ValueError(f"Invalid action '{kind}'.")
+
+    # Count the turn and pass it to the next active player.
+    def _end_turn(self, **changes):
+        state = self._replace(turns=self.turns + 1, **changes)
+        if state.game_over:
+            return state
+        num_players = len(state.positions)
+        turn = (state.turn + 1) % num_players
+        while not state.active >> turn & 1:
+            turn = (turn + 1) % num_players
+        return state._replace(turn=turn)
@@ -0,0 +1,141 @@
+import cProfile
+import os
+import time
+
+# GameManager methods timed by default: the hot paths of a turn.
+GAME_METHODS = ("setup_game", "roll_dice", "validate_move", "get_coordinates", "move_player", "resolve_suggestion",
+                "resolve_accusation", "take_secret_passage", "update_visualization")
+
+
+class Instrumentation:
+    """
+    Opt-in counters and timers for the hot paths of games.
+
+    Pass one Instrumentation to any number of GameManagers or GameEngines (e.g. through run_batch) and
+    read report() at the end of the run. Timing works by replacing the methods on the instrumented
+    objects themselves with timed wrappers, so the classes are unchanged and games without
+    instrumentation run exactly the same code as before.
+
+    Timers count calls, total and longest time. Times are inclusive: take_secret_passage includes its
+    roll_dice. The "turn" timer covers a whole GameEngine.step, so the other timers are reported as a
+    share of turn time (setup_game runs before the first turn, so its share only compares the two).
+    With profile_every, games are also run under cProfile and the stats of every profile_every games
+    are dumped to profile_dir as .pstats files.
+    """
+
+    def __init__(self, methods=GAME_METHODS, profile_every=None, profile_dir="profiles"):
+        self.methods = methods  # GameManager methods to time.
+        self.timers = {}  # Calls, total and longest nanoseconds by timer name.
+        self.counters = {}  # Event counts by name.
+        self.games = 0  # Games started.
+        self.profile_every = profile_every  # Games per cProfile dump, or None to not profile.
+        self.profile_dir = profile_dir
+        self.profile_paths = []  # .pstats files written so far.
+        self._profile = None  # Profile of the games since the last dump.
+        self._profile_first = 0  # Number of the first game in the current profile.
+        self._profiled_games = 0  # Games finished while profiling.
+
+    # Replace methods of an object with timed wrappers, each timer named after the method unless renamed.
+    def attach(self, target, methods, names=None):
+        for method, name in zip(methods, names or methods):
+            setattr(target, method, self._timed(name, getattr(target, method)))
+
+    def attach_game(self, game):
+        self.attach(game, self.methods)
+        # Counters read from results, so the methods themselves are not changed.
+        resolve_suggestion, validate_move = game.resolve_suggestion, game.validate_move
+
+        def counted_suggestion(*args):
+            result = resolve_suggestion(*args)
+            self.count("players_asked", len(result[2]) + (result[0] is not None))
+            self.count("suggestions_disproved", result[0] is not None)
+            return result
+
+        def counted_validation(*args):
+            result = validate_move(*args)
+            self.count("moves_rejected", result[1] is not None)
+            return result
+
+        game.resolve_suggestion, game.validate_move = counted_suggestion, counted_validation
+
+    def attach_engine(self, engine):
+        self.attach(engine, ("step",), ("turn",))
+
+    def _timed(self, name, method):
+        timer = self.timers.setdefault(name, [0, 0, 0])
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                timer[0] += 1
+                timer[1] += elapsed
+                if elapsed > timer[2]:
+                    timer[2] = elapsed
+        return timed
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Called by GameManager when a game is set up and when it ends.
+    def start_game(self):
+        self.games += 1
+        if self.profile_every and self._profile is None:
+            self._profile_first = self._profiled_games + 1
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def end_game(self):
+        if self._profile is None:
+            return
+        self._profiled_games += 1
+        if self._profiled_games - self._profile_first + 1 >= self.profile_every:
+            self.dump_profile()
+
+    # Write the profile of the games since the last dump and start a new one.
+    def dump_profile(self):
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"games_{self._profile_first:08d}_{self._profiled_games:08d}.pstats")
+        self._profile.dump_stats(path)
+        self.profile_paths.append(path)
+        self._profile = None
+        return path
+
+    # Stop profiling, writing out any games profiled since the last dump.
+    def close(self):
+        if self._profile is None:
+            return
+        if self._profiled_games >= self._profile_first:
+            self.dump_profile()
+        else:
+            self._profile.disable()
+            self._profile = None
+
+    # Get the timers and counters of the run.
+    # Each timer has its calls, total seconds, mean and longest microseconds and share of the turn timer.
+    def report(self):
+        turn_time = self.timers.get("turn", (0, 0, 0))[1]
+        timers = {}
+        for name, (calls, total, longest) in sorted(self.timers.items(), key=lambda item: -item[1][1]):
+            timers[name] = {"calls": calls, "total": total / 1e9, "mean_us": total / calls / 1e3 if calls else 0.0,
+                            "max_us": longest / 1e3, "share": total / turn_time if turn_time else None}
+        return {"games": self.games, "timers": timers, "counters": dict(self.counters)}
+
+    # Format the report as a table.
+    def format_report(self):
+        report = self.report()
+        lines = [f"{report['games']} games",
+                 f"{'timer':<22} {'calls':>10} {'total (s)':>10} {'mean (us)':>10} {'max (us)':>10} {'of turn':>8}"]
+        for name, timer in report["timers"].items():
+            share = f"{timer['share']:.1%}" if timer["share"] is not None else ""
+            lines.append(f"{name:<22} {timer['calls']:>10} {timer['total']:>10.3f} {timer['mean_us']:>10.2f} "
+                         f"{timer['max_us']:>10.1f} {share:>8}")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"{name:<22} {value:>10}")
+        return "\n".join(lines)
@@ -0,0 +1,287 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tomllib
+from array import array
+from collections import OrderedDict
+
+# Tile types in a compiled layout.
+SPACE, ROOM, START = 0, 1, 2
+
+# Board layout files shipped with the game, and the standard board.
+LAYOUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+CLASSIC_LAYOUT = os.path.join(LAYOUT_DIR, "classic.json")
+
+# Compiled boards are cached in this directory, next to the layout file they were built from.
+CACHE_DIR_NAME = "__boardcache__"
+CACHE_MAGIC = b"CLUEBRD\x00"
+CACHE_VERSION = 2
+_CACHE_HEADER = struct.Struct("<8sII")  # Magic, format version and length of the JSON section table.
+
+# Compiled layouts already built or loaded, keyed by CompiledLayout.key.
+_compiled = OrderedDict()
+_CACHE_SIZE = 64
+
+# Layout specs already read, keyed by file path, modification time and size.
+_specs = {}
+
+
+class CompiledLayout:
+    """
+    Array form of a board's tiles and connections.
+
+    Tiles are numbered row by row (index = row * cols + col). tile_types holds SPACE, ROOM or START for
+    every tile, and the connections are stored in compressed sparse row form: the neighbors of tile i
+    are indices[indptr[i]:indptr[i + 1]]. Spaces connect to every adjacent tile; rooms and the start
+    connect only to adjacent spaces (their doors).
+
+    The arrays are array.array objects when the layout is compiled in memory, and memoryviews over
+    the cache file when it is loaded with load_layout.
+    """
+
+    def __init__(self, rows, cols, room_positions, start, tile_types=None, indptr=None, indices=None):
+        self.rows = rows
+        self.cols = cols
+        self.room_positions = tuple(tuple(position) for position in room_positions)
+        self.start = tuple(start)
+        self.key = (rows, cols, self.room_positions, self.start)  # Identifies the tile graph.
+        if tile_types is None:
+            tile_types, indptr, indices = self._build()
+        self.tile_types = tile_types
+        self.indptr = indptr
+        self.indices = indices
+        self.distance_buffers = None  # Distance table arrays read from the cache file, if any.
+        self.cached = False  # Whether the board was read from a cache file.
+
+    def _build(self):
+        rows, cols = self.rows, self.cols
+        tile_types = array('b', bytes(rows * cols))
+        for r, c in self.room_positions:
+            tile_types[r * cols + c] = ROOM
+        start_r, start_c = self.start
+        tile_types[start_r * cols + start_c] = START
+
+        indptr = [0]
+        indices = []
+        for index in range(rows * cols):
+            r, c = divmod(index, cols)
+            is_space = tile_types[index] == SPACE
+            for neighbor, inside in ((index - cols, r > 0), (index + cols, r < rows - 1),
+                                     (index - 1, c > 0), (index + 1, c < cols - 1)):
+                if inside and (is_space or tile_types[neighbor] == SPACE):
+                    indices.append(neighbor)
+            indptr.append(len(indices))
+        indptr, indices = array('i', indptr), array('i', indices)
+        return tile_types, indptr, indices
+
+    @property
+    def num_tiles(self):
+        return self.rows * self.cols
+
+    # Get the indices of the tiles connected to a tile.
+    def neighbors(self, index):
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    # Get the indices of the room and start tiles.
+    def room_indices(self):
+        return [index for index, tile_type in enumerate(self.tile_types) if tile_type != SPACE]
+
+    # Describe the board as neighbor index lists, with rooms marked as blocking further movement.
+    def graph(self):
+        indptr, indices = self.indptr, self.indices
+        neighbors = [list(indices[indptr[index]:indptr[index + 1]]) for index in range(self.num_tiles)]
+        blocking = [tile_type != SPACE for tile_type in self.tile_types]
+        return neighbors, blocking
+
+
+# Compile the tile graph of a layout. Compiled layouts are shared by every mansion with the same
+# grid size, room positions and start, whichever room cards end up in which room.
+def compile_layout(rows, cols, room_positions, start):
+    key = (rows, cols, room_positions, start)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = _remember(CompiledLayout(rows, cols, room_positions, start))
+    else:
+        _compiled.move_to_end(key)
+    return compiled
+
+
+def _remember(compiled):
+    _compiled[compiled.key] = compiled
+    _compiled.move_to_end(compiled.key)
+    if len(_compiled) > _CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+# Forget every compiled layout, e.g. to measure the cost of compiling.
+def clear_compiled():
+    _compiled.clear()
+
+
+# Get the layout spec of the standard board, optionally stretched to another size.
+# A layout spec is a dictionary with the grid size, the room positions (used in room card order),
+# the start position and the pairs of room names joined by secret passages.
+def default_layout(rows=10, cols=12):
+    spec = read_layout(CLASSIC_LAYOUT)
+    if (rows, cols) != (spec["rows"], spec["cols"]):
+        spec = dict(spec, rows=rows, cols=cols, start=(rows // 2, cols // 2))
+    return spec
+
+
+# Read a layout spec from a .json or .toml file.
+def read_layout(path):
+    status = os.stat(path)
+    key = (os.path.abspath(path), status.st_mtime_ns, status.st_size)
+    spec = _specs.get(key)
+    if spec is None:
+        with open(path, "rb") as file:
+            spec = _specs[key] = parse_layout(file.read(), path)
+    return spec
+
+
+# Parse and check the contents of a layout file. The format is taken from the file extension.
+def parse_layout(data, path):
+    try:
+        if path.endswith(".toml"):
+            raw = tomllib.loads(data.decode("utf-8"))
+        elif path.endswith(".json"):
+            raw = json.loads(data)
+        else:
+            raise ValueError(f"Unknown layout format for '{path}'. Use a .json or .toml file.")
+    except (tomllib.TOMLDecodeError, json.JSONDecodeError, UnicodeDecodeError) as error:
+        raise ValueError(f"Could not read the layout '{path}': {error}") from None
+
+    missing = [field for field in ("rows", "cols", "start", "rooms") if field not in raw]
+    if missing:
+        raise ValueError(f"The layout '{path}' is missing {', '.join(missing)}.")
+    rows, cols = raw["rows"], raw["cols"]
+    if not (isinstance(rows, int) and isinstance(cols, int) and rows > 0 and cols > 0):
+        raise ValueError(f"The layout '{path}' needs a positive number of rows and columns.")
+
+    def position(value):
+        if not (isinstance(value, (list, tuple)) and len(value) == 2 and all(isinstance(v, int) for v in value)):
+            raise ValueError(f"Invalid position {value!r} in the layout '{path}'. Positions are [row, column].")
+        r, c = value
+        if not (0 <= r < rows and 0 <= c < cols):
+            raise ValueError(f"The position {value!r} is outside the {rows}x{cols} grid of the layout '{path}'.")
+        return r, c
+
+    start = position(raw["start"])
+    rooms = tuple(position(value) for value in raw["rooms"])
+    if len(set(rooms + (start,))) != len(rooms) + 1:
+        raise ValueError(f"Two rooms or a room and the start share a tile in the layout '{path}'.")
+    passages = []
+    for pair in raw.get("secret_passages", []):
+        if not (isinstance(pair, (list, tuple)) and len(pair) == 2 and all(isinstance(name, str) for name in pair)):
+            raise ValueError(f"Invalid secret passage {pair!r} in the layout '{path}'. Use a pair of room names.")
+        passages.append(tuple(pair))
+    return {
+        "name": raw.get("name", os.path.splitext(os.path.basename(path))[0]),
+        "rows": rows,
+        "cols": cols,
+        "rooms": rooms,
+        "start": start,
+        "secret_passages": tuple(passages),
+    }
+
+
+# Read a layout file and load its compiled board from the cache, compiling it on first use.
+# The cache file is named after a hash of the layout file, so editing the layout recompiles it. It holds
+# the tile types, connections and (for small boards) distance table, and is memory-mapped rather than rebuilt, so every
+# game (and every worker process) that loads the board shares the same pages.
+# Returns the layout spec; mansions built from it with one room card per room use the loaded board.
+def load_layout(path, cache_dir=None):
+    spec = read_layout(path)
+    key = (spec["rows"], spec["cols"], spec["rooms"], spec["start"])
+    compiled = _compiled.get(key)
+    if compiled is not None and compiled.cached:
+        _compiled.move_to_end(key)
+        return spec
+
+    with open(path, "rb") as file:
+        digest = hashlib.blake2b(file.read(), digest_size=16, person=b"board%d" % CACHE_VERSION).hexdigest()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    cache_path = os.path.join(cache_dir, f"{digest}.board")
+    if not os.path.exists(cache_path):
+        compiled = CompiledLayout(*key)
+        try:
+            write_compiled(compiled, cache_path)
+        except OSError:
+            # Without a writable cache directory the board is only compiled in memory.
+            _remember(compiled)
+            return spec
+    _remember(read_compiled(cache_path))
+    return spec
+
+
+# Write a compiled board to a cache file, with its full distance table if it has up to
+# distances.FULL_TABLE_TILES tiles (larger boards build the rows they need as they are played).
+# The file is written under a temporary name and renamed, so readers never see a partial file.
+def write_compiled(compiled, path):
+    from distances import FULL_TABLE_TILES, MAX_ROLL, DistanceTable
+    arrays = {
+        "tile_types": (compiled.tile_types.typecode, compiled.tile_types.tobytes()),
+        "indptr": (compiled.indptr.typecode, compiled.indptr.tobytes()),
+        "indices": (compiled.indices.typecode, compiled.indices.tobytes()),
+    }
+    max_roll = MAX_ROLL
+    if len(compiled.tile_types) <= FULL_TABLE_TILES:
+        table = DistanceTable(*compiled.graph()).full()
+        max_roll = table.max_roll
+        arrays.update({
+            "distances": (table.distances.dtype.char, table.distances.tobytes()),
+            "order": (table.order.dtype.char, table.order.tobytes()),
+            "reachable_counts": (table.reachable_counts.dtype.char, table.reachable_counts.tobytes()),
+        })
+    sections = {}
+    offset = 0
+    for name, (typecode, data) in arrays.items():
+        sections[name] = [offset, len(data), typecode]
+        offset += len(data) + -len(data) % 8
+    section_table = json.dumps({
+        "rows": compiled.rows,
+        "cols": compiled.cols,
+        "rooms": compiled.room_positions,
+        "start": compiled.start,
+        "max_roll": max_roll,
+        "sections": sections,
+    }).encode()
+    section_table += b" " * (-(_CACHE_HEADER.size + len(section_table)) % 8)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(section_table)))
+        file.write(section_table)
+        for typecode, data in arrays.values():
+            file.write(data + bytes(-len(data) % 8))
+    os.replace(temporary, path)
+
+
+# Memory-map a cache file written by write_compiled.
+def read_compiled(path):
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, table_length = _CACHE_HEADER.unpack_from(buffer)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        raise ValueError(f"'{path}' is not a compiled board cache of version {CACHE_VERSION}.")
+    table = json.loads(buffer[_CACHE_HEADER.size:_CACHE_HEADER.size + table_length])
+    data_start = _CACHE_HEADER.size + table_length
+    view = memoryview(buffer)
+    arrays = {name: view[data_start + offset:data_start + offset + size].cast(typecode)
+              for name, (offset, size, typecode) in table["sections"].items()}
+
+    compiled = CompiledLayout(table["rows"], table["cols"], table["rooms"], table["start"],
+                              arrays["tile_types"], arrays["indptr"], arrays["indices"])
+    compiled.cached = True
+    if "distances" in arrays:
+        compiled.distance_buffers = {
+            "distances": arrays["distances"],
+            "order": arrays["order"],
+            "reachable_counts": arrays["reachable_counts"],
+            "max_roll": table["max_roll"],
+        }
+    return compiled
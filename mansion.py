@@ -1,66 +1,80 @@
+from functools import partial
+
+from layout import SPACE, compile_layout, default_layout, load_layout
+from route_planner import RoutePlanner
 from room import Room
 from space import Space
 
 class Mansion:
-    def __init__(self, room_cards):
+    def __init__(self, room_cards, rows=10, cols=12, layout=None):
         # Initialize the mansion with rooms based on the provided room cards.
+        # The layout is a layout file path or a spec from layout.load_layout; by default the standard board of the given size.
         self.rooms = {}  # Dictionary of room names to Room objects.
-        self.spaces = {}  # Dictionary of space names to Space objects.
-        self.grid = []  # 2D grid representing the mansion layout.
-        self._initialize_mansion(room_cards)
+        self.spaces = {}  # Dictionary of space names to the Space objects created so far.
+        self.coordinates = {}  # Dictionary of the tiles created so far to their (row, column) in the grid.
+        self.player_positions = {}  # Dictionary of players on the board to their (row, column).
+        self.layout = None  # Compiled tile types and connections of the board (see layout.CompiledLayout).
+        self.rows = 0  # Number of rows in the grid.
+        self.cols = 0  # Number of columns in the grid.
+        self.start = None  # (row, column) of the starting space.
+        self.grid = _GridView(self)  # 2D grid of tiles, as grid[r][c].
+        self.tiles = _TileView(self)  # Every tile in row order, so a tile's index is row * cols + column.
+        self._tiles = {}  # Tile objects created so far, by index.
+        self._distance_tables = {}  # Distance tables for this layout, built on first use.
+        self._route_planner = None  # Route planner for this layout, built on first use.
+        if layout is None:
+            layout = default_layout(rows, cols)
+        elif isinstance(layout, str):
+            layout = load_layout(layout)
+        self._initialize_mansion(room_cards, layout)
     
-    # Create Room objects for each card and populate the rooms dictionary.
-    def _initialize_mansion(self, room_cards):
-        for card in room_cards:
-            self.rooms[card.name] = Room(card.name)
-        
-        # Define the mansion grid dimensions.
-        rows, cols = 10, 12
-        self.grid = [[None for _ in range(cols)] for _ in range(rows)]
-
-        # Define positions for the rooms in the mansion grid.
-        room_positions = [
-            (0, 0), (0, 7), (0, 11), (4, 0), (8, 0), (9, 5), (9, 11), (0, 3), (6, 11), (9, 2), (9, 9)
-        ]
-
-        # Place Room objects in their grid positions.
+    # Create Room objects for each card and place them on the compiled board.
+    # Spaces are only created when they are first looked up, so large boards cost a few bytes per tile.
+    def _initialize_mansion(self, room_cards, layout):
+        self.rows, self.cols = layout["rows"], layout["cols"]
+        self.start = tuple(layout["start"])
+        room_positions = tuple(tuple(position) for position in layout["rooms"][:len(room_cards)])
+        self.layout = compile_layout(self.rows, self.cols, room_positions, self.start)
+
+        # Place Room objects in their grid positions, connected to the spaces next to them.
         for pos, card in zip(room_positions, room_cards):
             r, c = pos
-            self.grid[r][c] = self.rooms[card.name]
-
-        # Add a starting space at the center of the grid.
-        middle_row, middle_col = rows // 2, cols // 2
-        self.grid[middle_row][middle_col] = self.rooms.get("Start Space", Room("Start Space"))
-
-        # Fill the rest of the grid with Space objects.
-        for r in range(rows):
-            for c in range(cols):
-                if self.grid[r][c] is None:
-                    space_name = f"Space_{r}_{c}"
-                    self.spaces[space_name] = Space(space_name)
-                    self.grid[r][c] = self.spaces[space_name]
-
-        # Establish connections between adjacent Space objects.
-        for r in range(rows):
-            for c in range(cols):
-                current_tile = self.grid[r][c]
-                if isinstance(current_tile, Space):
-                    if r > 0 and isinstance(self.grid[r - 1][c], Space):
-                        current_tile.add_connection(self.grid[r - 1][c])
-                    if r < rows - 1 and isinstance(self.grid[r + 1][c], Space):
-                        current_tile.add_connection(self.grid[r + 1][c])
-                    if c > 0 and isinstance(self.grid[r][c - 1], Space):
-                        current_tile.add_connection(self.grid[r][c - 1])
-                    if c < cols - 1 and isinstance(self.grid[r][c + 1], Space):
-                        current_tile.add_connection(self.grid[r][c + 1])
-
-        # Add secret passages between specific rooms.
-        if "Study" in self.rooms and "Kitchen" in self.rooms:
-            self.rooms["Study"].set_secret_passage(self.rooms["Kitchen"])
-            self.rooms["Kitchen"].set_secret_passage(self.rooms["Study"])
-        if "Conservatory" in self.rooms and "Lounge" in self.rooms:
-            self.rooms["Conservatory"].set_secret_passage(self.rooms["Lounge"])
-            self.rooms["Lounge"].set_secret_passage(self.rooms["Conservatory"])
+            index = r * self.cols + c
+            self.rooms[card.name] = room = Room(card.name, partial(self._connected_tiles, index))
+            self._add_tile(room, index)
+
+        # Add a starting space.
+        index = self.start[0] * self.cols + self.start[1]
+        self._add_tile(Room("Start Space", partial(self._connected_tiles, index)), index)
+
+        # Add secret passages between the given pairs of rooms.
+        for first, second in layout["secret_passages"]:
+            if first in self.rooms and second in self.rooms:
+                self.rooms[first].set_secret_passage(self.rooms[second])
+                self.rooms[second].set_secret_passage(self.rooms[first])
+
+    def _add_tile(self, tile, index):
+        self._tiles[index] = tile
+        self.coordinates[tile] = divmod(index, self.cols)
+
+    # Get the tile at an index, creating the Space object on first use.
+    def tile_at(self, index):
+        tile = self._tiles.get(index)
+        if tile is None:
+            if not 0 <= index < self.rows * self.cols:
+                raise IndexError(f"Tile index {index} is outside the mansion grid.")
+            r, c = divmod(index, self.cols)
+            space_name = f"Space_{r}_{c}"
+            tile = self.spaces[space_name] = Space(space_name, partial(self._connected_tiles, index))
+            self._add_tile(tile, index)
+        return tile
+
+    def _connected_tiles(self, index):
+        return [self.tile_at(neighbor) for neighbor in self.layout.neighbors(index)]
+
+    # Get the room and start tiles with their (row, column).
+    def room_tiles(self):
+        return [(self.tile_at(index), divmod(index, self.cols)) for index in self.layout.room_indices()]
 
     # Get a Room object by its name.
     def get_room(self, name):
@@ -68,7 +82,94 @@ class Mansion:
 
     # Get a Space object by its name.
     def get_space(self, name):
-        return self.spaces.get(name, None)
+        space = self.spaces.get(name)
+        if space is None and name.startswith("Space_"):
+            try:
+                r, c = map(int, name[len("Space_"):].split("_"))
+            except ValueError:
+                return None
+            if 0 <= r < self.rows and 0 <= c < self.cols and self.layout.tile_types[r * self.cols + c] == SPACE:
+                space = self.tile_at(r * self.cols + c)
+        return space
+
+    # Get the (row, column) of a tile in the grid.
+    def get_coordinates(self, tile):
+        if tile is None:
+            raise ValueError("The provided position is None. Please ensure the player is properly initialized and moved.")
+        try:
+            return self.coordinates[tile]
+        except KeyError:
+            raise ValueError(f"The position '{tile}' was not found in the mansion grid. Please ensure the grid and player positions are properly tracked.") from None
+
+    # Get the index of a tile in the tiles list.
+    def index_of(self, tile):
+        r, c = self.get_coordinates(tile)
+        return r * self.cols + c
+
+    # Get the (row, column) of a tile index.
+    def index_coordinates(self, index):
+        return divmod(index, self.cols)
+
+    # Describe the structure of the board: its size, where the rooms are and which are joined by secret passages.
+    # Mansions with the same key have the same tile graph, whichever room cards they were built from.
+    def layout_key(self):
+        rows, cols, room_positions, start = self.layout.key
+        rooms = tuple(sorted(room_positions + (start,)))
+        passages = tuple(sorted((self.coordinates[room], self.coordinates[room.secret_passage])
+                                for room in self.rooms.values()
+                                if room.secret_passage is not None and room in self.coordinates
+                                and room.secret_passage in self.coordinates))
+        return rows, cols, rooms, passages
+
+    # Get the shortest path table for this board (see distances.DistanceTable).
+    def distance_table(self, secret_passages=False):
+        table = self._distance_tables.get(secret_passages)
+        if table is None:
+            from distances import DistanceTable
+            table = self._distance_tables[secret_passages] = DistanceTable.from_mansion(self, secret_passages)
+        return table
+
+    # Get the number of steps a move needs between two tiles, or None if one cannot reach the other.
+    def distance(self, source, target):
+        table = self.distance_table()
+        steps = table.distance(self.index_of(source), self.index_of(target))
+        return None if steps == table.unreachable else steps
+
+    # Get the indices of every tile a player on the given tile can move to with the given roll.
+    def reachable_within(self, tile, roll):
+        return self.distance_table().reachable_within(self.index_of(tile), roll)
+
+    # Get the route planner for this board (see route_planner.RoutePlanner).
+    def route_planner(self):
+        if self._route_planner is None:
+            self._route_planner = RoutePlanner.from_mansion(self)
+        return self._route_planner
+
+    # Rank the named rooms by how soon a player on the given tile can reach them, with this turn's roll.
+    # Returns (expected turns, room name, action) for every reachable room, fastest first. The action is
+    # the one to take this turn: ("move", (row, column)), ("secret",), or None if already in the room.
+    def best_room_targets(self, position, roll, wanted_rooms):
+        targets = []
+        for name in wanted_rooms:
+            room = self.get_room(name)
+            if room is None or room not in self.coordinates:
+                raise ValueError(f"There is no room named '{name}' on the board.")
+            targets.append(self.index_of(room))
+        ranked = self.route_planner().best_targets(self.index_of(position), roll, targets)
+        return [(turns, self.tile_at(target).name,
+                 ("move", self.index_coordinates(action[1])) if action and action[0] == "move" else action)
+                for turns, target, action in ranked]
+
+    # Record where a player is on the board, or remove them if they have left it.
+    def update_player_position(self, player, coordinates):
+        if coordinates is None:
+            self.player_positions.pop(player, None)
+        else:
+            self.player_positions[player] = coordinates
+
+    # Get the (row, column) of a player on the board, or None if they are not on it.
+    def get_player_coordinates(self, player):
+        return self.player_positions.get(player)
 
     # Get a representation of the mansion layout.
     def show_mansion_layout(self):
@@ -81,4 +182,56 @@ class Mansion:
                 elif isinstance(tile, Space):
                     connections_list = tile.get_connections() if tile.get_connections() else []
                     connections = ", ".join([connected_space.name for connected_space in connections_list])
-                    print(f"Space {tile.name}: Connected to -> {connections}")
\ No newline at end of file
+                    print(f"Space {tile.name}: Connected to -> {connections}")
+
+
+# Read-only grid[r][c] access to a mansion's tiles, creating them as they are looked up.
+class _GridView:
+    def __init__(self, mansion):
+        self._mansion = mansion
+
+    def __len__(self):
+        return self._mansion.rows
+
+    def __getitem__(self, r):
+        if not -self._mansion.rows <= r < self._mansion.rows:
+            raise IndexError("grid row out of range")
+        return _GridRow(self._mansion, r % self._mansion.rows)
+
+    def __iter__(self):
+        return (self[r] for r in range(len(self)))
+
+
+class _GridRow:
+    def __init__(self, mansion, r):
+        self._mansion = mansion
+        self._r = r
+
+    def __len__(self):
+        return self._mansion.cols
+
+    def __getitem__(self, c):
+        cols = self._mansion.cols
+        if not -cols <= c < cols:
+            raise IndexError("grid column out of range")
+        return self._mansion.tile_at(self._r * cols + c % cols)
+
+    def __iter__(self):
+        return (self[c] for c in range(len(self)))
+
+
+# Read-only sequence of a mansion's tiles in row order, creating them as they are looked up.
+class _TileView:
+    def __init__(self, mansion):
+        self._mansion = mansion
+
+    def __len__(self):
+        return self._mansion.rows * self._mansion.cols
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("tile index out of range")
+        return self._mansion.tile_at(index % len(self))
+
+    def __iter__(self):
+        return (self._mansion.tile_at(index) for index in range(len(self)))
@@ -0,0 +1,433 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from agents import DeductionAgent
+from eval_cache import EvalCache, state_key
+from game_state import OFF_BOARD
+
+# Rounds a rollout plays past the root before it is scored on the cards each player has seen.
+# Playing every rollout to the end is too noisy to tell moves apart with a few hundred rollouts.
+ROLLOUT_ROUNDS = 3
+
+# Rollouts averaged into a cached evaluation of a position before the evaluation cache answers for it.
+CACHED_ROLLOUTS = 8
+
+# Evaluation caches opened by worker processes, by shared memory name.
+_worker_caches = {}
+
+
+class Node:
+    """
+    One action in the search tree, with the statistics of the iterations that chose it.
+
+    wins is the total reward of the seat that chose the action. availability counts the iterations in
+    which the action was legal, which is what UCB compares against in information set MCTS: actions
+    that are only sometimes possible (e.g. a suggestion from a room the dice rarely reach) are not
+    penalized for the iterations in which they could not be chosen.
+    """
+
+    __slots__ = ("parent", "action", "seat", "children", "visits", "wins", "availability")
+
+    def __init__(self, parent=None, action=None, seat=None):
+        self.parent = parent
+        self.action = action
+        self.seat = seat  # Seat that chose the action.
+        self.children = {}  # Child nodes by action.
+        self.visits = 0
+        self.wins = 0.0
+        self.availability = 0
+
+    def ucb(self, exploration):
+        return self.wins / self.visits + exploration * math.sqrt(math.log(self.availability) / self.visits)
+
+
+# Get the unseen cards of one seat in a state: those not in their hand or known to them.
+def unseen_mask(state, seat):
+    return state.board.all_cards & ~(state.hands[seat] | state.known[seat])
+
+
+# Get the single remaining candidate of each card type if the seat's information pins down the solution.
+# category_masks holds the mask of each card type, characters first (see game_state.Board).
+def forced_accusation(unseen, category_masks):
+    cards = []
+    for category in category_masks:
+        candidates = unseen & category
+        if candidates & (candidates - 1):
+            return None
+        if not candidates:
+            return None
+        cards.append(candidates.bit_length() - 1)
+    return cards
+
+
+# Get the tile reached by moving as far as the roll allows towards a target tile.
+def step_towards(state, target):
+    state = state.roll()
+    table = state.board.table
+    reachable = table.reachable_within(state.positions[state.turn], state.dice_roll)
+    remaining = table.row(target)[reachable]
+    return state, int(reachable[remaining.argmin()])
+
+
+# Get the search actions of the player to move in a state.
+# Moves are abstracted to "head for room tile t" and suggestions to "suggest here", which keeps the
+# branching factor to about one per room and lets the same action be chosen before the roll is known.
+def legal_actions(state):
+    seat = state.turn
+    board = state.board
+    unseen = unseen_mask(state, seat)
+    forced = forced_accusation(unseen, board.category_masks)
+    if forced:
+        character, weapon, room = forced
+        return [("accuse", room, character, weapon)]
+
+    position = state.positions[seat]
+    actions = [("toward", tile) for tile in board.room_cards if tile != position and tile != board.start]
+    if position in board.room_cards:
+        actions.append(("suggest",))
+    if position in board.passages:
+        actions.append(("secret",))
+    return actions
+
+
+def _bits(mask):
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(low.bit_length() - 1)
+        mask ^= low
+    return cards
+
+
+# Pick the character and weapon of a suggestion at random from the given cards (or any, if none are left).
+def suggestion_cards(candidates, rng, category_masks):
+    characters = _bits(candidates & category_masks[0]) or _bits(category_masks[0])
+    weapons = _bits(candidates & category_masks[1]) or _bits(category_masks[1])
+    return rng.choice(characters), rng.choice(weapons)
+
+
+# Apply a search action to a state. Suggested cards are drawn from candidates, or from the cards the
+# player to move has not seen.
+def apply_action(state, action, rng, candidates=None):
+    if action[0] == "toward":
+        state, tile = step_towards(state, action[1])
+        return state.apply(("move", tile))
+    if action[0] == "suggest":
+        if candidates is None:
+            candidates = unseen_mask(state, state.turn)
+        return state.apply(("suggest",) + suggestion_cards(candidates, rng, state.board.category_masks))
+    if action[0] == "accuse":
+        room, character, weapon = action[1:]
+        return state.apply(("accuse", room, character, weapon))
+    return state.apply(action)
+
+
+# Choose a rollout action: the same heuristic as agents.BotAgent, on card masks.
+def rollout_action(state, rng):
+    seat = state.turn
+    board = state.board
+    unseen = unseen_mask(state, seat)
+    forced = forced_accusation(unseen, board.category_masks)
+    if forced:
+        character, weapon, room = forced
+        return ("accuse", room, character, weapon)
+
+    position = state.positions[seat]
+    room = board.room_cards.get(position, OFF_BOARD)
+    if room is not None and room != OFF_BOARD and unseen >> room & 1:
+        return ("suggest",) + suggestion_cards(unseen, rng, board.category_masks)
+    passage = board.passages.get(position)
+    if passage is not None and unseen >> board.room_cards[passage] & 1:
+        return ("secret",)
+
+    targets = [tile for tile, card in board.room_cards.items() if card is not None and unseen >> card & 1]
+    if not targets:
+        targets = [tile for tile, card in board.room_cards.items() if card is not None]
+    state = state.roll()
+    table = board.table
+    reachable = table.reachable_within(position, state.dice_roll)
+    remaining = table.rows(targets)[:, reachable].min(axis=0)
+    return ("move", int(reachable[remaining.argmin()]))
+
+
+# Play a state out with the rollout heuristic and return the reward of every seat.
+# Unfinished rollouts score each seat by the share of the cards outside the envelope it has seen.
+def rollout(state, rng, rounds=ROLLOUT_ROUNDS):
+    stop = state.turns + rounds * len(state.positions)
+    while not state.game_over and state.turns < stop:
+        action = rollout_action(state, rng)
+        state = state.apply(action) if action[0] != "move" else state.roll().apply(action)
+    num_players = len(state.positions)
+    if state.winner is not None:
+        return [1.0 if seat == state.winner else 0.0 for seat in range(num_players)]
+    all_cards = state.board.all_cards
+    others = all_cards.bit_count() - len(state.board.category_masks)
+    return [0.5 * (all_cards & ~unseen_mask(state, seat)).bit_count() / others if state.is_active(seat) else 0.0
+            for seat in range(num_players)]
+
+
+# Score a state for every seat with a rollout, or from an evaluation cache (see eval_cache.EvalCache).
+# The cache keeps the number of rollouts of each position as seen by the viewer and the sum of their
+# rewards, and answers with their mean once CACHED_ROLLOUTS have been played.
+def evaluate(state, rng, viewer, eval_cache=None):
+    if eval_cache is None or state.game_over:
+        return rollout(state, rng)
+    key = state_key(state, viewer)
+    cached = eval_cache.get(key)
+    if cached is not None and cached[0] >= CACHED_ROLLOUTS:
+        return [total / cached[0] for total in cached[1:]]
+    rewards = rollout(state, rng)
+    if cached is None:
+        cached = (0.0,) * (len(rewards) + 1)
+    eval_cache.put(key, (cached[0] + 1,) + tuple(total + reward for total, reward in zip(cached[1:], rewards)))
+    return rewards
+
+
+class DealSampler:
+    """
+    Samples deals of the unseen cards that agree with a player's deduction.Knowledge.
+
+    Cards with a known owner stay with them. The envelope gets a uniformly drawn possible card of each
+    missing type, and the other cards are shuffled into the free places in the hands. Deals that give a
+    player a card they can't hold, break a "holds one of" clause or match a wrong accusation are drawn
+    again, so every consistent deal is equally likely, as with sampler.BatchSampler.
+    """
+
+    def __init__(self, knowledge):
+        self.num_players = knowledge.num_players
+        self.envelope = knowledge.envelope
+        self.has = list(knowledge.has_bits)
+        self.hasnt = list(knowledge.hasnt_bits)
+        self.clauses = list(knowledge.clauses)
+        self.wrong_accusations = set(knowledge.wrong_accusations)
+        owned = 0
+        for bits in self.has:
+            owned |= bits
+        # Possible envelope cards of each type whose envelope card is not known yet.
+        self.draws = []
+        for category in knowledge.category_bits:
+            if not self.has[self.envelope] & category:
+                possible = _bits(category & ~self.hasnt[self.envelope] & ~owned)
+                if not possible:
+                    raise ValueError("The observations contradict each other: no card can be in the envelope.")
+                self.draws.append(possible)
+        # Owner of each free place in the hands, one entry per card still to be dealt.
+        self.places = [seat for seat in range(self.num_players)
+                       for _ in range(knowledge.hand_sizes[seat] - self.has[seat].bit_count())]
+        self.free = _bits(knowledge.all_cards & ~owned)
+        if len(self.places) != len(self.free) - len(self.draws):
+            raise ValueError("The hand sizes do not match the number of cards.")
+
+    # Return the hand masks of every seat and the solution mask of one consistent deal.
+    def sample(self, rng, attempts=10000):
+        for _ in range(attempts):
+            deal = self._try_sample(rng)
+            if deal is not None:
+                return deal
+        raise ValueError("Could not sample a deal consistent with the observations.")
+
+    # Draw a deal that agrees with the known owners and hand sizes, or None if it breaks another fact.
+    def _try_sample(self, rng):
+        hands = list(self.has)
+        envelope = self.envelope
+        solution = hands[envelope]
+        for possible in self.draws:
+            solution |= 1 << rng.choice(possible)
+        if tuple(sorted(_bits(solution))) in self.wrong_accusations:
+            return None
+        hands[envelope] = solution
+        free = [card for card in self.free if not solution >> card & 1]
+        rng.shuffle(free)
+        hasnt = self.hasnt
+        for card, seat in zip(free, self.places):
+            if hasnt[seat] >> card & 1:
+                return None
+            hands[seat] |= 1 << card
+
+        for seat, cards in self.clauses:
+            if not hands[seat] & cards:
+                return None
+        return tuple(hands[:self.num_players]), solution
+
+
+# Run ISMCTS iterations from a root state until the rollout or time budget is spent, and at least one.
+# Every iteration deals the unseen cards again and gives the state fresh dice, then walks down the tree
+# choosing among the actions legal in that deal. The searching player suggests cards from the candidates
+# mask. Leaves are scored by evaluate, with the evaluation cache if one is given.
+# Returns the root and the number of iterations run.
+def search(root, state, sampler, rng, rollouts=None, time_budget=None, exploration=0.7, candidates=None,
+           eval_cache=None):
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    seat = state.turn
+    iterations = 0
+    while True:
+        if rollouts is not None and iterations >= rollouts:
+            break
+        if deadline is not None and iterations and time.perf_counter() >= deadline:
+            break
+        if rollouts is None and deadline is None:
+            break
+        iterations += 1
+
+        hands, solution = sampler.sample(rng)
+        known = tuple(state.known[other] if other == seat else hands[other] for other in range(len(hands)))
+        determinized = state._replace(hands=hands, solution=solution, known=known).reseed(rng.getrandbits(64))
+
+        # Selection and expansion.
+        node = root
+        current = determinized
+        while not current.game_over:
+            actions = legal_actions(current)
+            untried = [action for action in actions if action not in node.children]
+            for action in actions:
+                child = node.children.get(action)
+                if child is not None:
+                    child.availability += 1
+            if untried:
+                action = rng.choice(untried)
+                child = node.children[action] = Node(node, action, current.turn)
+                child.availability += 1
+                node = child
+                current = apply_action(current, action, rng, candidates if current.turn == seat else None)
+                break
+            node = max((node.children[action] for action in actions), key=lambda child: child.ucb(exploration))
+            current = apply_action(current, node.action, rng, candidates if current.turn == seat else None)
+
+        # Simulation and backpropagation.
+        rewards = evaluate(current, rng, seat, eval_cache)
+        while node is not root:
+            node.visits += 1
+            node.wins += rewards[node.seat]
+            node = node.parent
+        root.visits += 1
+    return root, iterations
+
+
+# Search from scratch in a worker process and return the root's child statistics.
+# A shared evaluation cache is given by name and opened once per worker.
+def _search_in_worker(state, sampler, seed, rollouts, time_budget, exploration, candidates, cache_name=None):
+    eval_cache = None
+    if cache_name is not None:
+        eval_cache = _worker_caches.get(cache_name)
+        if eval_cache is None:
+            eval_cache = _worker_caches[cache_name] = EvalCache.attach(cache_name, len(state.positions) + 1)
+    before = dict(eval_cache.stats) if eval_cache is not None else {}
+    root, iterations = search(Node(), state, sampler, random.Random(seed), rollouts, time_budget, exploration,
+                              candidates, eval_cache)
+    cache_stats = {name: count - before[name] for name, count in eval_cache.stats.items()} if before else {}
+    return {action: (child.visits, child.wins) for action, child in root.children.items()}, iterations, cache_stats
+
+
+class ISMCTSAgent(DeductionAgent):
+    """
+    Bot that chooses its actions with information set Monte Carlo tree search.
+
+    It keeps a deduction.Knowledge like DeductionAgent and accuses as soon as the solution is certain.
+    Otherwise it searches from a GameState snapshot: each iteration deals the cards it has not seen in
+    a way that agrees with its knowledge, so the tree is shared by every deal it thinks possible. Other
+    players are played by the same search in the tree and by the BotAgent heuristic in rollouts.
+
+    Give a rollout budget (rollouts per move), a time budget (seconds per move) or both; the search
+    stops at whichever runs out first. Every move is searched with a new tree: the other players'
+    turns sit two levels below the root, where a few hundred rollouts leave only a handful of visits,
+    so there is little to keep. With workers > 1 the rollouts of each move are split across a process
+    pool, each worker growing its own tree from the same root (root parallelization), and the visit
+    counts are summed. stats records the rollouts played and the time spent, and rollouts_per_second
+    gives the rate.
+
+    Leaves can be scored from an eval_cache.EvalCache of len(players) + 1 values, shared by any number of
+    agents and games: positions the agent has already scored CACHED_ROLLOUTS times are not played out
+    again. Workers use the cache only if it was made with shared=True.
+    """
+
+    def __init__(self, rng=None, rollouts=200, time_budget=None, exploration=0.7, workers=None, eval_cache=None):
+        # Rollouts and time_budget may each be None, but not both.
+        if rollouts is None and time_budget is None:
+            raise ValueError("Give a number of rollouts, a time budget, or both.")
+        if rollouts is not None and rollouts < 1:
+            raise ValueError(f"The rollout budget must be at least 1, not {rollouts}.")
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError(f"The time budget must be positive, not {time_budget}.")
+        super().__init__(rng)
+        self.eval_cache = eval_cache  # Cache of leaf evaluations, if any.
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.workers = workers
+        self.stats = {"searches": 0, "rollouts": 0, "seconds": 0.0}
+        self._executor = None
+
+    @property
+    def rollouts_per_second(self):
+        return self.stats["rollouts"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+
+    def choose_action(self, engine):
+        solution = self.knowledge.known_solution()
+        if solution:
+            character, weapon, room = solution
+            return ("accuse", room, character, weapon)
+
+        state = engine.snapshot(self.rng.getrandbits(64))
+        possible = sum(1 << card for card in self.knowledge.possible_solution_cards())
+        known = 0
+        for owner, bits in enumerate(self.knowledge.has_bits):
+            if owner != self.knowledge.envelope:
+                known |= bits
+        state = state._replace(known=state.known[:self.seat] + (known & ~state.hands[self.seat],)
+                               + state.known[self.seat + 1:])
+        sampler = DealSampler(self.knowledge)
+
+        start = time.perf_counter()
+        if self.workers and self.workers > 1:
+            visits, iterations = self._parallel_search(state, sampler, possible)
+            action = max(visits, key=visits.get)
+        else:
+            root, iterations = search(Node(), state, sampler, self.rng, self.rollouts, self.time_budget,
+                                      self.exploration, possible, self.eval_cache)
+            action = max(root.children, key=lambda action: root.children[action].visits)
+        self.stats["searches"] += 1
+        self.stats["rollouts"] += iterations
+        self.stats["seconds"] += time.perf_counter() - start
+        return self._engine_action(engine, state, action, possible)
+
+    def _parallel_search(self, state, sampler, possible):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        rollouts = None if self.rollouts is None else -(-self.rollouts // self.workers)
+        cache_name = self.eval_cache.name if self.eval_cache is not None and self.eval_cache.shared else None
+        futures = [self._executor.submit(_search_in_worker, state, sampler, self.rng.getrandbits(64), rollouts,
+                                         self.time_budget, self.exploration, possible, cache_name)
+                   for _ in range(self.workers)]
+        visits = {}
+        iterations = 0
+        for future in futures:
+            children, count, cache_stats = future.result()
+            iterations += count
+            for name, change in cache_stats.items():
+                self.eval_cache.stats[name] += change
+            for action, (child_visits, _) in children.items():
+                visits[action] = visits.get(action, 0) + child_visits
+        return visits, iterations
+
+    # Turn a search action into a GameEngine action.
+    def _engine_action(self, engine, state, action, possible):
+        mansion = engine.game.mansion
+        if action[0] == "toward":
+            dice_roll = engine.roll()
+            _, tile = step_towards(state._replace(dice_roll=dice_roll), action[1])
+            return ("move", mansion.index_coordinates(tile))
+        if action[0] == "suggest":
+            cards = suggestion_cards(possible, self.rng, state.board.category_masks)
+            return ("suggest",) + tuple(self.deck.names[card] for card in cards)
+        if action[0] == "accuse":
+            return ("accuse",) + tuple(self.deck.names[card] for card in action[1:])
+        return action
+
+    # Shut down the process pool, if one was started.
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
@@ -0,0 +1,224 @@
+import argparse
+import os
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+import event_log
+from card_setup import STANDARD_DECK
+from renderer import PLAYER_LABEL_SPACING, draw_board
+
+# Colors of the player tokens by seat, repeating for larger tables.
+TOKEN_COLORS = ((214, 39, 40), (31, 119, 180), (44, 160, 44), (255, 127, 14), (148, 103, 189), (140, 86, 75),
+                (227, 119, 194), (23, 190, 207))
+
+# Font size of the player tokens, as for the labels of BoardRenderer.
+TOKEN_FONT_SIZE = 8
+
+# Board rasters already drawn, keyed by the board, figure size and resolution.
+_boards = OrderedDict()
+_CACHE_SIZE = 16
+
+
+class BoardRaster:
+    """
+    The static board drawn once with Agg and reduced to a palette image.
+
+    pixels is a rows x columns array of palette indices. The board uses the first entries of the
+    palette and the token colors the last ones, so frames are built by writing token indices into a
+    copy of pixels, and GIF and PNG writers need no color conversion. Tile centers map to pixels
+    linearly: column = origin[0] + c * step[0], row = origin[1] + r * step[1].
+    """
+
+    def __init__(self, mansion, figsize=(12, 10), dpi=80):
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        draw_board(self.ax, mansion)
+        self.fig.canvas.draw()
+        rgb = np.asarray(self.fig.canvas.buffer_rgba())[..., :3]
+
+        board_colors = 256 - len(TOKEN_COLORS)
+        board = Image.fromarray(rgb).quantize(board_colors, dither=Image.Dither.NONE)
+        self.pixels = np.asarray(board)
+        palette = board.getpalette()[:3 * board_colors]
+        self.palette = palette + [0] * (3 * board_colors - len(palette)) + [value for color in TOKEN_COLORS
+                                                                            for value in color]
+        self.token_indices = range(board_colors, 256)  # Palette index of each token color.
+
+        height = rgb.shape[0]
+        (x0, y0), (x1, y1) = self.ax.transData.transform([(0, 0), (1, 1)])
+        self.origin = (x0, height - y0)
+        self.step = (x1 - x0, y0 - y1)
+
+    # Get the raster for a mansion, reusing the one drawn for the same board if there is one.
+    @classmethod
+    def for_mansion(cls, mansion, figsize=(12, 10), dpi=80):
+        rooms = tuple(sorted((room.name, mansion.coordinates.get(room), getattr(room.secret_passage, "name", None))
+                             for room in mansion.rooms.values()))
+        key = (mansion.rows, mansion.cols, mansion.start, rooms, tuple(figsize), dpi)
+        raster = _boards.get(key)
+        if raster is None:
+            raster = _boards[key] = cls(mansion, figsize, dpi)
+            if len(_boards) > _CACHE_SIZE:
+                _boards.popitem(last=False)
+        else:
+            _boards.move_to_end(key)
+        return raster
+
+
+# Draw a player's label once as a mask of the pixels its text covers.
+def token_mask(name, dpi):
+    height = int(TOKEN_FONT_SIZE * dpi / 72 * 1.6) + 2
+    width = int(len(name) * TOKEN_FONT_SIZE * dpi / 72) + 16
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+    fig.text(0.5, 0.5, f"({name})", ha='center', va='center', fontsize=TOKEN_FONT_SIZE, weight='bold')
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., 3] > 96
+
+
+class OffscreenRenderer:
+    """
+    Renders the board without a window, into NumPy palette images written as GIF or PNG frames.
+
+    The static board comes from the cached BoardRaster and each player's label is drawn once as a
+    mask, so a frame is a copy of the board with the labels written into it and costs no Matplotlib
+    drawing. update() only records where the players are (it can be registered as a GameManager
+    renderer: GameManager(renderer='offscreen')); frames are built when they are written, so a long
+    game holds a few bytes per turn rather than an image per turn.
+    """
+
+    def __init__(self, mansion, players, figsize=(12, 10), dpi=80):
+        self.mansion = mansion
+        self.players = players
+        self.board = BoardRaster.for_mansion(mansion, figsize, dpi)
+        self.fig, self.ax = self.board.fig, self.board.ax
+        self.masks = [token_mask(player.name, dpi) for player in players]  # Label pixels of each seat.
+        self.positions = []  # (row, column) or None of each seat, for every recorded frame.
+
+    # Record the players' current positions as the next frame.
+    def update(self):
+        self.positions.append(tuple(self.mansion.get_player_coordinates(player) for player in self.players))
+
+    def close(self):
+        pass
+
+    # Build the palette image of one frame from the (row, column) or None of each seat.
+    # Labels of players sharing a tile are stacked, as in BoardRenderer.
+    def frame(self, coordinates):
+        pixels = self.board.pixels.copy()
+        (x0, y0), (dx, dy) = self.board.origin, self.board.step
+        height, width = pixels.shape
+        occupants = {}
+        for seat, position in enumerate(coordinates):
+            if position is None:
+                continue
+            stacked = occupants.get(position, 0)
+            occupants[position] = stacked + 1
+            r, c = position
+            mask = self.masks[seat]
+            top = int(round(y0 + (r + stacked * PLAYER_LABEL_SPACING) * dy)) - mask.shape[0] // 2
+            left = int(round(x0 + c * dx)) - mask.shape[1] // 2
+            bottom, right = min(top + mask.shape[0], height), min(left + mask.shape[1], width)
+            clipped = mask[max(-top, 0):bottom - top, max(-left, 0):right - left]
+            region = pixels[max(top, 0):bottom, max(left, 0):right]
+            region[clipped] = self.board.token_indices[seat % len(TOKEN_COLORS)]
+        return pixels
+
+    # Build the recorded frames one at a time.
+    def frames(self):
+        for coordinates in self.positions:
+            yield self.frame(coordinates)
+
+    # Write the recorded frames to a .gif file, or as numbered .png files into a directory.
+    # Returns the number of frames written.
+    def save(self, path, duration=200):
+        if path.lower().endswith(".gif"):
+            return write_gif(path, self.frames(), self.board.palette, duration)
+        return write_pngs(path, self.frames(), self.board.palette)
+
+
+def _image(pixels, palette):
+    image = Image.fromarray(pixels, 'P')
+    image.putpalette(palette)
+    return image
+
+
+# Write palette frames as an animated GIF showing each frame for duration milliseconds.
+def write_gif(path, frames, palette, duration=200):
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        raise ValueError("There are no frames to write.")
+    count = [1]
+
+    def images():
+        for pixels in frames:
+            count[0] += 1
+            yield _image(pixels, palette)
+
+    # Every frame shares the palette, so Pillow's per-frame palette optimization is skipped.
+    _image(first, palette).save(path, save_all=True, append_images=images(), duration=duration, loop=0,
+                                optimize=False)
+    return count[0]
+
+
+# Write palette frames as frame_00000.png, frame_00001.png, ... into a directory, one at a time.
+def write_pngs(directory, frames, palette):
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for count, pixels in enumerate(frames, 1):
+        _image(pixels, palette).save(os.path.join(directory, f"frame_{count - 1:05d}.png"), compress_level=1)
+    return count
+
+
+# Get the (row, column) or None of each seat at the start of a logged game and after every turn.
+# With every > 1, only every so many turns are included (the final positions always are).
+def logged_positions(events, start, num_players, every=1):
+    positions = [start] * num_players
+    yield tuple(positions)
+    turns = 0
+    for event in events:
+        kind = event.kind
+        if kind == event_log.MOVE or (kind == event_log.SECRET and event.c):
+            positions[event.seat] = (event.a, event.b)
+        elif kind == event_log.ELIMINATE:
+            positions[event.seat] = None
+        elif kind == event_log.END_TURN:
+            turns += 1
+            if turns % every == 0:
+                yield tuple(positions)
+        elif kind == event_log.GAME_END and turns % every:
+            yield tuple(positions)
+
+
+# Render a logged game (see event_log.EventLogReader.events) to a .gif file or a directory of .png frames.
+# The layout and deck must be the ones the game was played with. Returns the number of frames written.
+def export_game(events, path, layout=None, deck=STANDARD_DECK, every=1, duration=200, figsize=(12, 10), dpi=80):
+    game, _ = event_log.replay(events, turn=0, layout=layout, deck=deck)
+    renderer = OffscreenRenderer(game.mansion, game.players, figsize, dpi)
+    renderer.positions = list(logged_positions(events, game.mansion.start, len(game.players), every))
+    return renderer.save(path, duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a game from an event log to a GIF or PNG frames.")
+    parser.add_argument("log", help="Event log file (see event_log.py).")
+    parser.add_argument("out", help="Output .gif file, or a directory for .png frames.")
+    parser.add_argument("--game", type=int, default=0, help="Number of the game in the log.")
+    parser.add_argument("--layout", default=None, help="Board layout file the game was played on.")
+    parser.add_argument("--every", type=int, default=1, help="Draw a frame every this many turns.")
+    parser.add_argument("--duration", type=int, default=200, help="Milliseconds per GIF frame.")
+    parser.add_argument("--dpi", type=int, default=80)
+    args = parser.parse_args()
+
+    reader = event_log.EventLogReader(args.log)
+    events = reader.events(args.game)
+    reader.close()
+    frames = export_game(events, args.out, args.layout, every=args.every, duration=args.duration, dpi=args.dpi)
+    print(f"Wrote {frames} frames to {args.out}.")
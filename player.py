@@ -7,16 +7,34 @@ class Player:
         self.current_position = start_position  # The player's current position on the board.
         self.current_coordinates = start_coordinates  # Coordinates on the grid.
         self.cards = []  # Cards held by the player.
+        self.seen_cards = []  # Cards other players have shown to disprove this player's suggestions.
+        self.hand_mask = 0  # Mask of the card IDs held by the player.
+        self.known_mask = 0  # Mask of the card IDs held by or shown to the player.
         self.is_active = True  # Indicates if the player is still in the game.
+        self.mansion = None  # Mansion tracking the player's position, if any.
 
     # Update the player's position and coordinates.
     def move(self, new_position, coordinates):
         self.current_position = new_position
         self.current_coordinates = coordinates
+        if self.mansion is not None:
+            self.mansion.update_player_position(self, coordinates)
 
     # Add a card to the player's hand.
     def add_card(self, card):
         self.cards.append(card)
+        self.hand_mask |= card.bit
+        self.known_mask |= card.bit
+
+    # Remember a card shown by another player. Seen cards are known, but cannot be used to disprove.
+    def add_seen_card(self, card):
+        if not self.known_mask & card.bit:
+            self.seen_cards.append(card)
+            self.known_mask |= card.bit
+
+    # Check whether the player holds or has been shown a card.
+    def knows_card(self, card):
+        return bool(self.known_mask & card.bit)
 
     # Check if the player can make a suggestion (must be in a room).
     def can_make_suggestion(self):
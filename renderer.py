@@ -0,0 +1,120 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Symbols marking the rooms at each end of a secret passage.
+SECRET_PASSAGE_SYMBOLS = {
+    frozenset(('Study', 'Kitchen')): '★',
+    frozenset(('Conservatory', 'Lounge')): '✦',
+}
+EXTRA_PASSAGE_SYMBOLS = ('◆', '●', '▲', '■')
+
+# Vertical spacing of player labels sharing a tile, in grid units.
+PLAYER_LABEL_SPACING = 0.2
+
+
+class BoardRenderer:
+    """
+    Matplotlib view of the mansion that only redraws the player markers.
+
+    The grid, ticks and room labels are drawn once. Player labels are animated artists: every update
+    restores the saved static background, draws the labels on top and blits the board, instead of
+    clearing and rebuilding the whole axes. Backends that cannot blit fall back to a normal redraw.
+    """
+
+    def __init__(self, mansion, players):
+        self.mansion = mansion
+        self.players = players
+        self.fig, self.ax = plt.subplots(figsize=(12, 10))
+        self.background = None  # Saved pixels of the static board.
+        self.player_labels = {}  # Text artist of each player.
+
+        self._draw_board()
+        for player in players:
+            self.player_labels[player] = self.ax.text(0, 0, f"({player.name})", va='center', ha='center',
+                                                      color="black", fontsize=8, animated=True, visible=False)
+
+        # The background has to be captured again whenever the whole figure is redrawn (e.g. on resize).
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.ion()
+        plt.show(block=False)
+        self.fig.canvas.draw()
+
+    # Draw the parts of the board that never change: grid lines, ticks and room names.
+    def _draw_board(self):
+        draw_board(self.ax, self.mansion)
+
+    def _on_draw(self, event):
+        canvas = self.fig.canvas
+        if canvas.supports_blit:
+            self.background = canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_players()
+
+    # Move every player label to its tile, stacking the labels of players sharing a tile.
+    def _place_players(self):
+        occupants = {}
+        for player in self.players:
+            label = self.player_labels[player]
+            coordinates = self.mansion.get_player_coordinates(player)
+            if coordinates is None:
+                label.set_visible(False)
+                continue
+            r, c = coordinates
+            stacked = occupants.get(coordinates, 0)
+            occupants[coordinates] = stacked + 1
+            label.set_position((c, r + stacked * PLAYER_LABEL_SPACING))
+            label.set_visible(True)
+
+    def _draw_players(self):
+        for label in self.player_labels.values():
+            self.ax.draw_artist(label)
+
+    # Redraw the player labels at their current positions.
+    def update(self):
+        self._place_players()
+        canvas = self.fig.canvas
+        if self.background is None:
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            self._draw_players()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def close(self):
+        plt.close(self.fig)
+
+
+# Draw the parts of the board that never change on a Matplotlib axes: grid lines, ticks and room names.
+# Used by BoardRenderer and by the offscreen renderer (see offscreen.py).
+def draw_board(ax, mansion):
+    rows = mansion.rows
+    cols = mansion.cols
+    ax.set_xlim(-.5, cols - .5)
+    ax.set_ylim(-.5, rows - .5)
+    ax.set_xticks(np.arange(0, cols, 1))
+    ax.set_yticks(np.arange(0, rows, 1))
+    ax.set_xticklabels(range(cols))
+    ax.set_yticklabels(range(rows))
+    ax.set_xticks(np.arange(-.5, cols, 1), minor=True)
+    ax.set_yticks(np.arange(-.5, rows, 1), minor=True)
+    ax.grid(which="minor", color="black", linestyle='-', linewidth=2)
+    ax.tick_params(which="minor", size=0)
+    ax.invert_yaxis()
+
+    symbols = passage_symbols(mansion)
+    for tile, (r, c) in mansion.room_tiles():
+        label = f"{tile.name} {symbols[tile]}" if tile in symbols else tile.name
+        ax.text(c, r - PLAYER_LABEL_SPACING, label, va='center', ha='center', color="black", fontsize=8)
+
+
+# Get the symbol shown next to each room with a secret passage.
+def passage_symbols(mansion):
+    symbols = {}
+    extra = iter(EXTRA_PASSAGE_SYMBOLS)
+    for room in mansion.rooms.values():
+        if room.secret_passage is None or room in symbols:
+            continue
+        pair = frozenset((room.name, room.secret_passage.name))
+        symbol = SECRET_PASSAGE_SYMBOLS.get(pair) or next(extra, '*')
+        symbols[room] = symbols[room.secret_passage] = symbol
+    return symbols
@@ -1,14 +1,16 @@
 class Room:
-    def __init__(self, name):
+    def __init__(self, name, load_connections=None):
         # Initialize a room with a name and optional connections or secret passages.
         self.name = name  # Name of the room.
         self.connected_spaces = []  # List of spaces directly connected to this room.
         self.secret_passage = None  # Room connected by a secret passage, if any.
+        self._load_connections = load_connections  # Fills in the connections on first use, for rooms placed on a Mansion.
     
     # Add a connecting space to the room.
     def add_connection(self, space):
-        if space not in self.connected_spaces:
-            self.connected_spaces.append(space)
+        connections = self.get_connections()
+        if space not in connections:
+            connections.append(space)
 
     # Set a secret passage to another room.
     def set_secret_passage(self, room):
@@ -16,6 +18,9 @@ class Room:
     
     # Get all connected spaces for this room.
     def get_connections(self):
+        if self._load_connections is not None:
+            self.connected_spaces = self._load_connections() + self.connected_spaces
+            self._load_connections = None
         return self.connected_spaces
     
     # Representation of the room for debugging purposes.
@@ -0,0 +1,150 @@
+from array import array
+from collections import OrderedDict
+
+# Chance of each total of two six-sided dice.
+ROLL_CHANCES = {total: (6 - abs(total - 7)) / 36 for total in range(2, 13)}
+
+# Chance that the roll for a secret passage allows it (an even total, as in GameManager.take_secret_passage).
+PASSAGE_CHANCE = sum(chance for total, chance in ROLL_CHANCES.items() if total % 2 == 0)
+
+# Route planners already built, keyed by the structure of the board they plan on (see Mansion.layout_key).
+_cache = OrderedDict()
+_CACHE_SIZE = 64
+
+
+class RoutePlanner:
+    """
+    Next-hop tables towards each room of a board, for choosing where to go with a given roll.
+
+    Tiles are numbered row by row (index = row * cols + col), as in DistanceTable. The table of a room
+    holds, for every tile, the number of steps a move needs to reach the room and the next tile on a
+    shortest way there. Both come from one breadth-first search out of the room, built the first time
+    the room is asked about, so a board with many rooms only pays for the rooms agents head for and
+    needs a few bytes per tile per room rather than the all-pairs table.
+
+    Routes are counted in expected turns. Walking d steps takes turns(d) on average over the rolls of
+    two dice; with the roll of this turn known, it takes 1 + turns(d - roll) once d exceeds the roll.
+    A room with a secret passage can also be left by the secret action, which succeeds on an even roll
+    and so takes 1 / PASSAGE_CHANCE turns on average. A route either walks straight to the room or
+    walks to a room with a passage first and takes it (possibly through more passages); the planner
+    keeps those detours that beat walking, worked out once per room.
+    """
+
+    def __init__(self, neighbors, blocking, passages):
+        self.neighbors = neighbors  # Indices of the tiles connected to each tile.
+        self.blocking = blocking  # Whether each tile ends a move that enters it (rooms and the start).
+        self.passages = passages  # Index of the room at the other end of each secret passage, by room index.
+        self.expected_turns = [0.0]  # Mean turns to walk each number of steps, extended as needed.
+        self._routes = {}  # (steps, next tile) arrays towards each room index, built on first use.
+        self._plans = {}  # (first room, turns after reaching it) of the useful routes to each room index.
+
+    # Build (or reuse) the route planner for a mansion's board.
+    @classmethod
+    def from_mansion(cls, mansion):
+        key = mansion.layout_key()
+        planner = _cache.get(key)
+        if planner is None:
+            neighbors, blocking = mansion.layout.graph()
+            cols = mansion.cols
+            passages = {r * cols + c: passage_r * cols + passage_c for (r, c), (passage_r, passage_c) in key[3]}
+            planner = _cache[key] = cls(neighbors, blocking, passages)
+            if len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(key)
+        return planner
+
+    # Get the steps needed to reach a room from every tile (-1 if it cannot be reached) and the next
+    # tile towards the room from every tile.
+    def routes(self, room):
+        routes = self._routes.get(room)
+        if routes is None:
+            routes = self._routes[room] = _search_towards(room, self.neighbors, self.blocking)
+        return routes
+
+    # Get the mean number of turns needed to walk a number of steps.
+    def turns(self, steps):
+        expected = self.expected_turns
+        while len(expected) <= steps:
+            distance = len(expected)
+            expected.append(1 + sum(chance * expected[max(distance - roll, 0)]
+                                    for roll, chance in ROLL_CHANCES.items()))
+        return expected[steps]
+
+    # Get the tile a move with the given roll reaches on the way from a tile to a room.
+    def destination(self, source, roll, room):
+        steps, hops = self.routes(room)
+        tile = source
+        for _ in range(min(roll, steps[source])):
+            tile = hops[tile]
+        return tile
+
+    # Rank rooms by the expected number of turns to reach them from a tile, with this turn's roll.
+    # Returns (turns, room, action) for every room that can be reached, fastest first, where the action is
+    # ("move", tile index), ("secret",), or None when the player is already in the room.
+    def best_targets(self, source, roll, rooms):
+        ranked = []
+        for order, room in enumerate(rooms):
+            best = None
+            for first, after in self.plans(room):
+                if source == first:
+                    if after == 0:
+                        best = (0.0, None)
+                        break
+                    turns, action = after, ("secret",)
+                else:
+                    steps = self.routes(first)[0][source]
+                    if steps < 0:
+                        continue
+                    turns = 1 + self.turns(max(steps - roll, 0)) + after
+                    action = ("move", first)
+                if best is None or turns < best[0]:
+                    best = (turns, action)
+            if best is not None:
+                ranked.append((best[0], order, room, best[1]))
+        ranked.sort()
+        return [(turns, room, action if action is None or action[0] == "secret"
+                 else ("move", self.destination(source, roll, action[1])))
+                for turns, _, room, action in ranked]
+
+    # Get the routes worth taking to a room: (first room, mean turns from there) for walking straight to it
+    # and for every room whose secret passage leads there faster than walking on from it.
+    def plans(self, room):
+        plans = self._plans.get(room)
+        if plans is not None:
+            return plans
+        steps = self.routes(room)[0]
+        walking = {start: (0.0 if start == room else self.turns(steps[start]) if steps[start] >= 0 else float("inf"))
+                   for start in self.passages}
+        # Mean turns to reach the room from each room with a passage, improved until no passage helps any more.
+        best = dict(walking)
+        changed = True
+        while changed:
+            changed = False
+            for start, end in self.passages.items():
+                through = 1 / PASSAGE_CHANCE + (0.0 if end == room else best[end])
+                if through < best[start]:
+                    best[start] = through
+                    changed = True
+        plans = self._plans[room] = [(room, 0.0)] + [(start, best[start]) for start in self.passages
+                                                      if start != room and best[start] < walking[start]]
+        return plans
+
+
+# Breadth-first search out of a room over the reversed moves. A move may start in a room but must end
+# when it enters one, so only the room itself and spaces are searched through.
+def _search_towards(room, neighbors, blocking):
+    steps = array('i', [-1]) * len(neighbors)
+    hops = array('i', [-1]) * len(neighbors)
+    steps[room] = 0
+    queue = [room]
+    for tile in queue:
+        if tile != room and blocking[tile]:
+            continue
+        next_steps = steps[tile] + 1
+        for neighbor in neighbors[tile]:
+            if steps[neighbor] < 0:
+                steps[neighbor] = next_steps
+                hops[neighbor] = tile
+                queue.append(neighbor)
+    return steps, hops
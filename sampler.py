@@ -0,0 +1,136 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from card_setup import CARD_NAMES
+from deduction import CATEGORIES, unpack_bits
+
+# Samplers already built, keyed by the knowledge state they are conditioned on.
+_cache = OrderedDict()
+_CACHE_SIZE = 256
+
+# Largest number of rounds of redrawing rejected deals before giving up.
+MAX_ROUNDS = 50
+
+
+# Get the hand sizes of an even deal of the cards outside the envelope, as card_setup.distribute_cards deals them.
+def even_hand_sizes(num_players, num_cards=len(CARD_NAMES), categories=CATEGORIES):
+    dealt = num_cards - len(categories)
+    return [dealt // num_players + (seat < dealt % num_players) for seat in range(num_players)]
+
+
+class BatchSampler:
+    """
+    Draws batches of deals consistent with what a player knows, as NumPy arrays.
+
+    A batch of K deals is a K x num_cards array with the owner of each card: a seat, or num_players for
+    the envelope. Cards with a known owner are fixed, the envelope gets a uniformly drawn possible card
+    of each missing type, and the other cards are shuffled into the free places in the hands all at
+    once. Rows that break a "not held" fact, a "holds one of" clause or a wrong accusation are drawn
+    again, so every consistent deal is equally likely, as with mcts.DealSampler one deal at a time.
+    The card indices the draws need are worked out once per knowledge state; use from_knowledge to reuse
+    them while the state does not change.
+    """
+
+    def __init__(self, num_players, hand_sizes=None, has_bits=None, hasnt_bits=None, clauses=(),
+                 wrong_accusations=(), num_cards=len(CARD_NAMES), categories=CATEGORIES):
+        owners = num_players + 1
+        self.num_players = num_players
+        self.envelope = num_players  # Owner index of the envelope.
+        self.num_cards = num_cards
+        hand_sizes = list(hand_sizes or even_hand_sizes(num_players, num_cards, categories))[:num_players]
+        has = unpack_bits(has_bits or [0] * owners, num_cards)
+        self.hasnt = unpack_bits(hasnt_bits or [0] * owners, num_cards)  # Owner x card: cards each owner can't hold.
+
+        # Owner of each card that is already known, or -1.
+        self.known = np.where(has.any(axis=0), has.argmax(axis=0), -1).astype(np.int8)
+        # Possible envelope cards of each type whose envelope card is not known yet.
+        self.draws = []
+        for category in categories:
+            category = np.asarray(category)
+            if not has[self.envelope, category].any():
+                possible = category[(self.known[category] < 0) & ~self.hasnt[self.envelope, category]]
+                if len(possible) == 0:
+                    raise ValueError("The observations contradict each other: no card can be in the envelope.")
+                self.draws.append(possible)
+        # Owner of each free place in the hands, one entry per card still to be dealt.
+        space = np.array(hand_sizes) - has[:num_players].sum(axis=1)
+        self.places = np.repeat(np.arange(num_players, dtype=np.int8), space)
+        if (space < 0).any() or len(self.places) != (self.known < 0).sum() - len(self.draws):
+            raise ValueError("The hand sizes do not match the number of cards.")
+
+        self.clauses = [(seat, np.array([card for card in range(num_cards) if cards >> card & 1]))
+                        for seat, cards in clauses]
+        self.wrong_accusations = np.array(sorted(wrong_accusations), dtype=np.int16).reshape(-1, len(categories))
+
+    # Get the sampler for a deduction.Knowledge, reusing the one built for the same state if there is one.
+    @classmethod
+    def from_knowledge(cls, knowledge):
+        key = (knowledge.num_players, tuple(knowledge.hand_sizes), tuple(knowledge.has_bits),
+               tuple(knowledge.hasnt_bits), tuple(knowledge.clauses), frozenset(knowledge.wrong_accusations))
+        sampler = _cache.get(key)
+        if sampler is None:
+            sampler = _cache[key] = cls(knowledge.num_players, knowledge.hand_sizes, knowledge.has_bits,
+                                        knowledge.hasnt_bits, knowledge.clauses, knowledge.wrong_accusations,
+                                        knowledge.num_cards, knowledge.categories)
+            if len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(key)
+        return sampler
+
+    # Draw count deals as a count x num_cards array of owners. rng is a NumPy Generator or a seed.
+    def sample(self, count, rng=None):
+        rng = np.random.default_rng(rng)
+        batches = []
+        drawn = accepted = 0
+        rate = 1.0  # Share of drawn deals that were consistent so far.
+        for _ in range(MAX_ROUNDS):
+            size = min(max(int((count - accepted) / rate * 1.1) + 1, 64), 16 * count + 64)
+            deals = self._draw(size, rng)
+            deals = deals[self._consistent(deals)]
+            batches.append(deals)
+            drawn += size
+            accepted += len(deals)
+            if accepted >= count:
+                return np.concatenate(batches)[:count]
+            rate = max(accepted / drawn if accepted else rate / 16, 1e-4)
+        raise ValueError("Could not sample deals consistent with the observations.")
+
+    # Draw deals that agree with the known owners and hand sizes, ignoring the other constraints.
+    def _draw(self, size, rng):
+        deals = np.repeat(self.known[None, :], size, axis=0)
+        rows = np.arange(size)
+        for possible in self.draws:
+            deals[rows, possible[rng.integers(len(possible), size=size)]] = self.envelope
+        if len(self.places):
+            # Every row has the same number of free cards; shuffling them in each row deals the places.
+            free = np.nonzero(deals < 0)[1].reshape(size, len(self.places))
+            order = np.argsort(rng.random(free.shape), axis=1)
+            deals[rows[:, None], np.take_along_axis(free, order, axis=1)] = self.places
+        return deals
+
+    # Get which deals keep to the "not held" facts, the clauses and the wrong accusations.
+    def _consistent(self, deals):
+        valid = ~self.hasnt[deals, np.arange(self.num_cards)].any(axis=1)
+        for seat, cards in self.clauses:
+            valid &= (deals[:, cards] == seat).any(axis=1)
+        if len(self.wrong_accusations):
+            solutions = np.nonzero(deals == self.envelope)[1].reshape(len(deals), -1)
+            valid &= ~(solutions[:, None, :] == self.wrong_accusations[None, :, :]).all(axis=2).any(axis=1)
+        return valid
+
+    # Estimate the chance that each owner holds each card from count sampled deals.
+    # Returns an owner x card array whose last row is the chance that the card is in the envelope.
+    def holder_probabilities(self, count, rng=None):
+        deals = self.sample(count, rng)
+        cells = deals.astype(np.int64) * self.num_cards + np.arange(self.num_cards)
+        counts = np.bincount(cells.ravel(), minlength=(self.num_players + 1) * self.num_cards)
+        return counts.reshape(self.num_players + 1, self.num_cards) / count
+
+    # Convert one sampled deal to the hand masks of every seat and the solution mask, like mcts.DealSampler.sample.
+    def deal_masks(self, deal):
+        masks = [0] * (self.num_players + 1)
+        for card, owner in enumerate(deal.tolist()):
+            masks[owner] |= 1 << card
+        return tuple(masks[:self.num_players]), masks[self.envelope]
@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+
+from agents import reachable_coordinates
+from card_setup import STANDARD_DECK
+from engine import GameEngine
+from room import Room
+
+# Longest request line accepted, in bytes.
+MAX_LINE = 4096
+
+
+class Client:
+    """
+    One connection, with a bounded queue of outgoing messages written by its own task.
+    """
+
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)  # Encoded messages waiting to be written.
+        self.seats = set()  # (table ID, seat) pairs held by this client.
+        self.closed = False
+        self.task = asyncio.ensure_future(self._write_messages())
+
+    # Queue a message. A client whose queue is full is too slow to keep up and is disconnected.
+    def send(self, message):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        except asyncio.QueueFull:
+            self.close()
+
+    async def _write_messages(self):
+        try:
+            while True:
+                self.writer.write(await self.queue.get())
+                # Write everything queued so far before waiting for the socket.
+                while not self.queue.empty():
+                    self.writer.write(self.queue.get_nowait())
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.task.cancel()
+
+
+class Table:
+    """
+    One game: its seats, its GameEngine and the timer of the current turn.
+    """
+
+    def __init__(self, server, table_id):
+        self.server = server
+        self.id = table_id
+        self.clients = []  # Client holding each seat.
+        self.names = []  # Player name of each seat.
+        self.engine = None  # Started once every seat is taken.
+        self.turn_id = 0  # Counts turns, so the timer of an earlier turn is ignored.
+        self.timer = None  # Timeout of the current turn.
+
+    @property
+    def full(self):
+        return len(self.clients) >= self.server.players_per_table
+
+    # Seat a client at the table and return its seat.
+    def join(self, client, name):
+        seat = len(self.clients)
+        self.clients.append(client)
+        self.names.append(name)
+        client.seats.add((self.id, seat))
+        return seat
+
+    def start(self):
+        server = self.server
+        self.engine = GameEngine(self.names, rng=random.Random(server.rng.getrandbits(64)), layout=server.layout,
+                                 event_log=server.event_log)
+        for seat, (client, player) in enumerate(zip(self.clients, self.engine.players)):
+            client.send({"event": "start", "table": self.id, "seat": seat, "players": self.names,
+                         "cards": [card.name for card in player.cards]})
+        self.begin_turn()
+
+    def broadcast(self, message):
+        for client in set(self.clients):
+            client.send(message)
+
+    # Tell the current player it is their turn and start the turn timer.
+    def begin_turn(self):
+        engine = self.engine
+        if self.timer is not None:
+            self.timer.cancel()
+        self.turn_id += 1
+        self.timer = asyncio.get_running_loop().call_later(self.server.turn_timeout, self.time_out, self.turn_id)
+        seat = engine.current_player_index
+        position = engine.current_player.current_position
+        passage = engine.game.secret_passage_destination(position)
+        in_room = isinstance(position, Room) and position.name.lower() in engine.game.deck.ids
+        self.clients[seat].send({
+            "event": "turn", "table": self.id, "seat": seat,
+            "room": position.name if in_room else None,
+            "passage": passage.name if passage is not None else None,
+        })
+
+    # Roll the dice for the current player's move and send the tiles it can reach.
+    def roll(self, seat):
+        engine = self.engine
+        player = engine.current_player
+        dice_roll = engine.roll()
+        mansion = engine.game.mansion
+        moves = reachable_coordinates(engine, player, dice_roll)
+        reachable = mansion.reachable_within(player.current_position, dice_roll)
+        table = mansion.distance_table()
+        toward = {}
+        for name, room in mansion.rooms.items():
+            if room in mansion.coordinates:
+                remaining = table.row(mansion.index_of(room))[reachable]
+                best = int(remaining.argmin())
+                toward[name] = [*moves[best], int(remaining[best])]
+        self.clients[seat].send({"event": "rolled", "table": self.id, "seat": seat, "dice_roll": dice_roll,
+                                 "moves": [list(move) for move in moves], "toward": toward})
+
+    # Apply an action for a seat, sending the result to every seat or the error to the seat.
+    def act(self, seat, action, timeout=False):
+        result = self.engine.step(action)
+        if not result["accepted"]:
+            self.clients[seat].send({"event": "error", "table": self.id, "seat": seat, "message": result["error"]})
+            return
+        message = {"event": "result", "table": self.id, "seat": seat, "action": result["action"], "timeout": timeout}
+        players = self.engine.players
+        if "dice_roll" in result:
+            message["dice_roll"] = result["dice_roll"]
+        if result["action"] == "move":
+            message["position"] = list(result["position"])
+        elif result["action"] == "suggest":
+            disprover = result["disprover"]
+            message["suggestion"] = list(result["suggestion"])
+            message["disprover"] = players.index(disprover) if disprover is not None else None
+            message["passed"] = [players.index(player) for player in result["passed"]]
+        elif result["action"] == "accuse":
+            message["accusation"] = list(result["accusation"])
+            message["correct"] = result["correct"]
+        elif result["action"] == "secret":
+            message["used"] = result["used"]
+        for client in set(self.clients):
+            if result["action"] == "suggest" and result["card"] is not None and (self.id, seat) in client.seats:
+                client.send(dict(message, card=result["card"].name))
+            else:
+                client.send(message)
+        self.server.turns_played += 1
+
+        engine = self.engine
+        if engine.game_over or engine.turns >= self.server.max_turns:
+            self.finish()
+        else:
+            self.begin_turn()
+
+    # Play a turn for a seat that did not act in time: the player stays where they are.
+    def time_out(self, turn_id):
+        if turn_id != self.turn_id or self.engine.game_over:
+            return
+        self.server.timeouts += 1
+        seat = self.engine.current_player_index
+        self.act(seat, ("move", self.engine.current_player.current_coordinates), timeout=True)
+
+    def finish(self):
+        engine = self.engine
+        if self.timer is not None:
+            self.timer.cancel()
+        engine.game.finish_game(engine.winner, engine.turns)
+        summary = engine.summary()
+        self.broadcast({"event": "game_over", "table": self.id, "winner": summary["winner"],
+                        "turns": summary["turns"], "solution": list(summary["solution"])})
+        for seat, client in enumerate(self.clients):
+            client.seats.discard((self.id, seat))
+        self.server.close_table(self)
+
+    # Close the table without playing its game to the end, telling the clients still connected why.
+    # A game already started is logged as ended with no winner.
+    def abandon(self, reason):
+        if self.timer is not None:
+            self.timer.cancel()
+        if self.engine is not None:
+            self.engine.game.finish_game(None, self.engine.turns)
+        self.broadcast({"event": "closed", "table": self.id, "message": reason})
+        for seat, client in enumerate(self.clients):
+            client.seats.discard((self.id, seat))
+        self.server.close_table(self, finished=False)
+
+
+# Turn an action from a message into a GameEngine action tuple, checking its card names against the deck.
+def parse_action(action, deck=STANDARD_DECK):
+    kind = action[0]
+    if kind == "move":
+        return ("move", (int(action[1][0]), int(action[1][1])))
+    names = {"suggest": 2, "accuse": 3}.get(kind, 0)
+    if len(action) != names + 1:
+        raise ValueError(f"Invalid action {action}.")
+    for name in action[1:]:
+        if str(name).lower() not in deck.ids:
+            raise ValueError(f"Unknown card '{name}'.")
+    return tuple(action)
+
+
+class GameServer:
+    """
+    Hosts tables of players_per_table seats, each started as soon as it is full.
+
+    Games end when a player accuses correctly, everyone is eliminated or max_turns turns have been
+    played. Table seeds come from seed, so a server replays the same deals for the same join order.
+    Games are recorded in the event log, if one is given (see event_log.EventLog).
+    """
+
+    def __init__(self, players_per_table=3, turn_timeout=30.0, max_tables=10000, max_turns=1000, seed=None,
+                 layout=None, event_log=None, queue_size=1024):
+        self.players_per_table = players_per_table
+        self.turn_timeout = turn_timeout  # Seconds a player has to act before the turn is played for them.
+        self.max_tables = max_tables  # Tables open at once; joins beyond that are refused.
+        self.max_turns = max_turns
+        self.rng = random.Random(seed)
+        self.layout = layout
+        self.event_log = event_log
+        self.queue_size = queue_size  # Messages queued for a client before it is disconnected as too slow.
+        self.tables = {}  # Open tables by ID.
+        self.open_table = None  # Table that joins without a table ID go to.
+        self.games_finished = 0
+        self.tables_abandoned = 0  # Tables closed before their game ended, when their players left.
+        self.turns_played = 0
+        self.timeouts = 0
+        self._table_ids = itertools.count()
+
+    async def start(self, host="127.0.0.1", port=7777):
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+
+    # Requests are read one line at a time, so a client that floods the server is held back by TCP.
+    async def handle_client(self, reader, writer):
+        client = Client(writer, self.queue_size)
+        try:
+            while not client.closed:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    client.send({"event": "error", "message": f"Lines are limited to {MAX_LINE} bytes."})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    self.handle_message(client, message)
+                except (ValueError, TypeError, KeyError, IndexError, AttributeError) as error:
+                    client.send({"event": "error", "message": str(error)})
+        except (ConnectionError, asyncio.CancelledError):
+            # Connections still open when the server shuts down are cancelled.
+            pass
+        finally:
+            client.close()
+            self.leave(client)
+
+    def handle_message(self, client, message):
+        op = message["op"]
+        if op == "join":
+            self.join(client, str(message.get("name", "Player")), message.get("table"))
+            return
+
+        table = self.tables.get(message["table"])
+        seat = int(message["seat"])
+        if table is None or (table.id, seat) not in client.seats:
+            raise ValueError(f"You do not hold seat {seat} at table {message['table']}.")
+        if table.engine is None or table.engine.current_player_index != seat:
+            raise ValueError("It is not your turn.")
+        if op == "roll":
+            table.roll(seat)
+        elif op == "action":
+            table.act(seat, parse_action(message["action"], table.engine.game.deck))
+        else:
+            raise ValueError(f"Unknown op '{op}'.")
+
+    def join(self, client, name, table_id=None):
+        if table_id is None:
+            table = self.open_table
+            if table is None or table.full or table.engine is not None:
+                table = self.open_table = self._new_table(str(next(self._table_ids)))
+        else:
+            table = self.tables.get(table_id) or self._new_table(table_id)
+        if table is None:
+            client.send({"event": "error", "message": "The server is full."})
+            return
+        if table.full:
+            client.send({"event": "error", "table": table.id, "message": "The table is full."})
+            return
+        seat = table.join(client, name)
+        client.send({"event": "joined", "table": table.id, "seat": seat, "name": name})
+        if table.full:
+            table.start()
+
+    # Free the tables of a client that disconnected. Tables still waiting for players are closed, and so
+    # are games none of whose clients is connected any more; seats left at other games are played by the
+    # turn timeout.
+    def leave(self, client):
+        for table_id in {table_id for table_id, _ in client.seats}:
+            table = self.tables.get(table_id)
+            if table is None:
+                continue
+            if table.engine is None:
+                table.abandon("A player left before the table was full.")
+            elif all(other.closed for other in table.clients):
+                table.abandon("Every player has left.")
+
+    def _new_table(self, table_id):
+        if len(self.tables) >= self.max_tables:
+            return None
+        table = self.tables[table_id] = Table(self, table_id)
+        return table
+
+    def close_table(self, table, finished=True):
+        self.tables.pop(table.id, None)
+        if self.open_table is table:
+            self.open_table = None
+        if finished:
+            self.games_finished += 1
+        else:
+            self.tables_abandoned += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host Cluedo tables over a JSON line protocol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--players", type=int, default=3, help="Players per table.")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="Seconds per turn.")
+    parser.add_argument("--max-tables", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--layout", default=None, help="Board layout file (.json or .toml).")
+    args = parser.parse_args()
+
+    async def main():
+        server = GameServer(args.players, args.turn_timeout, args.max_tables, seed=args.seed, layout=args.layout)
+        listener = await server.start(args.host, args.port)
+        print(f"Serving on {args.host}:{args.port}.")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
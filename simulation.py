@@ -0,0 +1,128 @@
+import argparse
+import contextlib
+import random
+import time
+
+from agents import BotAgent
+from card_setup import STANDARD_DECK, Deck
+from dice import BlockDice
+from engine import GameEngine
+from event_log import EventLog
+from instrumentation import Instrumentation
+
+DEFAULT_PLAYERS = ("P1", "P2", "P3")
+
+
+# Play one complete headless game from a seed and return its summary.
+# The layout is a board layout file (see layout.py), or None for the standard board, and the deck a card_setup.Deck.
+# Every action is recorded in the event log, if one is given (see event_log.EventLog), and the hot paths
+# are timed by the instrumentation, if any (see instrumentation.Instrumentation).
+# With a dice factory such as dice.BlockDice, the game rolls from dice_factory(seed) instead of its random.Random.
+def play_game(seed, player_names=DEFAULT_PLAYERS, agent_factory=BotAgent, max_turns=1000, layout=None, event_log=None,
+              instrumentation=None, deck=STANDARD_DECK, dice_factory=None):
+    rng = random.Random(seed)
+    engine = GameEngine(list(player_names), rng=rng, layout=layout, event_log=event_log,
+                        instrumentation=instrumentation, deck=deck,
+                        dice=dice_factory(seed) if dice_factory is not None else None)
+    agents = [agent_factory(random.Random(rng.getrandbits(64))) for _ in player_names]
+    result = engine.run(agents, max_turns=max_turns)
+    result["seed"] = seed
+    return result
+
+
+# Combine game summaries into win counts per seat and game length statistics.
+def aggregate_results(results, num_players=len(DEFAULT_PLAYERS)):
+    stats = {
+        "games": 0,
+        "finished": 0,
+        "no_winner": 0,
+        "wins_by_seat": [0] * num_players,
+        "eliminations_by_seat": [0] * num_players,
+        "total_turns": 0,
+        "min_turns": None,
+        "max_turns": None,
+    }
+    for result in results:
+        merge_result(stats, result)
+    return finish_stats(stats)
+
+
+# Add one game summary to running statistics.
+def merge_result(stats, result):
+    turns = result["turns"]
+    stats["games"] += 1
+    stats["finished"] += result["finished"]
+    if result["winner"] is None:
+        stats["no_winner"] += 1
+    else:
+        stats["wins_by_seat"][result["winner"]] += 1
+    for seat in result["eliminated"]:
+        stats["eliminations_by_seat"][seat] += 1
+    stats["total_turns"] += turns
+    stats["min_turns"] = turns if stats["min_turns"] is None else min(stats["min_turns"], turns)
+    stats["max_turns"] = turns if stats["max_turns"] is None else max(stats["max_turns"], turns)
+
+
+# Derive averages and rates from running statistics.
+def finish_stats(stats):
+    games = stats["games"]
+    stats["mean_turns"] = stats["total_turns"] / games if games else 0.0
+    stats["win_rate_by_seat"] = [wins / games if games else 0.0 for wins in stats["wins_by_seat"]]
+    return stats
+
+
+# Play num_games seeded games (seeds seed, seed + 1, ...) and return aggregated statistics.
+def run_batch(num_games, seed=0, player_names=DEFAULT_PLAYERS, agent_factory=BotAgent, max_turns=1000, layout=None,
+              event_log=None, instrumentation=None, deck=STANDARD_DECK, dice_factory=None):
+    start = time.perf_counter()
+    results = (play_game(seed + i, player_names, agent_factory, max_turns, layout, event_log, instrumentation, deck,
+                         dice_factory)
+               for i in range(num_games))
+    stats = aggregate_results(results, len(player_names))
+    stats["elapsed"] = time.perf_counter() - start
+    stats["games_per_second"] = num_games / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play seeded headless Cluedo games between bots.")
+    parser.add_argument("games", type=int, nargs="?", default=1000, help="Number of games to play.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game.")
+    parser.add_argument("--players", type=int, default=len(DEFAULT_PLAYERS), help="Number of players per game.")
+    parser.add_argument("--layout", default=None, help="Board layout file (.json or .toml).")
+    parser.add_argument("--deck", type=int, nargs=3, metavar=("CHARACTERS", "WEAPONS", "ROOMS"), default=None,
+                        help="Play with a custom deck of this many cards of each type (see card_setup.Deck.numbered).")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--log", default=None, help="Append every game's events to this event log file.")
+    output.add_argument("--columns", default=None, help="Write per-game and per-turn results to NumPy chunks here.")
+    parser.add_argument("--instrument", action="store_true", help="Time the hot paths and print a report.")
+    parser.add_argument("--profile-every", type=int, default=None,
+                        help="Run games under cProfile and dump a .pstats file every N games (implies --instrument).")
+    parser.add_argument("--profile-dir", default="profiles", help="Directory of the .pstats files.")
+    parser.add_argument("--block-dice", action="store_true",
+                        help="Roll dice from NumPy blocks (dice.BlockDice) instead of each game's random.Random.")
+    args = parser.parse_args()
+
+    instrumentation = None
+    if args.instrument or args.profile_every:
+        instrumentation = Instrumentation(profile_every=args.profile_every, profile_dir=args.profile_dir)
+    names = [f"P{i + 1}" for i in range(args.players)]
+    deck = Deck.numbered(*args.deck) if args.deck else STANDARD_DECK
+    if args.columns:
+        # NumPy is only loaded when results are exported.
+        from analytics import ColumnarWriter
+        recorder = ColumnarWriter(args.columns)
+    else:
+        recorder = EventLog(args.log) if args.log else contextlib.nullcontext()
+    with recorder as log:
+        stats = run_batch(args.games, seed=args.seed, player_names=names, layout=args.layout, event_log=log,
+                          instrumentation=instrumentation, deck=deck,
+                          dice_factory=BlockDice if args.block_dice else None)
+    print(f"Played {stats['games']} games in {stats['elapsed']:.2f}s ({stats['games_per_second']:.0f} games/s).")
+    print(f"Wins by seat: {stats['wins_by_seat']}, no winner: {stats['no_winner']}")
+    print(f"Turns: mean {stats['mean_turns']:.1f}, min {stats['min_turns']}, max {stats['max_turns']}")
+    if instrumentation is not None:
+        instrumentation.close()
+        print(instrumentation.format_report())
+        if instrumentation.profile_paths:
+            print(f"Wrote {len(instrumentation.profile_paths)} profiles to {args.profile_dir}.")
@@ -1,11 +1,13 @@
-import random
+from card_setup import names_mask
 
 class Solution:
-    def __init__(self, rooms, characters, weapons):
+    def __init__(self, rooms, characters, weapons, mask=None):
         # Initialize the solution with the room, character, and weapon involved in the mystery.
         self.room = rooms  # The correct room.
         self.character = characters  # The correct character.
         self.weapon = weapons  # The correct weapon.
+        # Mask of the solution's card IDs. Games with a custom deck pass it in, since names are looked up in the standard deck.
+        self.mask = mask if mask is not None else names_mask((rooms, characters, weapons))
 
     # Define comparison for the solution.
     def __eq__(self, other):
@@ -1,16 +1,21 @@
 class Space:
-    def __init__(self, name):
+    def __init__(self, name, load_connections=None):
         # Initialize a space with a name and a list of connected spaces.
         self.name = name  # Name of the space.
         self.connected_spaces = []  # List of spaces connected to this one.
+        self._load_connections = load_connections  # Fills in the connections on first use, for spaces a Mansion creates lazily.
 
     # Add a connection to another space.
     def add_connection(self, space):
-        if space not in self.connected_spaces:
-            self.connected_spaces.append((space))
+        connections = self.get_connections()
+        if space not in connections:
+            connections.append((space))
     
     # Get all spaces connected to this space.
     def get_connections(self):
+        if self._load_connections is not None:
+            self.connected_spaces = self._load_connections() + self.connected_spaces
+            self._load_connections = None
         return self.connected_spaces
     
     # Representation of the space for debugging purposes.
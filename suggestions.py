@@ -0,0 +1,83 @@
+import numpy as np
+
+from card_setup import STANDARD_DECK
+
+# Owner of a card that nobody holds (a solution card), in the owner arrays of game_owners.
+NOBODY = -1
+
+
+# Turn (room, character, weapon) name triples into an n x 3 array of card IDs, using the deck's lowercase
+# name lookup. A room that is not a card (such as the starting space) becomes -1.
+def suggestion_ids(suggestions, deck=STANDARD_DECK):
+    ids = deck.ids
+    try:
+        return np.array([(ids.get(room.lower(), -1), ids[character.lower()], ids[weapon.lower()])
+                         for room, character, weapon in suggestions], dtype=np.int32).reshape(-1, 3)
+    except KeyError as error:
+        raise ValueError(f"Unknown card {error.args[0]!r} in a suggestion.") from None
+
+
+# Stack the card owners of games played with the same deck (GameManager.card_owners) into a
+# games x cards array of seats, with NOBODY for the solution cards.
+def game_owners(games):
+    games = list(games)
+    if not games:
+        return np.empty((0, 0), dtype=np.int16)
+    deck = games[0].deck
+    if any(game.deck is not deck and game.deck.names != deck.names for game in games):
+        raise ValueError("The games must be played with the same deck.")
+    return np.array([[NOBODY if owner is None else owner for owner in game.card_owners] for game in games],
+                    dtype=np.int16)
+
+
+# Resolve suggestions the way GameManager.resolve_suggestion does, all at once: the disprover is the lowest
+# seat other than the suggester holding a suggested card, and shows its lowest suggested card ID.
+# owners is a deals x cards array of seats (1 x cards to ask every suggestion of the same deal), suggesters
+# a seat or one seat per suggestion and suggested an n x 3 array of card IDs (see suggestion_ids).
+# Cards owned by a negative seat or by envelope (such as BatchSampler's num_players) are held by nobody.
+# Returns the disproving seat and the card ID shown for each suggestion, -1 where nobody could disprove.
+def resolve_batch(owners, suggesters, suggested, envelope=NOBODY):
+    owners = np.asarray(owners)
+    suggested = np.asarray(suggested)
+    if len(owners) not in (1, len(suggested)):
+        raise ValueError("Give one deal, or one deal per suggestion.")
+    rows = np.arange(len(suggested)) if len(owners) > 1 else np.zeros(len(suggested), dtype=np.intp)
+    return _resolve(owners[rows[:, None], np.maximum(suggested, 0)], suggested,
+                    np.asarray(suggesters).reshape(-1, 1), owners.shape[1], envelope)
+
+
+# Ask every suggestion of every deal in a batch, such as deals drawn by sampler.BatchSampler, for
+# "what if I suggested this" queries. Returns suggestions x deals arrays of disproving seats and card IDs.
+def resolve_against_deals(deals, suggester, suggested, envelope=NOBODY):
+    deals = np.asarray(deals)
+    suggested = np.asarray(suggested)
+    held = deals[:, np.maximum(suggested, 0)].transpose(1, 0, 2)  # Suggestion x deal x suggested card.
+    return _resolve(held, suggested[:, None, :], np.asarray(suggester).reshape(-1, 1, 1), deals.shape[1], envelope)
+
+
+# Resolve one suggestion in each of many games at once: suggesters holds the seat of the suggesting
+# player in each game and suggestions one (room, character, weapon) triple per game.
+# Returns the disproving seat and card ID for each game (see resolve_batch). The games are not changed:
+# nothing is logged and nobody is shown a card.
+def resolve_games(games, suggesters, suggestions):
+    games = list(games)
+    if len(suggestions) != len(games):
+        raise ValueError("Give one suggestion per game.")
+    return resolve_batch(game_owners(games), suggesters, suggestion_ids(suggestions, games[0].deck))
+
+
+# Find out who would disprove each of a list of suggestions by the player in a seat, with the cards as
+# dealt in a game, without making them. Returns the disproving seat and card ID for each suggestion.
+def what_if(game, seat, suggestions):
+    return resolve_batch(game_owners([game]), seat, suggestion_ids(suggestions, game.deck))
+
+
+# Pick the disprover and card from the owners of the suggested cards. The lowest owner wins, then the
+# lowest card, so both come from the minimum of owner * num_cards + card ID over the cards that count.
+def _resolve(held, suggested, suggesters, num_cards, envelope):
+    counts = (suggested >= 0) & (held >= 0) & (held != suggesters)
+    if envelope >= 0:
+        counts &= held != envelope
+    keys = np.where(counts, held.astype(np.int64) * num_cards + suggested, np.iinfo(np.int64).max).min(axis=-1)
+    found = keys != np.iinfo(np.int64).max
+    return np.where(found, keys // num_cards, -1), np.where(found, keys % num_cards, -1)
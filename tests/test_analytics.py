@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from analytics import EVENT_DTYPE, ColumnarWriter, export_event_log, game_length_distribution, iter_chunks, \
+    win_rate_by_seat
+from event_log import RECORD, Event, EventLog
+from simulation import run_batch
+
+
+def test_event_dtype_matches_records():
+    assert EVENT_DTYPE.itemsize == RECORD.size
+    event = Event(8, 2, 513, 7, 65535, 300, 1)
+    decoded = np.frombuffer(RECORD.pack(*event), dtype=EVENT_DTYPE)[0]
+    assert tuple(int(value) for value in decoded) == event
+
+
+def test_columns_from_games_and_from_logs_agree(tmp_path):
+    with EventLog(str(tmp_path / "games.log")) as event_log:
+        stats = run_batch(40, seed=3, event_log=event_log)
+    with ColumnarWriter(str(tmp_path / "played"), chunk_games=15) as writer:
+        run_batch(40, seed=3, event_log=writer)
+    assert export_event_log(str(tmp_path / "games.log"), str(tmp_path / "exported"), chunk_games=15) == 40
+
+    for table in ("games", "turns"):
+        played = list(iter_chunks(str(tmp_path / "played"), table))
+        exported = list(iter_chunks(str(tmp_path / "exported"), table))
+        assert len(played) == len(exported) == 3
+        for first, second in zip(played, exported):
+            assert first.keys() == second.keys()
+            assert all((first[name] == second[name]).all() for name in first)
+
+    seats = win_rate_by_seat(str(tmp_path / "played"))
+    assert seats["wins_by_seat"].tolist() == stats["wins_by_seat"]
+    assert seats["no_winner"] == stats["no_winner"]
+    lengths = game_length_distribution(str(tmp_path / "played"))
+    assert lengths["games"] == 40 and lengths["mean"] == stats["mean_turns"]
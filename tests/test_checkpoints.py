@@ -0,0 +1,115 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from agents import BotAgent
+from checkpoints import CheckpointStore
+
+PLAYERS = ["Alice", "Bob", "Carol"]
+
+
+# Everything about a game that undo, redo and resume must restore.
+def game_state(engine):
+    return (engine.current_player_index, engine.dice_roll, engine.turns, engine.game_over, engine.game.dice.rolls,
+            [(player.current_coordinates, player.is_active, [card.name for card in player.seen_cards],
+              player.known_mask) for player in engine.players])
+
+
+# Take actions chosen by bots through step (engine.step or store.step) until the game ends or count are taken.
+def play_bots(engine, step, seed, count=1000):
+    agents = [BotAgent(random.Random(seed * 10 + seat)) for seat in range(len(engine.players))]
+    for seat, agent in enumerate(agents):
+        agent.start(engine, seat)
+    for _ in range(count):
+        if engine.game_over:
+            break
+        result = step(agents[engine.current_player_index].choose_action(engine))
+        if result["accepted"]:
+            for observer in agents:
+                observer.observe(engine, result)
+
+
+def test_checkpoint_undo_redo_resume(tmp_path):
+    path = str(tmp_path / "game.ckp")
+    store = CheckpointStore(PLAYERS, seed=3, path=path)
+    states = {0: game_state(store.engine)}
+
+    def step(action):
+        result = store.step(action)
+        states[store.node] = game_state(store.engine)
+        return result
+
+    play_bots(store.engine, step, seed=3, count=40)
+    last = store.node
+    assert last > 10
+
+    store.goto(0)
+    assert game_state(store.engine) == states[0]
+    while store.branches():
+        store.redo()
+    assert store.node == last and game_state(store.engine) == states[last]
+
+    # Branch from halfway through with a different action, then go back to the first branch.
+    middle = last // 2
+    store.goto(middle)
+    assert game_state(store.engine) == states[middle]
+    solution = store.engine.game.solution
+    wrong_weapon = next(name for name in store.deck.weapons if name != solution.weapon)
+    step(("accuse", solution.room, solution.character, wrong_weapon))
+    branch = store.node
+    assert store.parents[branch] == middle and len(store.branches(middle)) == 2
+    store.goto(last)
+    assert game_state(store.engine) == states[last]
+    store.goto(branch)
+    store.close()
+
+    # A record cut short by a crash is dropped.
+    with open(path, "ab") as file:
+        file.write(b"\x00\x01")
+    resumed = CheckpointStore.resume(path)
+    try:
+        assert resumed.node == branch and resumed.parents == store.parents
+        assert game_state(resumed.engine) == states[branch]
+        resumed.undo()
+        assert game_state(resumed.engine) == states[middle]
+        resumed.redo()
+        assert game_state(resumed.engine) == states[branch]
+    finally:
+        resumed.close()
+
+
+def test_rejected_actions_are_not_recorded():
+    store = CheckpointStore(PLAYERS, seed=4)
+    engine = store.engine
+    start = game_state(engine)
+    r, c = engine.current_player.current_coordinates
+    dice_roll = engine.roll()
+    assert not store.step(("move", (r + 50, c)))["accepted"]
+    assert not store.step(("secret",))["accepted"]
+    assert store.node == 0 and engine.dice_roll == dice_roll
+    assert store.step(("move", (r, c + 1)))["accepted"]
+    assert store.node == 1
+    moved = game_state(engine)
+    store.undo()
+    assert store.node == 0 and game_state(engine) == start  # The roll is taken back with the move.
+    store.redo()
+    assert game_state(engine) == moved
+    with pytest.raises(ValueError):
+        store.redo()
+
+
+def test_existing_file_is_only_replaced_when_asked(tmp_path):
+    path = str(tmp_path / "game.ckp")
+    with CheckpointStore(PLAYERS, seed=1, path=path) as store:
+        play_bots(store.engine, store.step, seed=1, count=5)
+    size = os.path.getsize(path)
+    with pytest.raises(FileExistsError):
+        CheckpointStore(PLAYERS, seed=2, path=path)
+    assert os.path.getsize(path) == size
+    with CheckpointStore(PLAYERS, seed=2, path=path, overwrite=True):
+        pass
+    assert os.path.getsize(path) < size
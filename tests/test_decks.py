@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from agents import DeductionAgent
+from card_setup import Deck
+from engine import GameEngine
+from mcts import ISMCTSAgent
+from server import parse_action
+
+DECK = Deck.numbered(10, 8, 9)
+
+
+def test_deduction_agents_play_numbered_decks():
+    for seed in range(10):
+        rng = random.Random(seed)
+        engine = GameEngine(["P1", "P2", "P3", "P4"], rng=rng, deck=DECK)
+        agents = [DeductionAgent(random.Random(rng.getrandbits(64))) for _ in engine.players]
+        summary = engine.run(agents, max_turns=2000)
+        assert summary["finished"]
+        assert summary["winner"] is not None
+        solution = engine.game.solution
+        for agent in agents:
+            known = agent.knowledge.known_solution()
+            assert known is None or known == (solution.character, solution.weapon, solution.room)
+
+
+def test_snapshot_uses_the_game_deck():
+    engine = GameEngine(["P1", "P2", "P3"], seed=0, deck=DECK)
+    state = engine.snapshot()
+    mansion = engine.game.mansion
+    for index, card_id in state.board.room_cards.items():
+        tile = mansion.tile_at(index)
+        assert card_id == (None if tile.name == "Start Space" else DECK.ids[tile.name.lower()])
+    assert state.solution == engine.game.solution.mask
+    assert state.board.card_id("Character 10") == DECK.ids["character 10"]
+    assert state.board.all_cards.bit_count() == len(DECK)
+
+
+def test_ismcts_plays_numbered_decks():
+    rng = random.Random(1)
+    engine = GameEngine(["P1", "P2", "P3"], rng=rng, deck=DECK)
+    agents = [ISMCTSAgent(random.Random(rng.getrandbits(64)), rollouts=20)] + \
+        [DeductionAgent(random.Random(rng.getrandbits(64))) for _ in range(2)]
+    engine.run(agents, max_turns=60)
+    assert agents[0].stats["searches"] > 0
+
+
+def test_server_checks_names_against_the_deck():
+    assert parse_action(["suggest", "Character 10", "Weapon 8"], DECK) == ("suggest", "Character 10", "Weapon 8")
+    with pytest.raises(ValueError, match="Unknown card 'Character 10'"):
+        parse_action(["suggest", "Character 10", "Knife"])
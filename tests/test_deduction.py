@@ -0,0 +1,90 @@
+import os
+import random
+import sys
+from itertools import combinations, product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from card_setup import STANDARD_DECK
+from deduction import Knowledge
+from engine import GameEngine
+
+# A deck of three cards of each type (IDs 0-2, 3-5 and 6-8) dealt to three players, two cards each.
+SMALL_CATEGORIES = (np.arange(0, 3), np.arange(3, 6), np.arange(6, 9))
+
+
+# Count every deal of the small deck that agrees with the observations, by brute force.
+def brute_force_probabilities(hand, suggestions):
+    counts = np.zeros(9)
+    total = 0
+    for solution in product(*(category.tolist() for category in SMALL_CATEGORIES)):
+        if set(solution) & set(hand):
+            continue
+        rest = [card for card in range(9) if card not in solution and card not in hand]
+        for first in combinations(rest, 2):
+            hands = [set(hand), set(first), set(rest) - set(first)]
+            if all(check(hands) for check in suggestions):
+                counts[list(solution)] += 1
+                total += 1
+    return counts / total
+
+
+def test_probabilities_match_brute_force():
+    knowledge = Knowledge(3, 0, [STANDARD_DECK.cards[0], STANDARD_DECK.cards[3]], [2, 2, 2], num_cards=9,
+                          categories=SMALL_CATEGORIES)
+    # Seat 2 disproves seat 1's suggestion with a card seat 0 does not see; seat 2 then passes on its own.
+    knowledge.observe_suggestion(1, [1, 4, 6], disprover=2, passed=[])
+    knowledge.observe_suggestion(2, [2, 5, 7], passed=[0, 1])
+    expected = brute_force_probabilities({0, 3}, [lambda hands: hands[2] & {1, 4, 6},
+                                                  lambda hands: not (hands[0] | hands[1]) & {2, 5, 7}])
+    assert np.allclose(knowledge.solution_probabilities(), expected)
+    assert knowledge.possible_solution_cards() == [1, 2, 4, 5, 6, 7, 8]
+
+
+def test_deductions_agree_with_the_deal():
+    for seed in range(20):
+        rng = random.Random(seed)
+        engine = GameEngine(["P1", "P2", "P3"], seed=seed)
+        players = engine.game.players
+        holdings = [player.hand_mask for player in players] + [engine.game.solution.mask]
+        knowledge = Knowledge(len(players), 0, players[0].cards, engine.hand_sizes)
+        for _ in range(6):
+            suggester = rng.randrange(len(players))
+            cards = [rng.choice(category).item() for category in knowledge.categories]
+            passed = []
+            for step in range(1, len(players)):
+                seat = (suggester + step) % len(players)
+                held = [card for card in cards if holdings[seat] >> card & 1]
+                if held:
+                    shown = held[0] if 0 in (seat, suggester) else None
+                    knowledge.observe_suggestion(suggester, cards, disprover=seat, shown=shown, passed=passed)
+                    break
+                passed.append(seat)
+            else:
+                knowledge.observe_suggestion(suggester, cards, passed=passed)
+
+        for owner, held in enumerate(holdings):
+            assert knowledge.has_bits[owner] & ~held == 0
+            assert knowledge.hasnt_bits[owner] & held == 0
+        probabilities = knowledge.solution_probabilities()
+        for category in knowledge.categories:
+            assert probabilities[category].sum() == pytest.approx(1)
+        assert all(probabilities[card] > 0 for card in range(knowledge.num_cards) if holdings[-1] >> card & 1)
+
+
+def test_known_solution_and_contradictions():
+    engine = GameEngine(["P1", "P2", "P3"], seed=0)
+    players = engine.game.players
+    knowledge = Knowledge(len(players), 0, players[0].cards, engine.hand_sizes)
+    assert knowledge.known_solution() is None
+    solution = engine.game.solution
+    knowledge.observe_accusation(1, [STANDARD_DECK.ids[name.lower()] for name in
+                                     (solution.character, solution.weapon, solution.room)], correct=True)
+    assert knowledge.known_solution() == (solution.character, solution.weapon, solution.room)
+
+    own_card = players[0].cards[0].card_id
+    with pytest.raises(ValueError, match="contradict"):
+        knowledge.observe_suggestion(1, [own_card], disprover=2, shown=own_card)
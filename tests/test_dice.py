@@ -0,0 +1,48 @@
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from dice import BlockDice, ScriptedDice, philox_rolls
+from simulation import play_game
+
+
+def test_scripted_dice_run_out():
+    dice = ScriptedDice([7])
+    assert dice.roll() == 7
+    with pytest.raises(ValueError):
+        dice.roll()
+    dice.seek(0)
+    assert dice.roll() == 7
+    with pytest.raises(ValueError):
+        ScriptedDice([1])
+
+
+def test_block_dice_do_not_depend_on_block_sizes():
+    small, large = BlockDice(11, block_size=4), BlockDice(11, block_size=4096)
+    rolls = [small.roll() for _ in range(300)]
+    assert rolls == [large.roll() for _ in range(300)]
+    assert rolls == philox_rolls(11, 0, 0, 300).tolist()
+    assert rolls != [BlockDice(11, stream=1).roll() for _ in range(300)]
+
+
+def test_block_dice_seek():
+    dice = BlockDice(3)
+    rolls = [dice.roll() for _ in range(150)]
+    for position in (0, 1, 67, 149):
+        dice.seek(position)
+        assert [dice.roll() for _ in range(150 - position)] == rolls[position:]
+        assert dice.rolls == 150
+
+
+def test_block_dice_roll_two_dice():
+    counts = Counter(philox_rolls(0, 0, 0, 36000).tolist())
+    assert set(counts) == set(range(2, 13))
+    assert counts[7] > counts[6] > counts[2] and counts[7] > counts[8] > counts[12]
+
+
+def test_games_with_block_dice_repeat():
+    assert play_game(5, dice_factory=BlockDice) == play_game(5, dice_factory=BlockDice)
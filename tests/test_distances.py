@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from card_setup import STANDARD_DECK
+from distances import DistanceTable, mansion_graph
+from mansion import Mansion
+
+
+def room_cards():
+    return [card for card in STANDARD_DECK.cards if card.card_type == 'room']
+
+
+# A board of the given size with rooms in three corners and the start in the middle.
+def board(rows, cols):
+    return {"rows": rows, "cols": cols, "rooms": ((0, 0), (0, cols - 1), (rows - 1, 0)),
+            "start": (rows // 2, cols // 2), "secret_passages": ()}
+
+
+def test_rows_match_full_table():
+    mansion = Mansion(room_cards())
+    graph = mansion_graph(mansion)
+    lazy, full = DistanceTable(*graph), DistanceTable(*graph).full()
+    for source in range(len(graph[0])):
+        assert (lazy.row(source) == full.distances[source]).all()
+        for roll in (0, 2, 7, 12, 20):
+            assert (lazy.reachable_within(source, roll) == full.reachable_within(source, roll)).all()
+    # Moves go both ways, so the row of a room holds the distances towards it.
+    assert (full.distances == full.distances.T).all()
+
+
+def test_moves_end_in_rooms():
+    mansion = Mansion(room_cards())
+    table = mansion.distance_table()
+    start = mansion.index_of(mansion.grid[mansion.start[0]][mansion.start[1]])
+    reachable = table.reachable_within(start, 3)
+    assert reachable[0] == start
+    assert all(table.distance(start, tile) <= 3 for tile in reachable)
+    assert mansion.distance(mansion.grid[0][0], mansion.grid[0][1]) == 1
+
+
+def test_large_board_needs_only_the_rows_asked_for():
+    mansion = Mansion(room_cards()[:3], layout=board(300, 300))
+    table = mansion.distance_table()
+    corner = mansion.get_room(room_cards()[0].name)
+    far = mansion.grid[299][298]
+    assert mansion.distance(corner, far) == 299 + 298  # Beyond the 255 steps of a uint8 table.
+    assert table.distances is None and len(table._rows) == 1
+    assert table.row(mansion.index_of(corner)).dtype == np.uint32
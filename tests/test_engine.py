@@ -0,0 +1,77 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from agents import BotAgent, RandomAgent
+from dice import ScriptedDice
+from engine import GameEngine
+
+PLAYERS = ["Alice", "Bob", "Carol"]
+
+
+def test_scripted_game():
+    dice = ScriptedDice([2, 12, 12, 12, 12, 12])
+    engine = GameEngine(PLAYERS, seed=1, dice=dice)
+    solution = engine.game.solution
+    mansion = engine.game.mansion
+    room = mansion.coordinates[mansion.get_room(solution.room)]
+    r, c = engine.current_player.current_coordinates
+    wrong_weapon = next(name for name in engine.game.deck.weapons if name != solution.weapon)
+
+    # Alice rolls 2: the room is out of reach, and the roll is kept for her next try.
+    result = engine.step(("move", room))
+    assert not result["accepted"] and result["dice_roll"] == 2
+    assert engine.current_player_index == 0 and engine.dice_roll == 2
+    assert engine.step(("move", (r, c - 1)))["dice_roll"] == 2
+    assert engine.step(("move", (r - 1, c)))["accepted"]
+    assert engine.step(("move", (r + 1, c)))["accepted"]
+    assert engine.step(("move", room))["position"] == room
+
+    result = engine.step(("accuse", solution.room, solution.character, wrong_weapon))
+    assert result["accepted"] and not result["correct"]
+    assert not engine.players[1].is_active
+
+    assert not engine.step(("suggest", solution.character, solution.weapon))["accepted"]
+    assert engine.step(("move", (r + 2, c)))["accepted"]
+    result = engine.step(("suggest", solution.character, solution.weapon))
+    assert result["disprover"] is None and result["card"] is None
+    assert engine.current_player_index == 2  # Bob is eliminated and loses his turns.
+    engine.step(("move", (r + 3, c)))
+    assert engine.step(("accuse", solution.room, solution.character, solution.weapon))["correct"]
+
+    assert engine.summary() == {"winner": 0, "turns": 9, "eliminated": [1], "finished": True,
+                                "solution": (solution.room, solution.character, solution.weapon)}
+    assert dice.rolls == len(dice.script)
+    with pytest.raises(ValueError):
+        engine.step(("move", room))
+
+
+def test_unknown_cards_are_rejected():
+    engine = GameEngine(PLAYERS, seed=2, dice=ScriptedDice([]))
+    player = engine.current_player
+    for action, error in ((("suggest", "nobody", "rope"), "'nobody' is not a character card."),
+                          (("suggest", "mrs. white", "kitchen"), "'kitchen' is not a weapon card."),
+                          (("accuse", "kitchen", "nobody", "rope"), "'nobody' is not a character card."),
+                          (("accuse", "rope", "mrs. white", "rope"), "'rope' is not a room card.")):
+        assert engine.step(action) == {"action": action[0], "accepted": False, "error": error}
+    assert engine.current_player is player and player.is_active and engine.turns == 0
+    with pytest.raises(ValueError):
+        engine.game.resolve_suggestion(player, "kitchen", "nobody", "rope")
+    with pytest.raises(ValueError):
+        engine.game.resolve_accusation(player, "kitchen", "mrs. white", "nobody")
+
+
+def test_seeded_bot_games_repeat():
+    def play(seed):
+        engine = GameEngine(PLAYERS, seed=seed)
+        agents = [BotAgent(random.Random(seed)), RandomAgent(random.Random(seed + 1)), BotAgent(random.Random(seed + 2))]
+        return engine.run(agents)
+
+    for seed in range(5):
+        summary = play(seed)
+        assert summary == play(seed)
+        assert summary["finished"] or summary["turns"] == 1000
@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from agents import BotAgent, RandomAgent
+from engine import GameEngine
+from eval_cache import WAYS, EvalCache, engine_key, position_key, state_key
+
+PLAYERS = ["Alice", "Bob", "Carol"]
+
+
+def test_engine_key_matches_snapshot_key_during_a_game():
+    engine = GameEngine(PLAYERS, seed=5)
+    agents = [BotAgent(random.Random(1)), RandomAgent(random.Random(2)), BotAgent(random.Random(3))]
+    for seat, agent in enumerate(agents):
+        agent.start(engine, seat)
+    checked = 0
+    while not engine.game_over and engine.turns < 200:
+        for viewer in (None, 0, 2):
+            assert engine_key(engine, viewer) == state_key(engine.snapshot(), viewer)
+        checked += 1
+        result = engine.step(agents[engine.current_player_index].choose_action(engine))
+        if result["accepted"]:
+            for agent in agents:
+                agent.observe(engine, result)
+    assert checked > 10
+
+
+def test_numpy_coordinates_hash_like_ints():
+    engine = GameEngine(PLAYERS, seed=5)
+    key = engine_key(engine)
+    player = engine.players[0]
+    r, c = player.current_coordinates
+    player.current_coordinates = (np.int16(r), np.int16(c))
+    assert engine_key(engine) == key
+
+
+def test_keys_depend_on_every_feature():
+    base = position_key((3, 4, 5), [(0, 0b101)], 0b111, 0)
+    assert base == position_key((3, 4, 5), [(0, 0b101)], 0b111, 0) != 0
+    assert len({base, position_key((3, 5, 4), [(0, 0b101)], 0b111, 0),
+                position_key((3, 4, 5), [(0, 0b100)], 0b111, 0), position_key((3, 4, 5), [(0, 0b101)], 0b011, 0),
+                position_key((3, 4, 5), [(0, 0b101)], 0b111, 1)}) == 5
+
+
+def test_cache_stores_and_evicts_within_a_bucket():
+    cache = EvalCache(2, max_bytes=4096)
+    keys = [1 + bucket * cache.buckets for bucket in range(WAYS + 1)]  # All in the same bucket.
+    for key in keys:
+        cache.put(key, (float(key), 0.5))
+    assert cache.get(keys[0]) is None  # The least recently used entry made room for the last one.
+    assert cache.get(keys[-1]) == (float(keys[-1]), 0.5)
+    assert cache.stats["evictions"] == 1 and len(cache) == WAYS
+    with pytest.raises(ValueError):
+        cache.put(7, (1.0,))
+
+
+def test_torn_entry_reads_as_a_miss():
+    cache = EvalCache(3, max_bytes=4096)
+    cache.put(5, (1.0, 2.0, 3.0))
+    slot = (5 & (cache.buckets - 1)) * WAYS
+    cache._raw[slot * 24] ^= 1
+    assert cache.get(5) is None
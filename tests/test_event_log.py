@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import BotAgent
+from engine import GameEngine
+from event_log import ACCUSE, GAME_END, GAME_START, EventLog, EventLogReader, replay
+
+PLAYERS = ["Alice", "Bob", "Carol"]
+
+
+# Play seeded bot games into an event log and return their engines.
+def play_logged(path, seeds):
+    engines = []
+    with EventLog(path) as log:
+        for seed in seeds:
+            engine = GameEngine(PLAYERS, seed=seed, event_log=log)
+            engine.run([BotAgent(random.Random(seed * 10 + seat)) for seat in range(len(PLAYERS))])
+            engines.append(engine)
+    return engines
+
+
+def test_replay_matches_played_game(tmp_path):
+    path = str(tmp_path / "games.log")
+    engines = play_logged(path, range(4, 7))
+    reader = EventLogReader(path)
+    try:
+        assert len(reader) == 3
+        for index, engine in enumerate(engines):
+            game, current_seat = replay(reader.events(index))
+            assert current_seat is None
+            assert (game.solution.room, game.solution.character, game.solution.weapon) == engine.summary()["solution"]
+            for replayed, played in zip(game.players, engine.players):
+                assert replayed.current_coordinates == played.current_coordinates
+                assert replayed.is_active == played.is_active
+                assert [card.name for card in replayed.cards] == [card.name for card in played.cards]
+                assert [card.name for card in replayed.seen_cards] == [card.name for card in played.seen_cards]
+        assert reader.outcomes() == [(engine.summary()["winner"], engine.turns) for engine in engines]
+    finally:
+        reader.close()
+
+
+def test_replay_to_a_turn(tmp_path):
+    path = str(tmp_path / "games.log")
+    play_logged(path, [8])
+    reader = EventLogReader(path)
+    try:
+        events = reader.events(0)
+    finally:
+        reader.close()
+    assert events[0].kind == GAME_START and events[-1].kind == GAME_END
+    assert any(event.kind == ACCUSE for event in events)
+    game, current_seat = replay(events, turn=0)
+    assert current_seat == 0
+    assert all(player.current_coordinates == game.mansion.start for player in game.players)
+
+
+def test_index_is_rebuilt_when_missing(tmp_path):
+    path = str(tmp_path / "games.log")
+    play_logged(path, [1, 2])
+    os.remove(path + ".idx")
+    reader = EventLogReader(path)
+    try:
+        assert len(reader) == 2 and reader.events(1)[0].kind == GAME_START
+    finally:
+        reader.close()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from card_setup import STANDARD_DECK
+from distances import DistanceTable
+from layout import CLASSIC_LAYOUT, CompiledLayout, clear_compiled, load_layout, parse_layout, read_compiled, \
+    write_compiled
+from mansion import Mansion
+
+LONG_HALL = os.path.join(os.path.dirname(CLASSIC_LAYOUT), "long_hall.toml")
+
+
+def room_cards():
+    return [card for card in STANDARD_DECK.cards if card.card_type == 'room']
+
+
+def test_cache_round_trip(tmp_path):
+    compiled = CompiledLayout(10, 12, ((0, 0), (0, 11), (9, 0)), (5, 6))
+    path = str(tmp_path / "board.board")
+    write_compiled(compiled, path)
+    loaded = read_compiled(path)
+    assert loaded.cached and loaded.key == compiled.key
+    for name in ("tile_types", "indptr", "indices"):
+        assert list(getattr(loaded, name)) == list(getattr(compiled, name))
+
+    full = DistanceTable(*compiled.graph()).full()
+    table = DistanceTable.from_buffers(**loaded.distance_buffers)
+    assert (table.distances == full.distances).all()
+    assert (table.order == full.order).all()
+    assert (table.reachable_counts == full.reachable_counts).all()
+
+
+def test_large_boards_are_cached_without_distances(tmp_path):
+    compiled = CompiledLayout(40, 40, ((0, 0), (39, 39)), (20, 20))
+    path = str(tmp_path / "board.board")
+    write_compiled(compiled, path)
+    loaded = read_compiled(path)
+    assert loaded.distance_buffers is None
+    assert list(loaded.indices) == list(compiled.indices)
+
+
+def test_mansion_from_layout_file(tmp_path):
+    clear_compiled()
+    path = str(tmp_path / "long_hall.toml")
+    shutil.copy(LONG_HALL, path)
+    spec = load_layout(path)
+    assert os.listdir(tmp_path / "__boardcache__")
+
+    mansion = Mansion(room_cards(), layout=path)
+    assert mansion.layout.cached
+    assert (mansion.rows, mansion.cols, mansion.start) == (16, 24, (8, 12))
+    assert [mansion.get_coordinates(mansion.get_room(card.name)) for card in room_cards()] == list(spec["rooms"])
+    assert mansion.get_room("Study").secret_passage is mansion.get_room("Kitchen")
+
+    # A fresh process reads the same board back from the cache, and plays it like a board compiled in memory.
+    clear_compiled()
+    cached = Mansion(room_cards(), layout=load_layout(path))
+    compiled = Mansion(room_cards(), layout=dict(spec))
+    assert cached.layout.cached
+    assert cached.distance(cached.get_room("Study"), cached.grid[8][12]) == \
+        compiled.distance(compiled.get_room("Study"), compiled.grid[8][12])
+    assert (cached.distance_table().full().distances == compiled.distance_table().full().distances).all()
+
+
+def test_invalid_layouts_are_rejected():
+    with pytest.raises(ValueError, match="missing start"):
+        parse_layout(b'{"rows": 4, "cols": 4, "rooms": []}', "board.json")
+    with pytest.raises(ValueError, match="outside"):
+        parse_layout(b'{"rows": 4, "cols": 4, "start": [1, 1], "rooms": [[4, 0]]}', "board.json")
+    with pytest.raises(ValueError, match="share a tile"):
+        parse_layout(b'{"rows": 4, "cols": 4, "start": [1, 1], "rooms": [[1, 1]]}', "board.json")
@@ -0,0 +1,29 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from agents import BotAgent
+from engine import GameEngine
+from mcts import ISMCTSAgent
+
+
+@pytest.mark.parametrize("budget", [{"rollouts": 0}, {"rollouts": None, "time_budget": 0},
+                                    {"rollouts": 10, "time_budget": -1.0}, {"rollouts": None}])
+def test_empty_budgets_are_rejected(budget):
+    with pytest.raises(ValueError, match="budget|rollouts"):
+        ISMCTSAgent(**budget)
+
+
+def test_searches_run_within_the_budget():
+    for budget in ({"rollouts": 30}, {"rollouts": None, "time_budget": 1e-9}):
+        rng = random.Random(0)
+        engine = GameEngine(["P1", "P2", "P3"], rng=rng)
+        agent = ISMCTSAgent(random.Random(rng.getrandbits(64)), **budget)
+        engine.run([agent] + [BotAgent(random.Random(rng.getrandbits(64))) for _ in range(2)], max_turns=30)
+        searches, rollouts = agent.stats["searches"], agent.stats["rollouts"]
+        assert searches > 0
+        assert rollouts == 30 * searches if budget["rollouts"] else rollouts >= searches
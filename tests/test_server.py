@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import GameServer
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def open(cls, port):
+        return cls(*await asyncio.open_connection("127.0.0.1", port))
+
+    async def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    # Read messages until one of the given event arrives, and return it.
+    async def expect(self, event):
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), 5))
+            if message["event"] == event:
+                return message
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+# Run a test coroutine against a server listening on a free port.
+def with_server(test, **options):
+    async def main():
+        server = GameServer(**options)
+        listener = await server.start(port=0)
+        async with listener:
+            await test(server, listener.sockets[0].getsockname()[1])
+    asyncio.run(main())
+
+
+# Wait until the server has seen a disconnection.
+async def settle(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("The server did not free the table.")
+
+
+def test_tables_waiting_for_players_are_closed_on_disconnect():
+    async def test(server, port):
+        first, second = await Connection.open(port), await Connection.open(port)
+        await first.send({"op": "join", "name": "A"})
+        await first.expect("joined")
+        await second.send({"op": "join", "name": "B"})
+        await second.expect("joined")
+        await first.close()
+        assert (await second.expect("closed"))["table"] == "0"
+        await settle(lambda: not server.tables)
+        assert server.tables_abandoned == 1
+
+        # The slot is free again.
+        await second.send({"op": "join", "name": "B"})
+        assert (await second.expect("joined"))["table"] == "1"
+        await second.close()
+        await settle(lambda: not server.tables)
+
+    with_server(test, players_per_table=3, max_tables=1)
+
+
+def test_games_are_closed_once_every_player_has_left():
+    async def test(server, port):
+        first, second = await Connection.open(port), await Connection.open(port)
+        for connection, name in ((first, "A"), (second, "B")):
+            await connection.send({"op": "join", "name": name, "table": "t"})
+        for connection in (first, second):
+            await connection.expect("start")
+        await first.close()
+        await asyncio.sleep(0.05)
+        assert "t" in server.tables  # The seat left behind is played by the turn timeout.
+        await second.close()
+        await settle(lambda: not server.tables)
+        assert (server.tables_abandoned, server.games_finished) == (1, 0)
+
+    with_server(test, players_per_table=2)
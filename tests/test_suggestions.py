@@ -0,0 +1,53 @@
+import os
+import sys
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from card_setup import STANDARD_DECK, Deck
+from engine import GameEngine
+from suggestions import resolve_games, suggestion_ids, what_if
+
+
+def names(deck, card_type):
+    return [card.name for card in deck.cards if card.card_type == card_type]
+
+
+# Get the seat and card ID GameManager.resolve_suggestion gives for a suggestion, or -1 for nobody.
+def resolved(game, seat, suggestion):
+    player, card, _ = game.resolve_suggestion(game.players[seat], *suggestion)
+    if player is None:
+        return -1, -1
+    return game.players.index(player), card.card_id
+
+
+@pytest.mark.parametrize("deck", [STANDARD_DECK, Deck.numbered(8, 7, 9)], ids=["standard", "numbered"])
+def test_what_if_matches_resolve_suggestion(deck):
+    for seed in range(3):
+        game = GameEngine(["P1", "P2", "P3", "P4"], seed=seed, deck=deck).game
+        suggestions = list(product(names(deck, 'room') + ["Start Space"], names(deck, 'character'),
+                                   names(deck, 'weapon')))
+        for seat in range(len(game.players)):
+            seats, cards = what_if(game, seat, suggestions)
+            assert list(zip(seats.tolist(), cards.tolist())) == [resolved(game, seat, suggestion)
+                                                                  for suggestion in suggestions]
+
+
+def test_resolve_games_matches_resolve_suggestion():
+    games = [GameEngine(["P1", "P2", "P3"], seed=seed).game for seed in range(30)]
+    suggesters = [seed % 3 for seed in range(30)]
+    suggestions = [("Kitchen", "Miss Scarlet", "Knife"), ("start space", "colonel mustard", "rope")] * 15
+    seats, cards = resolve_games(games, suggesters, suggestions)
+    assert list(zip(seats.tolist(), cards.tolist())) == [resolved(game, seat, suggestion) for game, seat, suggestion
+                                                          in zip(games, suggesters, suggestions)]
+
+
+def test_unknown_cards_are_rejected():
+    assert suggestion_ids([("Start Space", "Miss Scarlet", "Knife")]).tolist()[0][0] == -1
+    with pytest.raises(ValueError, match="'spoon'"):
+        suggestion_ids([("Kitchen", "Miss Scarlet", "Spoon")])
+    game = GameEngine(["P1", "P2", "P3"], seed=0).game
+    with pytest.raises(ValueError, match="one suggestion per game"):
+        resolve_games([game], [0], [])
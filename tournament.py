@@ -0,0 +1,98 @@
+import argparse
+import contextlib
+import hashlib
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from agents import BotAgent
+from dice import BlockDice
+from event_log import EventLog
+from layout import load_layout
+from simulation import DEFAULT_PLAYERS, aggregate_results, finish_stats, merge_result, play_game
+
+
+# Derive the seed of one game from the master seed.
+# Each game gets an independent seed, so results do not depend on how games are split across workers.
+def game_seed(master_seed, index):
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# Play the games [start, stop) of a tournament in a worker process.
+# Every game builds its own random.Random from its seed, so workers never share random state.
+# With a log directory, the chunk's events go to their own event log file there, so workers never share a file.
+# Dice factories (see dice.BlockDice) are given the game seed, so every game gets its own dice stream too.
+def play_chunk(master_seed, start, stop, player_names, agent_factory, max_turns, layout=None, log_dir=None,
+               dice_factory=None):
+    results = []
+    log_path = os.path.join(log_dir, f"games_{start:010d}.log") if log_dir else None
+    with EventLog(log_path) if log_path else contextlib.nullcontext() as log:
+        for index in range(start, stop):
+            result = play_game(game_seed(master_seed, index), player_names, agent_factory, max_turns, layout, log,
+                               dice_factory=dice_factory)
+            result["game"] = index
+            results.append(result)
+    return results
+
+
+# Play num_games games across a pool of worker processes, yielding lists of results in game order.
+# At most max_pending chunks are queued at once, so memory stays flat however many games are played.
+def iter_tournament(num_games, master_seed=0, workers=None, chunk_size=1000, player_names=DEFAULT_PLAYERS,
+                    agent_factory=BotAgent, max_turns=1000, max_pending=None, layout=None, log_dir=None,
+                    dice_factory=None):
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    chunks = ((start, min(start + chunk_size, num_games)) for start in range(0, num_games, chunk_size))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, stop in chunks:
+            pending.append(executor.submit(play_chunk, master_seed, start, stop, tuple(player_names),
+                                           agent_factory, max_turns, layout, log_dir, dice_factory))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Play a whole tournament and return aggregated statistics.
+def run_tournament(num_games, master_seed=0, workers=None, chunk_size=1000, player_names=DEFAULT_PLAYERS,
+                   agent_factory=BotAgent, max_turns=1000, layout=None, log_dir=None, dice_factory=None):
+    start = time.perf_counter()
+    stats = aggregate_results([], len(player_names))
+    for chunk in iter_tournament(num_games, master_seed, workers, chunk_size, player_names, agent_factory, max_turns,
+                                 layout=layout, log_dir=log_dir, dice_factory=dice_factory):
+        for result in chunk:
+            merge_result(stats, result)
+    stats = finish_stats(stats)
+    stats["elapsed"] = time.perf_counter() - start
+    stats["games_per_second"] = num_games / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a reproducible bot tournament across worker processes.")
+    parser.add_argument("games", type=int, nargs="?", default=100000, help="Number of games to play.")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed of the tournament.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Games played per task.")
+    parser.add_argument("--players", type=int, default=len(DEFAULT_PLAYERS), help="Number of players per game.")
+    parser.add_argument("--layout", default=None, help="Board layout file (.json or .toml).")
+    parser.add_argument("--log-dir", default=None, help="Write each chunk's game events to an event log file here.")
+    parser.add_argument("--block-dice", action="store_true",
+                        help="Roll dice from NumPy blocks (dice.BlockDice) instead of each game's random.Random.")
+    args = parser.parse_args()
+
+    names = [f"P{i + 1}" for i in range(args.players)]
+    if args.layout:
+        # Compile the board once here, so the workers only map the cache file.
+        load_layout(args.layout)
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+    stats = run_tournament(args.games, args.seed, args.workers, args.chunk_size, names, layout=args.layout,
+                           log_dir=args.log_dir, dice_factory=BlockDice if args.block_dice else None)
+    print(f"Played {stats['games']} games in {stats['elapsed']:.2f}s ({stats['games_per_second']:.0f} games/s).")
+    print(f"Wins by seat: {stats['wins_by_seat']}, no winner: {stats['no_winner']}")
+    print(f"Turns: mean {stats['mean_turns']:.1f}, min {stats['min_turns']}, max {stats['max_turns']}")